@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Parallel Log Archive Scanner
+
+Scans the members of a workflow run's log archive (one file per job and
+step) for build errors in a process pool, so the regex work of a large
+matrix build is spread over all cores. Each member yields its own raw
+matches; the results are merged in archive member order regardless of
+which worker finished first, so the output is the same as a sequential
+scan.
+
+Members can be scanned as decoded text or, with byte scanning, with bytes
+regexes that only decode the matched fields. Members stored uncompressed
+are then scanned straight from an mmap of the archive, and compressed
+members are decompressed and scanned a chunk of whole lines at a time,
+so memory use stays under a bound however large the member is. Byte
+patterns only treat ASCII characters as word characters, so file paths
+containing non-ASCII characters are not located in that mode.
+"""
+
+import mmap
+import os
+import re
+import struct
+import zipfile
+from concurrent.futures import Executor
+from typing import List, Optional, Tuple
+
+# Log line patterns shared with GitHubActionsMonitor.extract_build_errors
+FILE_ERROR_PATTERN = re.compile(r'([/\\][\w/\\.-]+\.cs)(?:\((\d+),(\d+)\))?: error (\w+): (.*?)(?:\r?\n|$)')
+GENERAL_ERROR_PATTERN = re.compile(r'error (\w+): (.*?)(?:\r?\n|$)')
+FILE_ERROR_BYTES = re.compile(FILE_ERROR_PATTERN.pattern.encode())
+GENERAL_ERROR_BYTES = re.compile(GENERAL_ERROR_PATTERN.pattern.encode())
+
+LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+# Bytes a byte scan of a compressed member may hold at once. Reads are an eighth of it: the
+# decompressor buffers about a chunk, and joining a chunk to the carried-over line holds up to four
+SCAN_MEMORY_LIMIT = 16 * 1024 * 1024
+
+# (file, line, column, code, message) for located errors, (code, message) for general ones
+MemberMatches = Tuple[List[Tuple], List[Tuple]]
+
+# Archive opened by this worker process, reused across its tasks
+_open_archive: Optional[Tuple[Tuple, zipfile.ZipFile]] = None
+
+
+def scan_text(text: str) -> MemberMatches:
+    """
+    Find the build errors in a member's text.
+
+    Returns:
+        Tuple of (located matches, general matches); general matches are
+        only collected when the member has no located ones
+    """
+    located = [match.groups() for match in FILE_ERROR_PATTERN.finditer(text)]
+    general = [] if located else [match.groups() for match in GENERAL_ERROR_PATTERN.finditer(text)]
+    return located, general
+
+
+def scan_bytes(buffer, start: int = 0, end: Optional[int] = None) -> MemberMatches:
+    """
+    Find the build errors in a bytes-like buffer, decoding only the matched fields.
+
+    Args:
+        buffer: bytes or mmap holding the member
+        start: Offset where the member starts
+        end: Offset where the member ends
+
+    Returns:
+        Same as scan_text
+    """
+    end = len(buffer) if end is None else end
+
+    def decode(groups):
+        return tuple(group.decode("utf-8", errors="replace") if group is not None else None for group in groups)
+
+    located = [decode(match.groups()) for match in FILE_ERROR_BYTES.finditer(buffer, start, end)]
+    general = [] if located else [decode(match.groups()) for match in GENERAL_ERROR_BYTES.finditer(buffer, start, end)]
+    return located, general
+
+
+def scan_stream(stream, memory_limit: int = SCAN_MEMORY_LIMIT) -> MemberMatches:
+    """
+    Find the build errors in a binary stream, a chunk of whole lines at a time.
+
+    The partial line at the end of a chunk is carried over to the next one,
+    so matches never straddle chunks. Lines longer than a chunk are scanned
+    by their first chunk's worth of bytes only; the rest of them is skipped.
+
+    Args:
+        stream: Binary file object, e.g. an opened archive member
+        memory_limit: Bound on the bytes held at once, including the
+            decompressor's buffers
+
+    Returns:
+        Same as scan_text
+    """
+    chunk_size = max(memory_limit // 8, 1)
+    located, general = [], []
+    pending = b""
+    skipping = False
+
+    def scan(buffer, end):
+        member_located, member_general = scan_bytes(buffer, 0, end)
+        located.extend(member_located)
+        if not located:
+            general.extend(member_general)
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if skipping:
+            newline = chunk.find(b"\n")
+            if newline == -1:
+                continue
+            chunk = chunk[newline + 1:]
+            skipping = False
+        buffer = pending + chunk if pending else chunk
+        pending = chunk = None
+        end = buffer.rfind(b"\n") + 1
+        if end:
+            scan(buffer, end)
+        pending = buffer[end:]
+        buffer = None
+        if len(pending) > chunk_size:
+            scan(pending[:chunk_size] + b"\n", chunk_size + 1)
+            pending = b""
+            skipping = True
+    if pending:
+        scan(pending, len(pending))
+    return located, [] if located else general
+
+
+def _archive(path: str) -> zipfile.ZipFile:
+    global _open_archive
+    stat = os.stat(path)
+    key = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _open_archive is None or _open_archive[0] != key:
+        if _open_archive is not None:
+            _open_archive[1].close()
+        _open_archive = (key, zipfile.ZipFile(path))
+    return _open_archive[1]
+
+
+def _stored_data_offset(archive_file, info: zipfile.ZipInfo) -> int:
+    archive_file.seek(info.header_offset)
+    header = LOCAL_HEADER.unpack(archive_file.read(LOCAL_HEADER.size))
+    # File name and extra field lengths are the last two header fields
+    return info.header_offset + LOCAL_HEADER.size + header[-2] + header[-1]
+
+
+def scan_member(archive_path: str, name: str, byte_scan: bool = False,
+                memory_limit: int = SCAN_MEMORY_LIMIT) -> MemberMatches:
+    """
+    Scan one archive member; runs in a worker process.
+
+    Args:
+        archive_path: Path of the log archive on disk
+        name: Member name
+        byte_scan: Use bytes regexes instead of decoding the member
+        memory_limit: Bound on the bytes a byte scan of a compressed member holds at once
+
+    Returns:
+        Same as scan_text
+
+    Raises:
+        zipfile.BadZipFile, OSError: If the member can't be read
+    """
+    return _scan_info(_archive(archive_path), archive_path, name, byte_scan, memory_limit)
+
+
+def _scan_info(archive: zipfile.ZipFile, archive_path: str, name: str, byte_scan: bool,
+               memory_limit: int) -> MemberMatches:
+    info = archive.getinfo(name)
+    if not byte_scan:
+        return scan_text(archive.read(info).decode("utf-8", errors="replace"))
+
+    if info.compress_type == zipfile.ZIP_STORED and info.file_size:
+        with open(archive_path, "rb") as f:
+            start = _stored_data_offset(f, info)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return scan_bytes(mapped, start, start + info.file_size)
+    with archive.open(info) as member:
+        return scan_stream(member, memory_limit)
+
+
+def scan_archive(archive_path: str, executor: Optional[Executor] = None, byte_scan: bool = False,
+                 memory_limit: int = SCAN_MEMORY_LIMIT) -> MemberMatches:
+    """
+    Scan every member of a log archive and merge the results in member order.
+
+    Args:
+        archive_path: Path of the log archive on disk
+        executor: Pool the members are spread over (scanned in-process if None)
+        byte_scan: Use bytes regexes instead of decoding the members
+        memory_limit: Bound on the bytes a byte scan of a compressed member
+            holds at once, per process
+
+    Returns:
+        Tuple of (located matches, general matches); general matches are
+        only returned when no member had located ones
+
+    Raises:
+        zipfile.BadZipFile, OSError: If a member can't be read, rather than
+            returning the matches of the other members as the whole result
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if executor is None:
+            results = [_scan_info(archive, archive_path, info.filename, byte_scan, memory_limit)
+                       for info in members]
+
+    if executor is not None:
+        # Largest members first so one big job log doesn't finish last, then back to member order
+        by_size = sorted(range(len(members)), key=lambda i: -members[i].file_size)
+        futures = {i: executor.submit(scan_member, archive_path, members[i].filename, byte_scan,
+                                      memory_limit) for i in by_size}
+        try:
+            results = [futures[i].result() for i in range(len(members))]
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+    located = [match for member_located, _ in results for match in member_located]
+    general = [] if located else [match for _, member_general in results for match in member_general]
+    return located, general
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the GitHub Actions Monitor
+
+Micro-benchmarks comparing the monitor's hot paths against their previous
+implementations on synthetic build logs.
+
+Usage:
+    python bench_monitor.py classify [--errors 5000] [--noise 20] [--repeat 5]
+    python bench_monitor.py fix [--errors 40] [--classes 50] [--repeat 5]
+    python bench_monitor.py parallel [--members 64] [--errors 500] [--workers 1,2,4] [--byte-scan]
+    python bench_monitor.py e2e [--runs 20] [--log-size 2MB] [--errors-per-mb 20] [--workers 1]
+    python bench_monitor.py binlog [--log-size 20MB] [--errors-per-mb 20] [--repeat 3]
+
+The e2e benchmark drives the whole poll -> download -> extract -> fix loop
+against the offline fake GitHub API in fake_github.py.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import time
+import zipfile
+from typing import Callable, Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+from github_actions_monitor import ERROR_PATTERNS, GitHubActionsMonitor
+
+SAMPLE_ERRORS = [
+    ("CS1061", "'ClientListViewModel' does not contain a definition for 'Clients' and no accessible extension method 'Clients' accepting a first argument of type 'ClientListViewModel' could be found"),
+    ("CS0246", "The type or namespace name 'DisplayAttribute' could not be found (are you missing a using directive or an assembly reference?)"),
+    ("CS0266", "Cannot implicitly convert type 'decimal?' to 'decimal'. An explicit conversion exists (are you missing a cast?)"),
+    ("CS0117", "'Account' does not contain a definition for 'Balance'"),
+    ("CS0103", "The name 'journalEntry' does not exist in the current context"),
+    ("CS1002", "; expected"),
+]
+
+
+def legacy_extract_build_errors(log_content: str) -> List[Dict]:
+    """
+    The original extract_build_errors implementation, kept as a baseline.
+    """
+    errors = []
+    error_lines = re.findall(r'([/\\][\w/\\.-]+\.cs)(?:\((\d+),(\d+)\))?: error (\w+): (.*?)(?:\r?\n|$)', log_content)
+    for file_path, line_str, col_str, error_code, error_message in error_lines:
+        error = {
+            "code": error_code,
+            "message": error_message.strip(),
+            "file": file_path,
+            "line": int(line_str) if line_str and line_str.isdigit() else None,
+            "column": int(col_str) if col_str and col_str.isdigit() else None
+        }
+        for pattern, info in ERROR_PATTERNS.items():
+            if re.search(pattern, error_message) or re.search(pattern, f"error {error_code}: {error_message}"):
+                error["type"] = info["type"]
+                error["description"] = info["description"]
+                break
+        else:
+            error["type"] = "unknown"
+            error["description"] = "Unknown error type"
+        errors.append(error)
+    return errors
+
+
+class LegacyFixer:
+    """
+    The original one-error-at-a-time fixers, kept as a baseline.
+    """
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+
+    def fix_missing_property(self, error: Dict) -> bool:
+        """
+        Fix missing property in view model.
+        
+        Args:
+            error: Error object with details
+            
+        Returns:
+            True if fix was applied, False otherwise
+        """
+        if not error.get("file"):
+            # Try to extract file path from the error message
+            file_match = re.search(r'([/\\][\w/\\.-]+\.cs)', error["message"])
+            if file_match:
+                error["file"] = file_match.group(1)
+                # Convert to local path
+                error["file"] = error["file"].replace("/home/runner/work/AccountingModule/AccountingModule/", self.repo_path + "/")
+        
+        if not error.get("file") or not os.path.exists(error["file"]):
+            print(f"File not found: {error.get('file')}")
+            return False
+            
+        # Extract class name and property name
+        match = None
+        if error["type"] == "missing_definition" or error["type"] == "missing_property" or error["type"] == "missing_member":
+            match = re.search(r"'(\w+)' does not contain a definition for '(\w+)'", error["message"])
+            if not match:
+                match = re.search(r"'(\w+)' does not contain a definition for '(\w+)'", f"error {error['code']}: {error['message']}")
+        
+        if not match:
+            print(f"Could not extract class and property names from: {error['message']}")
+            return False
+            
+        class_name = match.group(1)
+        property_name = match.group(2)
+        
+        # Read the file
+        with open(error["file"], "r") as f:
+            content = f.read()
+        
+        # Find the class definition
+        class_pattern = rf"public\s+class\s+{class_name}"
+        class_match = re.search(class_pattern, content)
+        if not class_match:
+            print(f"Could not find class {class_name} in {error['file']}")
+            return False
+            
+        # Find the class closing brace
+        class_start = class_match.start()
+        brace_count = 0
+        class_end = -1
+        
+        for i in range(class_start, len(content)):
+            if content[i] == '{':
+                brace_count += 1
+            elif content[i] == '}':
+                brace_count -= 1
+                if brace_count == 0:
+                    class_end = i
+                    break
+        
+        if class_end == -1:
+            print(f"Could not find class end for {class_name} in {error['file']}")
+            return False
+        
+        # Determine property type based on name
+        property_type = "string"
+        if property_name.startswith("Is") or property_name.startswith("Has") or property_name.endswith("Enabled") or property_name.endswith("Active"):
+            property_type = "bool"
+        elif property_name.endswith("Id") or property_name.endswith("Count") or property_name.endswith("Number"):
+            property_type = "int"
+        elif property_name.endswith("Date") or property_name.endswith("Time"):
+            property_type = "DateTime"
+        elif property_name.endswith("Amount") or property_name.endswith("Price") or property_name.endswith("Value"):
+            property_type = "decimal"
+        elif property_name.startswith("Available") and property_name.endswith("s"):
+            # Collection property
+            item_type = property_name[9:-1]  # Remove "Available" and "s"
+            property_type = f"IEnumerable<{item_type}>"
+            
+            # Add using System.Collections.Generic if not present
+            if "using System.Collections.Generic;" not in content:
+                using_match = re.search(r"using [^;]+;", content)
+                if using_match:
+                    content = content[:using_match.end()] + "\nusing System.Collections.Generic;" + content[using_match.end():]
+        
+        # Add the missing property
+        property_code = f"""
+        [Display(Name = "{' '.join(re.findall('[A-Z][^A-Z]*', property_name))}")]
+        public {property_type} {property_name} {{ get; set; }}
+        """
+        
+        # Add using System.ComponentModel.DataAnnotations if not present and we're using Display attribute
+        if "using System.ComponentModel.DataAnnotations;" not in content and "[Display" in property_code:
+            using_match = re.search(r"using [^;]+;", content)
+            if using_match:
+                content = content[:using_match.end()] + "\nusing System.ComponentModel.DataAnnotations;" + content[using_match.end():]
+        
+        new_content = content[:class_end] + property_code + content[class_end:]
+        
+        # Write the updated content
+        with open(error["file"], "w") as f:
+            f.write(new_content)
+            
+        print(f"Added missing property '{property_name}' to class '{class_name}' in {error['file']}")
+        return True
+    
+    def fix_type_conversion(self, error: Dict) -> bool:
+        """
+        Fix type conversion errors by adding explicit casts.
+        
+        Args:
+            error: Error object with details
+            
+        Returns:
+            True if fix was applied, False otherwise
+        """
+        if not error.get("file"):
+            # Try to extract file path from the error message
+            file_match = re.search(r'([/\\][\w/\\.-]+\.cs)', error["message"])
+            if file_match:
+                error["file"] = file_match.group(1)
+                # Convert to local path
+                error["file"] = error["file"].replace("/home/runner/work/AccountingModule/AccountingModule/", self.repo_path + "/")
+        
+        if not error.get("file") or not os.path.exists(error["file"]):
+            print(f"File not found: {error.get('file')}")
+            return False
+        
+        # Extract source and target types
+        match = None
+        if error["type"] == "type_conversion" or error["type"] == "implicit_conversion":
+            match = re.search(r"Cannot implicitly convert type '([^']+)' to '([^']+)'", error["message"])
+            if not match:
+                match = re.search(r"Cannot implicitly convert type '([^']+)' to '([^']+)'", f"error {error['code']}: {error['message']}")
+        
+        if not match:
+            print(f"Could not extract type information from: {error['message']}")
+            return False
+        
+        source_type = match.group(1)
+        target_type = match.group(2)
+        
+        # Read the file
+        with open(error["file"], "r") as f:
+            content = f.read()
+        
+        # If we have line information, try to fix that specific line
+        if error.get("line") is not None:
+            lines = content.split('\n')
+            if 0 <= error["line"] - 1 < len(lines):
+                line = lines[error["line"] - 1]
+                
+                # Look for assignment patterns
+                assignment_match = re.search(r'(\w+)\s*=\s*([^;]+);', line)
+                if assignment_match:
+                    var_name = assignment_match.group(1)
+                    expression = assignment_match.group(2)
+                    
+                    # Add explicit cast
+                    new_line = line.replace(f"{var_name} = {expression}", f"{var_name} = ({target_type}){expression}")
+                    lines[error["line"] - 1] = new_line
+                    
+                    # Write the updated content
+                    with open(error["file"], "w") as f:
+                        f.write('\n'.join(lines))
+                    
+                    print(f"Added explicit cast to {target_type} in {error['file']} at line {error['line']}")
+                    return True
+        
+        print(f"Could not fix type conversion error in {error['file']}")
+        return False
+
+    def fix_errors(self, errors: List[Dict]) -> int:
+        fixes_applied = 0
+        for error in errors:
+            if error["type"] in ("missing_property", "missing_definition", "missing_member"):
+                fixes_applied += self.fix_missing_property(error)
+            elif error["type"] in ("type_conversion", "implicit_conversion"):
+                fixes_applied += self.fix_type_conversion(error)
+        return fixes_applied
+
+
+def make_view_model(class_count: int, properties: int = 20) -> str:
+    """
+    Build a synthetic view model file with the given number of classes.
+    """
+    # The legacy fixer computed the class end before inserting using directives,
+    # so it only produced correct output for files that already had them
+    lines = ["using System;", "using System.Collections.Generic;", "using System.ComponentModel.DataAnnotations;",
+             "", "namespace AccountingModule.ViewModels", "{"]
+    for c in range(class_count):
+        lines += [f"    public class ViewModel{c}", "    {"]
+        lines += [f"        public string Field{p} {{ get; set; }}" for p in range(properties)]
+        lines += ["    }", ""]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def make_missing_property_errors(path: str, count: int, class_count: int) -> List[Dict]:
+    suffixes = ["Name", "IsActive", "ClientId", "DueDate", "TotalAmount", "AvailableAccounts"]
+    return [{
+        "type": "missing_property",
+        "code": "CS1061",
+        "message": f"'ViewModel{i % class_count}' does not contain a definition for "
+                   f"'Extra{i}{suffixes[i % len(suffixes)]}'",
+        "file": path,
+        "line": None,
+        "column": None
+    } for i in range(count)]
+
+
+def make_log(error_count: int, noise_per_error: int = 20, seed: int = 1) -> str:
+    """
+    Build a synthetic dotnet build log with the given number of error lines.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(error_count):
+        for _ in range(noise_per_error):
+            lines.append(f"2025-05-29T00:00:00.0000000Z   Compiling module {rng.randint(0, 10**6)} ...")
+        code, message = rng.choice(SAMPLE_ERRORS)
+        # Vary identifiers so the classifier cache sees realistic diversity
+        message = message.replace("Clients", f"Clients{i % 97}")
+        lines.append(
+            f"2025-05-29T00:00:01.0000000Z /home/runner/work/AccountingModule/AccountingModule/"
+            f"Areas/Accounting/ViewModels/File{i % 13}.cs({i % 400 + 1},{i % 80 + 1}): error {code}: {message}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def time_best(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_classify(args: argparse.Namespace) -> None:
+    log_content = make_log(args.errors, args.noise)
+    monitor = GitHubActionsMonitor("fake_token", "owner/repo")
+
+    def current():
+        # A fresh classifier per run so the memo cache doesn't carry over
+        monitor.classifier.load(ERROR_PATTERNS)
+        return monitor.extract_build_errors(log_content)
+
+    # Fingerprints are the only field the legacy implementation didn't produce
+    if legacy_extract_build_errors(log_content) != [
+            {key: value for key, value in error.items() if key != "fingerprint"} for error in current()]:
+        print("Mismatch between legacy and current results")
+        sys.exit(1)
+
+    legacy = time_best(lambda: legacy_extract_build_errors(log_content), args.repeat)
+    new = time_best(current, args.repeat)
+    print(f"log size: {len(log_content) / 1e6:.1f} MB, errors: {args.errors}")
+    print(f"legacy:  {legacy * 1000:8.1f} ms")
+    print(f"current: {new * 1000:8.1f} ms  ({legacy / new:.1f}x)")
+
+
+def bench_fix(args: argparse.Namespace) -> None:
+    import tempfile
+    from fix_planner import FixPlanner
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "AccountingViewModels.cs")
+        original = make_view_model(args.classes)
+
+        def run(fix_errors):
+            with open(path, "w") as f:
+                f.write(original)
+            fix_errors(make_missing_property_errors(path, args.errors, args.classes))
+            with open(path, "r") as f:
+                return f.read()
+
+        def planned(errors):
+            planner = FixPlanner(temp_dir)
+            for error in errors:
+                planner.plan_missing_property(error)
+            planner.apply()
+
+        legacy_fixer = LegacyFixer(temp_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if run(legacy_fixer.fix_errors) != run(planned):
+                print("Mismatch between legacy and planned fixes")
+                sys.exit(1)
+            legacy = time_best(lambda: run(legacy_fixer.fix_errors), args.repeat)
+            new = time_best(lambda: run(planned), args.repeat)
+
+    print(f"file size: {len(original) / 1e3:.0f} KB, missing-property errors: {args.errors}")
+    print(f"legacy:  {legacy * 1000:8.1f} ms")
+    print(f"planned: {new * 1000:8.1f} ms  ({legacy / new:.1f}x)")
+
+
+def make_log_archive(path: str, members: int, error_count: int, noise_per_error: int = 20,
+                     compression: int = zipfile.ZIP_DEFLATED) -> None:
+    """
+    Write a synthetic run log archive with one build log per member, like a matrix build's.
+    """
+    with zipfile.ZipFile(path, "w", compression) as archive:
+        for i in range(members):
+            archive.writestr(f"build ({i})/{i + 1}_Build.txt", make_log(error_count, noise_per_error, seed=i))
+
+
+def bench_parallel(args: argparse.Namespace) -> None:
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    from archive_scanner import scan_archive
+
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    compression = zipfile.ZIP_STORED if args.stored else zipfile.ZIP_DEFLATED
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "logs.zip")
+        make_log_archive(path, args.members, args.errors, args.noise, compression)
+        expected = scan_archive(path)
+        print(f"archive: {os.path.getsize(path) / 1e6:.1f} MB, members: {args.members}, "
+              f"errors: {len(expected[0])}, byte scan: {args.byte_scan}, stored: {args.stored}")
+
+        baseline = None
+        for count in worker_counts:
+            pool = ProcessPoolExecutor(max_workers=count) if count > 1 else None
+            try:
+                if scan_archive(path, pool, args.byte_scan) != expected:
+                    print(f"Mismatch with {count} workers")
+                    sys.exit(1)
+                elapsed = time_best(lambda: scan_archive(path, pool, args.byte_scan), args.repeat)
+            finally:
+                if pool:
+                    pool.shutdown()
+            baseline = baseline or elapsed
+            print(f"{count:2d} worker{'s' if count != 1 else ' '}: {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.1f}x)")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of values (0 if empty).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process and its finished children, in MB.
+    """
+    import resource
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / scale
+
+
+def timed(func: Callable, samples: List[float]) -> Callable:
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def bench_e2e(args: argparse.Namespace) -> None:
+    import tempfile
+    from fake_github import FakeGitHub
+    from synthetic_logs import parse_size, write_log_archive, write_repo
+
+    repo = "owner/AccountingModule"
+    log_size = parse_size(args.log_size)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = os.path.join(temp_dir, "repo")
+        write_repo(repo_path)
+        archives = []
+        for variant in range(min(args.runs, args.variants)):
+            path = os.path.join(temp_dir, f"logs-{variant}.zip")
+            write_log_archive(path, log_size, args.errors_per_mb, args.members, seed=variant + 1)
+            archives.append(path)
+
+        fake = FakeGitHub(blob_latency=args.blob_latency).start()
+        try:
+            # A finished run for the monitor's first poll to record as its baseline
+            fake.add_run(repo, 1, conclusion="success")
+            monitor = GitHubActionsMonitor("fake-token", repo, repo_path=repo_path, api_url=fake.url,
+                                           workers=args.workers, byte_scan=args.byte_scan, run_workers=args.run_workers,
+                                           class_index_path=os.path.join(temp_dir, "class_index.json"))
+            # Commits and pushes are outside the benchmark
+            monitor.commit_and_push_fixes = lambda fixes_count: True
+            extract_times, fix_times = [], []
+            monitor.extract_run_errors = timed(monitor.extract_run_errors, extract_times)
+            monitor.fix_errors = timed(monitor.fix_errors, fix_times)
+
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                monitor.discover_runs()
+                monitor.client.reset_stats()
+                # One branch per run, so none of them supersedes another
+                for i in range(args.runs):
+                    fake.add_run(repo, i + 2, archives[i % len(archives)], head_branch=f"feature-{i}")
+
+                start = time.perf_counter()
+                processed = monitor.poll_once()
+                elapsed = time.perf_counter() - start
+            stats = monitor.client.reset_stats()
+            if monitor.scan_pool():
+                monitor.scan_pool().shutdown()
+            monitor.run_pool().shutdown()
+        finally:
+            fake.stop()
+
+    print(f"runs: {len(processed)}, log size: {log_size / 1e6:.1f} MB/run, errors/MB: {args.errors_per_mb}, "
+          f"workers: {args.workers}, run workers: {args.run_workers}, byte scan: {args.byte_scan}")
+    print(f"elapsed:    {elapsed:8.2f} s   ({len(processed) / elapsed:.2f} runs/s)")
+    print(f"downloaded: {stats['bytes'] / 1e6:8.1f} MB  ({stats['bytes'] / 1e6 / elapsed:.1f} MB/s, "
+          f"{stats['requests']} requests)")
+    for name, samples in (("extract", extract_times), ("fix", fix_times)):
+        print(f"{name + ':':11} p50 {percentile(samples, 0.5) * 1000:8.1f} ms  "
+              f"p95 {percentile(samples, 0.95) * 1000:8.1f} ms  p99 {percentile(samples, 0.99) * 1000:8.1f} ms")
+    print(f"peak RSS:   {peak_rss_mb():8.1f} MB")
+
+
+def bench_binlog(args: argparse.Namespace) -> None:
+    import tempfile
+    from fake_github import FakeGitHub
+    from synthetic_logs import parse_size, write_build_artifact, write_log_archive
+
+    repo = "owner/AccountingModule"
+    log_size = parse_size(args.log_size)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive = os.path.join(temp_dir, "logs.zip")
+        artifact = os.path.join(temp_dir, "build-logs.zip")
+        write_log_archive(archive, log_size, args.errors_per_mb, args.members)
+        write_build_artifact(artifact, log_size, args.errors_per_mb, args.members)
+
+        fake = FakeGitHub().start()
+        try:
+            fake.add_run(repo, 1, archive, artifacts={"build-logs-1": artifact})
+            results = {}
+            for source in ("logs", "binlog"):
+                monitor = GitHubActionsMonitor("fake-token", repo, api_url=fake.url, error_source=source,
+                                               class_index_path=os.path.join(temp_dir, "class_index.json"))
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    errors = monitor.extract_run_errors(1)
+                    monitor.client.reset_stats()
+                    elapsed = time_best(lambda: monitor.extract_run_errors(1), args.repeat)
+                downloaded = monitor.client.reset_stats()["bytes"] / args.repeat
+                results[source] = (errors, elapsed, downloaded)
+        finally:
+            fake.stop()
+
+    def fields(errors):
+        return [(e["code"], e["file"], e["line"], e["column"], e["message"]) for e in errors]
+
+    if fields(results["logs"][0]) != fields(results["binlog"][0]):
+        print("Mismatch between text log and binary log errors")
+        sys.exit(1)
+    print(f"log size: {log_size / 1e6:.1f} MB, errors: {len(results['logs'][0])}")
+    baseline = results["logs"][1]
+    for source, (_, elapsed, downloaded) in results.items():
+        print(f"{source + ':':8} {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.1f}x)  "
+              f"downloaded {downloaded / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GitHub Actions monitor")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    classify = subparsers.add_parser("classify", help="Error extraction and classification")
+    classify.add_argument("--errors", type=int, default=5000, help="Number of error lines in the log")
+    classify.add_argument("--noise", type=int, default=20, help="Non-error lines per error line")
+    classify.add_argument("--repeat", type=int, default=5, help="Number of timed repetitions")
+    classify.set_defaults(func=bench_classify)
+
+    fix = subparsers.add_parser("fix", help="Applying many fixes to one file")
+    fix.add_argument("--errors", type=int, default=40, help="Number of missing-property errors")
+    fix.add_argument("--classes", type=int, default=50, help="Number of classes in the file")
+    fix.add_argument("--repeat", type=int, default=5, help="Number of timed repetitions")
+    fix.set_defaults(func=bench_fix)
+
+    parallel = subparsers.add_parser("parallel", help="Scanning a large log archive with a process pool")
+    parallel.add_argument("--members", type=int, default=64, help="Number of log files in the archive")
+    parallel.add_argument("--errors", type=int, default=500, help="Number of error lines per log file")
+    parallel.add_argument("--noise", type=int, default=20, help="Non-error lines per error line")
+    parallel.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to compare")
+    parallel.add_argument("--byte-scan", action="store_true", help="Scan members as bytes")
+    parallel.add_argument("--stored", action="store_true", help="Store members uncompressed (mmap'd when byte scanning)")
+    parallel.add_argument("--repeat", type=int, default=3, help="Number of timed repetitions")
+    parallel.set_defaults(func=bench_parallel)
+
+    e2e = subparsers.add_parser("e2e", help="Full monitoring loop against the offline fake GitHub API")
+    e2e.add_argument("--runs", type=int, default=20, help="Number of failed runs to process")
+    e2e.add_argument("--log-size", default="2MB", help="Uncompressed log size per run, e.g. 512KB, 50MB, 1GB")
+    e2e.add_argument("--errors-per-mb", type=float, default=20, help="Error lines per MB of log")
+    e2e.add_argument("--members", type=int, default=4, help="Job logs per run archive")
+    e2e.add_argument("--variants", type=int, default=4, help="Distinct archives generated and shared by the runs")
+    e2e.add_argument("--workers", type=int, default=1, help="Processes scanning each log archive")
+    e2e.add_argument("--byte-scan", action="store_true", help="Scan log archive members as bytes")
+    e2e.add_argument("--run-workers", type=int, default=4, help="Runs processed at the same time")
+    e2e.add_argument("--blob-latency", type=float, default=0.2, help="Seconds before each log download starts")
+    e2e.set_defaults(func=bench_e2e)
+    
+    binlog = subparsers.add_parser("binlog", help="Errors from the text logs versus the binary log artifact")
+    binlog.add_argument("--log-size", default="20MB", help="Uncompressed text log size, e.g. 512KB, 50MB")
+    binlog.add_argument("--errors-per-mb", type=float, default=20, help="Error lines per MB of log")
+    binlog.add_argument("--members", type=int, default=4, help="Job logs in the text log archive")
+    binlog.add_argument("--repeat", type=int, default=3, help="Number of timed repetitions")
+    binlog.set_defaults(func=bench_binlog)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
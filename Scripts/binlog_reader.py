@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+MSBuild Binary Log Reader
+
+Reads the error and warning records of an MSBuild binary log
+(dotnet build -bl), which carry the exact code, file, line and column of
+every diagnostic, so no text scraping is needed.
+
+A binlog is a gzip stream holding a header (file format version and
+minimum reader version, 32-bit little-endian) and a sequence of records.
+From format version 18 on, every record is its kind and length followed
+by that many bytes, both 7-bit encoded integers, so records other than
+diagnostics and strings are skipped without being parsed. Strings are
+written once as String records, whose payload is the UTF-8 text, and
+referenced by index afterwards.
+
+The log is decompressed and parsed as a stream; only the string table
+is kept in memory.
+
+Usage:
+    python binlog_reader.py build.binlog [--warnings]
+"""
+
+import argparse
+import gzip
+import ntpath
+import posixpath
+import re
+import struct
+import zipfile
+from collections import namedtuple
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+MIN_FORMAT_VERSION = 18  # first version with length-prefixed records
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Record kinds
+RECORD_END_OF_FILE = 0
+RECORD_ERROR = 9
+RECORD_WARNING = 10
+RECORD_NAME_VALUE_LIST = 23
+RECORD_STRING = 24
+
+# Fields present in an event record
+FIELD_BUILD_EVENT_CONTEXT = 1
+FIELD_HELP_KEYWORD = 2
+FIELD_MESSAGE = 4
+FIELD_SENDER_NAME = 8
+FIELD_THREAD_ID = 16
+FIELD_TIMESTAMP = 32
+FIELD_SUBCATEGORY = 1 << 6
+FIELD_CODE = 1 << 7
+FIELD_FILE = 1 << 8
+FIELD_PROJECT_FILE = 1 << 9
+FIELD_LINE_NUMBER = 1 << 10
+FIELD_COLUMN_NUMBER = 1 << 11
+FIELD_END_LINE_NUMBER = 1 << 12
+FIELD_END_COLUMN_NUMBER = 1 << 13
+FIELD_ARGUMENTS = 1 << 14
+FIELD_IMPORTANCE = 1 << 15
+FIELD_EXTENDED = 1 << 16
+
+# String references: 0 is null, 1 is "", String records are numbered from 10
+STRING_START_INDEX = 10
+BUILD_EVENT_CONTEXT_FIELDS = 7
+
+# "{0}" placeholders of messages logged with arguments
+ARGUMENT_PATTERN = re.compile(r"\{(\d+)(?:[,:][^}]*)?\}")
+
+Diagnostic = namedtuple("Diagnostic", "severity code message file project_file line column end_line end_column subcategory")
+
+
+class BinlogFormatError(ValueError):
+    """The stream is not a binary log this reader understands."""
+
+
+class _RecordStream:
+    """
+    Buffered reader of 7-bit integers and byte runs from a decompressed stream.
+    """
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.buffer = b""
+        self.pos = 0
+
+    def _fill(self, size: int) -> bool:
+        # Keep the unread tail and append chunks until size bytes are available
+        if self.pos + size <= len(self.buffer):
+            return True
+        parts = [self.buffer[self.pos:]]
+        available = len(parts[0])
+        while available < size:
+            chunk = self.raw.read(max(READ_CHUNK_SIZE, size - available))
+            if not chunk:
+                break
+            parts.append(chunk)
+            available += len(chunk)
+        self.buffer = b"".join(parts)
+        self.pos = 0
+        return available >= size
+
+    def read(self, size: int) -> bytes:
+        if not self._fill(size):
+            raise BinlogFormatError("Unexpected end of binary log")
+        data = self.buffer[self.pos:self.pos + size]
+        self.pos += size
+        return data
+
+    def skip(self, size: int) -> None:
+        buffered = len(self.buffer) - self.pos
+        if size <= buffered:
+            self.pos += size
+            return
+        # Large records are read through without growing the buffer
+        size -= buffered
+        self.buffer, self.pos = b"", 0
+        while size:
+            chunk = self.raw.read(min(size, READ_CHUNK_SIZE))
+            if not chunk:
+                raise BinlogFormatError("Unexpected end of binary log")
+            size -= len(chunk)
+
+    def read_int(self) -> Optional[int]:
+        """
+        Read a 7-bit encoded integer, or None at the end of the stream.
+        """
+        if not self._fill(5) and self.pos >= len(self.buffer):
+            return None
+        value, self.pos = _read_int(self.buffer, self.pos)
+        return value
+
+
+def _read_int(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Decode a 7-bit encoded 32-bit integer, returning it with the position after it.
+    """
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise BinlogFormatError("Truncated integer in binary log")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+        if shift > 28:
+            raise BinlogFormatError("Integer too long in binary log")
+    # Negative values are written as their unsigned 32-bit form
+    if result >= 1 << 31:
+        result -= 1 << 32
+    return result, pos
+
+
+class BinlogReader:
+    def __init__(self, stream: BinaryIO, warnings: bool = False):
+        """
+        Read diagnostics from a binary log.
+
+        Args:
+            stream: Binary file object with the gzip-compressed log
+            warnings: Also yield warnings, not only errors
+        """
+        self.stream = _RecordStream(gzip.GzipFile(fileobj=stream, mode="rb"))
+        self.warnings = warnings
+        self.version = None
+        self.strings: List[bytes] = []
+        self.records = 0
+
+    def _read_header(self) -> None:
+        try:
+            self.version, = struct.unpack("<i", self.stream.read(4))
+            if self.version < MIN_FORMAT_VERSION:
+                raise BinlogFormatError(f"Unsupported binary log format version {self.version}")
+            minimum_reader_version, = struct.unpack("<i", self.stream.read(4))
+        except (OSError, EOFError) as e:
+            raise BinlogFormatError(f"Not a binary log: {e}") from e
+        if not 0 < minimum_reader_version <= self.version:
+            raise BinlogFormatError(f"Invalid minimum reader version {minimum_reader_version}")
+
+    def __iter__(self) -> Iterator[Diagnostic]:
+        """
+        Yield diagnostics in log order.
+        """
+        stream = self.stream
+        self._read_header()
+        wanted = (RECORD_ERROR, RECORD_WARNING) if self.warnings else (RECORD_ERROR,)
+        strings = self.strings
+        try:
+            while True:
+                # Records are parsed straight from the buffer; the stream only refills it
+                if len(stream.buffer) - stream.pos < 10:
+                    stream._fill(10)
+                buffer, pos = stream.buffer, stream.pos
+                if pos >= len(buffer):
+                    return
+                # Kinds and most lengths fit in one byte
+                kind = buffer[pos]
+                if kind < 0x80:
+                    pos += 1
+                else:
+                    kind, pos = _read_int(buffer, pos)
+                if kind == RECORD_END_OF_FILE:
+                    return
+                length = buffer[pos] if pos < len(buffer) else 0x80
+                if length < 0x80:
+                    pos += 1
+                else:
+                    length, pos = _read_int(buffer, pos)
+                    if length < 0:
+                        raise BinlogFormatError("Invalid record length in binary log")
+                self.records += 1
+                end = pos + length
+                if kind == RECORD_STRING or kind in wanted:
+                    if end <= len(buffer):
+                        data = buffer[pos:end]
+                        stream.pos = end
+                    else:
+                        stream.pos = pos
+                        data = stream.read(length)
+                    if kind != RECORD_STRING:
+                        yield self._read_diagnostic(kind, data)
+                        continue
+                    # The record length doubles as the length of the UTF-8 text
+                    strings.append(data)
+                elif end <= len(buffer):
+                    stream.pos = end
+                else:
+                    stream.pos = pos
+                    stream.skip(length)
+        except (OSError, EOFError) as e:
+            raise BinlogFormatError(f"Corrupt binary log: {e}") from e
+
+    def _string(self, index: int) -> Optional[str]:
+        if index == 0:
+            return None
+        if index == 1:
+            return ""
+        index -= STRING_START_INDEX
+        if not 0 <= index < len(self.strings):
+            raise BinlogFormatError(f"Unknown string reference {index + STRING_START_INDEX}")
+        return self.strings[index].decode("utf-8", errors="replace")
+
+    def _read_diagnostic(self, kind: int, data: bytes) -> Diagnostic:
+        flags, pos = _read_int(data, 0)
+        message = None
+        if flags & FIELD_MESSAGE:
+            index, pos = _read_int(data, pos)
+            message = self._string(index)
+        if flags & FIELD_BUILD_EVENT_CONTEXT:
+            for _ in range(BUILD_EVENT_CONTEXT_FIELDS):
+                _, pos = _read_int(data, pos)
+        if flags & FIELD_THREAD_ID:
+            _, pos = _read_int(data, pos)
+        for flag in (FIELD_HELP_KEYWORD, FIELD_SENDER_NAME):
+            if flags & flag:
+                _, pos = _read_int(data, pos)
+        if flags & FIELD_TIMESTAMP:
+            # Ticks as a fixed 64-bit integer, then the DateTimeKind
+            _, pos = _read_int(data, pos + 8)
+        # Generic location fields; diagnostics carry theirs after the common fields instead
+        for flag in (FIELD_SUBCATEGORY, FIELD_CODE, FIELD_FILE, FIELD_PROJECT_FILE, FIELD_LINE_NUMBER,
+                     FIELD_COLUMN_NUMBER, FIELD_END_LINE_NUMBER, FIELD_END_COLUMN_NUMBER):
+            if flags & flag:
+                _, pos = _read_int(data, pos)
+        if flags & FIELD_ARGUMENTS:
+            count, pos = _read_int(data, pos)
+            arguments = []
+            for _ in range(count):
+                index, pos = _read_int(data, pos)
+                arguments.append(self._string(index))
+            message = format_message(message, arguments)
+        if flags & FIELD_IMPORTANCE:
+            _, pos = _read_int(data, pos)
+        if flags & FIELD_EXTENDED:
+            # Extended type, metadata (a NameValueList reference) and data
+            for _ in range(3):
+                _, pos = _read_int(data, pos)
+
+        fields = []
+        for _ in range(4):
+            index, pos = _read_int(data, pos)
+            fields.append(self._string(index))
+        numbers = []
+        for _ in range(4):
+            number, pos = _read_int(data, pos)
+            numbers.append(number)
+        subcategory, code, file, project_file = fields
+        return Diagnostic("error" if kind == RECORD_ERROR else "warning", code, message or "", file, project_file,
+                          *numbers, subcategory)
+
+
+def format_message(template: Optional[str], arguments: List[Optional[str]]) -> Optional[str]:
+    """
+    Fill a message's "{0}" placeholders with its arguments.
+    """
+    if template is None:
+        return None
+
+    def argument(match):
+        index = int(match.group(1))
+        if index >= len(arguments):
+            return match.group(0)
+        return arguments[index] or ""
+
+    return ARGUMENT_PATTERN.sub(argument, template)
+
+
+def diagnostic_path(diagnostic: Diagnostic) -> Optional[str]:
+    """
+    The file a diagnostic refers to, resolving paths relative to its project.
+    """
+    path = diagnostic.file
+    if not path or not diagnostic.project_file or posixpath.isabs(path) or ntpath.isabs(path):
+        return path
+    module = ntpath if "\\" in diagnostic.project_file else posixpath
+    return module.join(module.dirname(diagnostic.project_file), module.normpath(path))
+
+
+def iter_binlog_diagnostics(stream: BinaryIO, warnings: bool = False) -> Iterator[Diagnostic]:
+    """
+    Stream the diagnostics of a binary log; see BinlogReader.
+    """
+    return iter(BinlogReader(stream, warnings))
+
+
+def read_binlog(path: str, warnings: bool = False) -> List[Diagnostic]:
+    """
+    Read every diagnostic of a binary log file.
+    """
+    with open(path, "rb") as f:
+        return list(iter_binlog_diagnostics(f, warnings))
+
+
+def iter_artifact_diagnostics(archive: BinaryIO, warnings: bool = False) -> Iterator[Diagnostic]:
+    """
+    Stream the diagnostics of every binary log in a build artifact zip.
+
+    Args:
+        archive: Seekable binary file object with the artifact zip
+        warnings: Also yield warnings
+
+    Yields:
+        Diagnostics, one binary log after the other
+    """
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".binlog"):
+                continue
+            with zf.open(info) as member:
+                yield from iter_binlog_diagnostics(member, warnings)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Print the errors of an MSBuild binary log")
+    parser.add_argument("path", help="Binary log, or an artifact zip containing binary logs")
+    parser.add_argument("--warnings", action="store_true", help="Print warnings as well")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "rb") as f:
+        is_artifact = zipfile.is_zipfile(f)
+        f.seek(0)
+        diagnostics = (iter_artifact_diagnostics(f, args.warnings) if is_artifact
+                       else iter_binlog_diagnostics(f, args.warnings))
+        try:
+            for d in diagnostics:
+                location = f"{d.file}({d.line},{d.column}): " if d.file else ""
+                print(f"{location}{d.severity} {d.code}: {d.message}")
+        except BinlogFormatError as e:
+            parser.exit(1, f"{args.path}: {e}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+C# Class Location Index
+
+Maps every class, record, struct and interface declared in a checkout to
+the file, namespace and brace span that declares it. Compiler errors such
+as CS1061 are reported where a type is used, not where it is declared, so
+fixers look the declaring file up here instead of rescanning the repo.
+
+The index is persisted as JSON and refreshed incrementally: files whose
+size and mtime are unchanged are trusted, files whose mtime changed are
+re-hashed, and only files whose content changed are parsed again.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+INDEX_VERSION = 1
+SKIPPED_DIRS = {".git", ".vs", ".cache", "bin", "obj", "node_modules"}
+
+DECLARATION_PATTERN = re.compile(
+    r"^[ \t]*(?:(?:public|internal|private|protected|static|sealed|abstract|partial|readonly|ref|unsafe|new|file)\s+)*"
+    r"(record\s+(?:class|struct)|record|class|struct|interface)\s+(\w+)",
+    re.MULTILINE
+)
+NAMESPACE_PATTERN = re.compile(r"^[ \t]*namespace\s+([\w.]+)\s*([;{])", re.MULTILINE)
+
+# open_brace and close_brace are -1 for declarations without a body, e.g. positional records
+ClassLocation = namedtuple("ClassLocation", "path name kind namespace partial start open_brace close_brace")
+
+
+def match_braces(content: str) -> Dict[int, int]:
+    """
+    Match every opening brace to its closing brace in a single pass.
+
+    Args:
+        content: Source text
+
+    Returns:
+        Dictionary mapping each "{" offset to its matching "}" offset
+    """
+    pairs = {}
+    stack = []
+    for match in re.finditer(r"[{}]", content):
+        if match.group() == "{":
+            stack.append(match.start())
+        elif stack:
+            pairs[stack.pop()] = match.start()
+    return pairs
+
+
+def parse_declarations(content: str, path: str = "", brace_pairs: Optional[Dict[int, int]] = None) -> List[ClassLocation]:
+    """
+    Find the type declarations in a C# source file.
+
+    Args:
+        content: Source text
+        path: File path recorded in the results
+        brace_pairs: Result of match_braces, if already computed
+
+    Returns:
+        Declarations in source order
+    """
+    if brace_pairs is None:
+        brace_pairs = match_braces(content)
+
+    file_namespace = ""
+    namespace_blocks = []
+    for match in NAMESPACE_PATTERN.finditer(content):
+        if match.group(2) == ";":
+            file_namespace = match.group(1)
+        else:
+            open_brace = match.end() - 1
+            namespace_blocks.append((open_brace, brace_pairs.get(open_brace, len(content)), match.group(1)))
+
+    declarations = []
+    for match in DECLARATION_PATTERN.finditer(content):
+        open_brace = content.find("{", match.end())
+        semicolon = content.find(";", match.end())
+        if open_brace == -1 or (semicolon != -1 and semicolon < open_brace):
+            open_brace = close_brace = -1
+        else:
+            close_brace = brace_pairs.get(open_brace, -1)
+
+        enclosing = [name for start, end, name in namespace_blocks if start < match.start() < end]
+        namespace = ".".join(enclosing) if enclosing else file_namespace
+        declarations.append(ClassLocation(
+            path, match.group(2), " ".join(match.group(1).split()), namespace,
+            "partial" in match.group(0).split(), match.start(), open_brace, close_brace
+        ))
+    return declarations
+
+
+class ClassIndex:
+    def __init__(self, repo_path: str, index_path: Optional[str] = None):
+        """
+        Initialize the index, loading the persisted copy if there is one.
+
+        Args:
+            repo_path: Checkout to index
+            index_path: JSON file the index is persisted to (not persisted if None)
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        self.index_path = index_path
+        self.files: Dict[str, Dict] = {}
+        self._by_name: Dict[str, List[ClassLocation]] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """
+        Load the persisted index, discarding it if unreadable or outdated.
+        """
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable class index {self.index_path}: {e}")
+            return
+        if data.get("version") == INDEX_VERSION and data.get("repo_path") == self.repo_path:
+            self.files = data["files"]
+            self._rebuild_lookup()
+
+    def save(self) -> None:
+        """
+        Persist the index if it changed since it was loaded or last saved.
+        """
+        if not self.index_path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "repo_path": self.repo_path, "files": self.files}, f)
+        os.replace(temp_path, self.index_path)
+        self._dirty = False
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the checkout.
+
+        Returns:
+            Number of files that were parsed again
+        """
+        seen = set()
+        parsed = 0
+        for root, dirs, files in os.walk(self.repo_path):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+            for name in files:
+                if name.endswith(".cs"):
+                    relative = os.path.relpath(os.path.join(root, name), self.repo_path)
+                    seen.add(relative)
+                    parsed += self._refresh_entry(relative)
+
+        for relative in set(self.files) - seen:
+            del self.files[relative]
+            self._dirty = True
+
+        if parsed or self._dirty:
+            self._rebuild_lookup()
+        self.save()
+        return parsed
+
+    def refresh_file(self, path: str) -> None:
+        """
+        Update the entry of a single file, e.g. right after a fixer wrote it.
+        Files that are not indexed yet are picked up by the next refresh().
+
+        Args:
+            path: Path of the file
+        """
+        relative = os.path.relpath(os.path.abspath(path), self.repo_path)
+        if relative not in self.files:
+            return
+        if os.path.exists(path):
+            if self._refresh_entry(relative):
+                self._rebuild_lookup()
+        else:
+            del self.files[relative]
+            self._dirty = True
+            self._rebuild_lookup()
+
+    def _refresh_entry(self, relative: str) -> int:
+        path = os.path.join(self.repo_path, relative)
+        stat = os.stat(path)
+        entry = self.files.get(relative)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return 0
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        self._dirty = True
+        if entry and entry["sha1"] == digest:
+            entry["mtime"] = stat.st_mtime
+            return 0
+
+        # Offsets are character offsets into the text the fixers read
+        content = data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+        self.files[relative] = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "sha1": digest,
+            "classes": [list(location[1:]) for location in parse_declarations(content)],
+        }
+        return 1
+
+    def _rebuild_lookup(self) -> None:
+        by_name: Dict[str, List[ClassLocation]] = {}
+        for relative, entry in sorted(self.files.items()):
+            path = os.path.join(self.repo_path, relative)
+            for fields in entry["classes"]:
+                location = ClassLocation(path, *fields)
+                by_name.setdefault(location.name, []).append(location)
+        self._by_name = by_name
+
+    def lookup(self, name: str) -> List[ClassLocation]:
+        """
+        Find where a type is declared.
+
+        Args:
+            name: Type name without namespace
+
+        Returns:
+            Declarations of the type (several for partial classes or name clashes)
+        """
+        return self._by_name.get(name, [])
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Compiled Build Error Classifier
+
+This module classifies compiler error messages against the monitor's
+ERROR_PATTERNS table. All patterns are compiled once, grouped by the
+CSxxxx code they require, and folded into a single combined matcher per
+code so that each error line is classified in one regex call.
+
+The result is identical to trying every pattern in order against both the
+bare message and "error <code>: <message>": the first pattern that matches
+wins, otherwise the error is reported as unknown.
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+UNKNOWN_TYPE = ("unknown", "Unknown error type")
+
+# Patterns written as "error CS1061: ..." can only match errors with that code
+CODE_PREFIX = re.compile(r"^error (CS\d+): ")
+
+# Constructs whose meaning depends on where the subject string starts
+POSITION_SENSITIVE = re.compile(r"(?<!\[)\^|\\A|\(\?<[=!]")
+
+# Constructs that cannot be folded into a combined pattern; named groups would clash across patterns
+NOT_COMBINABLE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?[aiLmsux]+\)")
+
+
+class ErrorClassifier:
+    def __init__(self, patterns: Dict[str, Dict[str, str]], cache_size: int = 4096):
+        """
+        Compile the error patterns.
+
+        Args:
+            patterns: Mapping of regex source to {"type", "description"} in priority order
+            cache_size: Maximum number of (code, message) results to memoize
+        """
+        self.cache_size = cache_size
+        self._entries: List[Tuple[str, Pattern, Tuple[str, str]]] = []
+        self._cache: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._matchers: Dict[Optional[str], Optional[Pattern]] = {}
+        self._sequential = False
+        self.load(patterns)
+
+    def load(self, patterns: Dict[str, Dict[str, str]]) -> int:
+        """
+        Replace the pattern table, reusing compiled regexes that did not change.
+
+        Args:
+            patterns: Mapping of regex source to {"type", "description"} in priority order
+
+        Returns:
+            Number of patterns that had to be compiled
+        """
+        compiled = {source: regex for source, regex, _ in self._entries}
+        new_count = sum(1 for source in patterns if source not in compiled)
+        self._entries = [
+            (source, compiled.get(source) or re.compile(source), (info["type"], info["description"]))
+            for source, info in patterns.items()
+        ]
+        self._cache.clear()
+        self._matchers.clear()
+        # Identifies the table, so results stored elsewhere can be invalidated when it changes
+        self.version = hashlib.sha1(json.dumps(
+            [(source, info) for source, _, info in self._entries]
+        ).encode()).hexdigest()[:12]
+        # Combined matching runs against "error <code>: <message>" only, which
+        # is only equivalent when no pattern cares where the subject starts
+        self._sequential = any(
+            POSITION_SENSITIVE.search(source) or NOT_COMBINABLE.search(source)
+            for source, _, _ in self._entries
+        )
+        return new_count
+
+    def reloaded(self, patterns: Dict[str, Dict[str, str]]) -> Tuple["ErrorClassifier", int]:
+        """
+        Build a classifier for a new pattern table, reusing this one's
+        compiled regexes. Unlike load, this classifier is left untouched, so
+        threads still classifying with it are unaffected.
+
+        Args:
+            patterns: Mapping of regex source to {"type", "description"} in priority order
+
+        Returns:
+            Tuple of (new classifier, number of patterns compiled for it)
+        """
+        classifier = ErrorClassifier({}, self.cache_size)
+        classifier._entries = self._entries
+        return classifier, classifier.load(patterns)
+
+    def classify(self, code: str, message: str) -> Tuple[str, str]:
+        """
+        Classify a single compiler error.
+
+        Args:
+            code: Compiler error code (e.g. CS1061)
+            message: Error message without the "error <code>:" prefix
+
+        Returns:
+            Tuple of (type, description)
+        """
+        key = (code, message)
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+
+        if self._sequential:
+            result = self._classify_sequential(code, message)
+        else:
+            # A message quoting another "error CSxxxx:" could satisfy patterns
+            # of a different code, so only dispatch on the code when it can't
+            dispatch = None if "error " in message else code
+            matcher = self._matcher_for(dispatch)
+            result = UNKNOWN_TYPE
+            if matcher is not None:
+                match = matcher.match(f"error {code}: {message}")
+                if match:
+                    result = self._entries[int(match.lastgroup[2:])][2]
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def _classify_sequential(self, code: str, message: str) -> Tuple[str, str]:
+        prefixed = f"error {code}: {message}"
+        for _, regex, result in self._entries:
+            if regex.search(message) or regex.search(prefixed):
+                return result
+        return UNKNOWN_TYPE
+
+    def _matcher_for(self, code: Optional[str]) -> Optional[Pattern]:
+        if code in self._matchers:
+            return self._matchers[code]
+
+        alternatives = []
+        for index, (source, _, _) in enumerate(self._entries):
+            required = CODE_PREFIX.match(source)
+            if code is not None and required and required.group(1) != code:
+                continue
+            # Each alternative is a lookahead, so alternatives are tried in
+            # priority order and each one may match anywhere in the subject
+            alternatives.append(rf"(?=[\s\S]*?(?:{source}))(?P<_p{index}>)")
+
+        matcher = re.compile("|".join(alternatives)) if alternatives else None
+        self._matchers[code] = matcher
+        return matcher
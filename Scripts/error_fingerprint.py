@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Build Error Fingerprints
+
+A run's log archive holds both per-step logs and combined job logs, and
+MSBuild repeats every error in its build summary, so the same error shows
+up several times in one run. A fingerprint identifies an error by its
+code, file (relative to the checkout), line and message, ignoring where
+the runner checked the repository out and the project suffix MSBuild
+appends to summary lines, so repeats collapse to one error.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, Iterator, Optional
+
+# Checkout root on Linux ("/home/runner/work/<repo>/<repo>/") and Windows ("D:\a\<repo>\<repo>\") runners
+RUNNER_ROOT_PATTERN = re.compile(r"^(?:/home/runner/work|[A-Za-z]:[\\/]a)[\\/][^\\/]+[\\/][^\\/]+[\\/]")
+# " [/path/to/Project.csproj]" appended by MSBuild
+PROJECT_SUFFIX_PATTERN = re.compile(r"\s*\[[^\]]*\.\w+proj\]\s*$")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_path(path: Optional[str]) -> str:
+    """
+    Make a file path from a build log comparable across runners and log files.
+    """
+    if not path:
+        return ""
+    return RUNNER_ROOT_PATTERN.sub("", path).replace("\\", "/")
+
+
+def normalize_message(message: str) -> str:
+    message = message.strip()
+    # Cheap checks first: this runs for every error of every log
+    if message.endswith("]"):
+        message = PROJECT_SUFFIX_PATTERN.sub("", message)
+    if "  " in message or "\t" in message:
+        message = WHITESPACE_PATTERN.sub(" ", message)
+    return message
+
+
+def error_fingerprint(error: Dict) -> str:
+    """
+    Compute a stable fingerprint of a build error.
+
+    Args:
+        error: Error object with code, message, file and line
+
+    Returns:
+        Hex fingerprint
+    """
+    key = "|".join((error.get("code") or "", normalize_path(error.get("file")),
+                    str(error.get("line") or ""), normalize_message(error.get("message") or "")))
+    return hashlib.sha1(key.encode("utf-8", errors="replace")).hexdigest()[:16]
+
+
+def unique_errors(errors: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Drop repeats of errors already seen, tagging each error with its "fingerprint".
+
+    Args:
+        errors: Error objects in log order
+
+    Yields:
+        The first occurrence of each error
+    """
+    seen = set()
+    for error in errors:
+        fingerprint = error.get("fingerprint") or error_fingerprint(error)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        error["fingerprint"] = fingerprint
+        yield error
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Offline Fake GitHub API
+
+A local stand-in for the parts of the GitHub REST API the monitor uses,
+for end-to-end tests and benchmarks without network access or tokens:
+
+    GET /repos/{owner}/{repo}/actions/runs              (status, created, per_page; ETag aware)
+    GET /repos/{owner}/{repo}/actions/runs/{id}
+    GET /repos/{owner}/{repo}/actions/runs/{id}/logs    302 to /blobs/..., like GitHub's pre-signed URLs
+    GET /repos/{owner}/{repo}/actions/runs/{id}/jobs
+    GET /repos/{owner}/{repo}/actions/jobs/{id}/logs    302 to /blobs/...
+    GET /repos/{owner}/{repo}/actions/runs/{id}/artifacts   (name)
+    GET /repos/{owner}/{repo}/actions/artifacts/{id}/zip   302 to /blobs/...
+    GET /repos/{owner}/{repo}/check-runs/{id}/annotations   (per_page, page)
+    POST /graphql   the monitor's annotations query: nodes(ids) of check suites
+
+Every API response carries X-RateLimit-* headers; 304s don't use up the
+limit, as on GitHub. Blob downloads must not carry the Authorization
+header and are streamed from disk, so multi-GB archives can be served.
+
+Usage:
+    python fake_github.py --port 8765 --repo owner/repo --archive logs.zip --runs 5
+    python github_actions_monitor.py --token x --repo owner/repo --api-url http://127.0.0.1:8765
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+RATE_LIMIT = 5000
+ANNOTATIONS_ROUTE = re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/check-runs/(?P<job_id>\d+)/annotations$")
+API_ROUTE = re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/actions/(?:runs(?:/(?P<run_id>\d+)(?:/(?P<what>logs|jobs|artifacts))?)?"
+                       r"|jobs/(?P<job_id>\d+)/logs|artifacts/(?P<artifact_id>\d+)/zip)$")
+
+
+class FakeGitHub:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rate_limit: int = RATE_LIMIT,
+                 blob_latency: float = 0.0):
+        """
+        Initialize the fake API server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            rate_limit: Requests allowed per hour before answering 403
+            blob_latency: Seconds a blob download waits before it starts, like a storage round trip
+        """
+        self.runs: Dict[str, Dict[int, Dict]] = {}
+        self.jobs: Dict[str, Dict[int, List[Dict]]] = {}
+        self.artifacts: Dict[str, Dict[int, List[Dict]]] = {}
+        # Annotations of jobs (check runs) by job ID, in the REST API's shape
+        self.annotations: Dict[int, List[Dict]] = {}
+        self.blobs: Dict[str, str] = {}
+        self.rate_limit = rate_limit
+        self.blob_latency = blob_latency
+        self.rate_limit_remaining = rate_limit
+        self.rate_limit_reset = int(time.time()) + 3600
+        self.poll_interval: Optional[int] = None
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGitHub":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def add_run(self, repo: str, run_id: int, archive_path: Optional[str] = None, status: str = "completed",
+                conclusion: Optional[str] = "failure", name: str = "Build", jobs: Optional[List[Dict]] = None,
+                created_at: Optional[str] = None, artifacts: Optional[Dict[str, str]] = None,
+                head_branch: str = "main") -> Dict:
+        """
+        Add (or replace) a workflow run.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+            run_id: Run ID
+            archive_path: Log archive served for the run
+            status: Run status
+            conclusion: Run conclusion
+            name: Workflow name
+            jobs: Job objects; a job's "log_path" is served as its plain-text log and its
+                "annotations" as its check run annotations
+            created_at: ISO timestamp (now if None)
+            artifacts: Artifact zip paths by artifact name
+            head_branch: Branch the run built
+
+        Returns:
+            The run object
+        """
+        created_at = created_at or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        run = {
+            "id": run_id, "name": name, "status": status, "conclusion": conclusion,
+            "head_sha": hashlib.sha1(str(run_id).encode()).hexdigest(), "head_branch": head_branch,
+            "workflow_id": 1, "created_at": created_at, "updated_at": created_at,
+            "check_suite_node_id": f"CS_{run_id}",
+        }
+        with self._lock:
+            self.runs.setdefault(repo, {})[run_id] = run
+            if archive_path:
+                self.blobs[f"run-{run_id}.zip"] = archive_path
+            self.jobs.setdefault(repo, {})[run_id] = []
+            for job in jobs or []:
+                job = dict(job, run_id=run_id)
+                log_path = job.pop("log_path", None)
+                if log_path:
+                    self.blobs[f"job-{job['id']}.txt"] = log_path
+                self.annotations[job["id"]] = job.pop("annotations", [])
+                self.jobs[repo][run_id].append(job)
+            self.artifacts.setdefault(repo, {})[run_id] = []
+            for index, (artifact_name, artifact_path) in enumerate(sorted((artifacts or {}).items())):
+                artifact_id = run_id * 100 + index
+                self.blobs[f"artifact-{artifact_id}.zip"] = artifact_path
+                self.artifacts[repo][run_id].append({
+                    "id": artifact_id, "name": artifact_name, "size_in_bytes": os.path.getsize(artifact_path),
+                    "expired": False, "archive_download_url": f"{self.url}/repos/{repo}/actions/artifacts/{artifact_id}/zip",
+                })
+        return run
+
+    def update_run(self, repo: str, run_id: int, **fields) -> None:
+        with self._lock:
+            self.runs[repo][run_id].update(fields, updated_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def _api_response(self, path: str, query: Dict[str, List[str]]):
+        """
+        Answer an API request.
+
+        Returns:
+            Tuple of (status, JSON body or None, redirect target or None)
+        """
+        match = ANNOTATIONS_ROUTE.match(path)
+        if match:
+            self._count("annotations")
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            with self._lock:
+                annotations = self.annotations.get(int(match.group("job_id")), [])
+            return 200, annotations[(page - 1) * per_page:page * per_page], None
+        match = API_ROUTE.match(path)
+        if not match:
+            return 404, {"message": "Not Found"}, None
+        repo, run_id, what, job_id, artifact_id = match.group("repo", "run_id", "what", "job_id", "artifact_id")
+        with self._lock:
+            runs = self.runs.get(repo, {})
+            if job_id:
+                self.requests["job_logs"] = self.requests.get("job_logs", 0) + 1
+                blob = f"job-{job_id}.txt"
+                return (302, None, f"/blobs/{blob}") if blob in self.blobs else (404, {"message": "Not Found"}, None)
+            if artifact_id:
+                self.requests["artifact_zips"] = self.requests.get("artifact_zips", 0) + 1
+                blob = f"artifact-{artifact_id}.zip"
+                return (302, None, f"/blobs/{blob}") if blob in self.blobs else (404, {"message": "Not Found"}, None)
+
+            if run_id is None:
+                self.requests["runs"] = self.requests.get("runs", 0) + 1
+                listed = sorted(runs.values(), key=lambda run: run["id"], reverse=True)
+                status = query.get("status", [None])[0]
+                if status:
+                    listed = [run for run in listed if status in (run["status"], run["conclusion"])]
+                created = query.get("created", [None])[0]
+                if created and created.startswith(">="):
+                    listed = [run for run in listed if run["created_at"] >= created[2:]]
+                per_page = int(query.get("per_page", ["30"])[0])
+                return 200, {"total_count": len(listed), "workflow_runs": [dict(run) for run in listed[:per_page]]}, None
+
+            run = runs.get(int(run_id))
+            if run is None:
+                return 404, {"message": "Not Found"}, None
+            if what == "logs":
+                self.requests["run_logs"] = self.requests.get("run_logs", 0) + 1
+                blob = f"run-{run_id}.zip"
+                return (302, None, f"/blobs/{blob}") if blob in self.blobs else (404, {"message": "Not Found"}, None)
+            if what == "jobs":
+                self.requests["jobs"] = self.requests.get("jobs", 0) + 1
+                jobs = self.jobs.get(repo, {}).get(int(run_id), [])
+                return 200, {"total_count": len(jobs), "jobs": [dict(job) for job in jobs]}, None
+            if what == "artifacts":
+                self.requests["artifacts"] = self.requests.get("artifacts", 0) + 1
+                artifacts = self.artifacts.get(repo, {}).get(int(run_id), [])
+                name = query.get("name", [None])[0]
+                if name:
+                    artifacts = [artifact for artifact in artifacts if artifact["name"] == name]
+                return 200, {"total_count": len(artifacts), "artifacts": [dict(a) for a in artifacts]}, None
+            self.requests["run"] = self.requests.get("run", 0) + 1
+            return 200, dict(run), None
+
+    def _graphql_response(self, variables: Dict) -> Dict:
+        """
+        Answer the annotations query with the failed jobs of the requested check suites.
+        """
+        self._count("graphql")
+        nodes = []
+        with self._lock:
+            for node_id in variables.get("ids", []):
+                run_id = int(node_id[len("CS_"):]) if node_id.startswith("CS_") else None
+                repo = next((repo for repo, runs in self.runs.items() if run_id in runs), None)
+                if repo is None:
+                    nodes.append(None)
+                    continue
+                failed = [job for job in self.jobs[repo][run_id] if job.get("conclusion") == "failure"]
+                check_runs = []
+                for job in failed[:50]:
+                    annotations = self.annotations.get(job["id"], [])
+                    check_runs.append({"databaseId": job["id"], "name": job["name"], "annotations": {
+                        "totalCount": len(annotations),
+                        "nodes": [{"path": a["path"], "annotationLevel": a["annotation_level"].upper(),
+                                   "title": a.get("title"), "message": a["message"],
+                                   "location": {"start": {"line": a["start_line"], "column": a.get("start_column")}}}
+                                  for a in annotations[:variables.get("annotations", 100)]],
+                    }})
+                nodes.append({"id": node_id, "checkRuns": {"totalCount": len(failed), "nodes": check_runs}})
+        return {"data": {"nodes": nodes}}
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path.startswith("/blobs/"):
+                    self._send_blob(parsed.path[len("/blobs/"):])
+                else:
+                    self._send_api(parsed.path, parse_qs(parsed.query))
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if urlparse(self.path).path != "/graphql":
+                    return self._send(404, {"message": "Not Found"})
+                if not self.headers.get("Authorization"):
+                    return self._send(401, {"message": "Requires authentication"})
+                self._send(200, fake._graphql_response(body.get("variables") or {}), rate_limited=False)
+
+            def _send_api(self, path, query):
+                if not self.headers.get("Authorization"):
+                    return self._send(401, {"message": "Requires authentication"})
+                with fake._lock:
+                    if fake.rate_limit_remaining <= 0:
+                        return self._send(403, {"message": "API rate limit exceeded"})
+                status, body, location = fake._api_response(path, query)
+                payload = json.dumps(body).encode() if body is not None else b""
+                etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    return self._send(304, None, etag=etag)
+                with fake._lock:
+                    fake.rate_limit_remaining -= 1
+                self._send(status, body, etag=etag if status == 200 else None, location=location)
+
+            def _send_blob(self, name):
+                fake._count("blobs")
+                time.sleep(fake.blob_latency)
+                path = fake.blobs.get(name)
+                if self.headers.get("Authorization"):
+                    # Pre-signed storage URLs reject requests that carry a token
+                    return self._send(400, {"message": "Authorization header not allowed"}, rate_limited=False)
+                if path is None or not os.path.exists(path):
+                    return self._send(404, {"message": "Not Found"}, rate_limited=False)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/zip" if name.endswith(".zip") else "text/plain")
+                self.send_header("Content-Length", str(os.path.getsize(path)))
+                self.end_headers()
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, self.wfile, 1024 * 1024)
+
+            def _send(self, status, body, etag=None, location=None, rate_limited=True):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                if rate_limited:
+                    self.send_header("X-RateLimit-Limit", str(fake.rate_limit))
+                    self.send_header("X-RateLimit-Remaining", str(max(fake.rate_limit_remaining, 0)))
+                    self.send_header("X-RateLimit-Reset", str(fake.rate_limit_reset))
+                    if fake.poll_interval:
+                        self.send_header("X-Poll-Interval", str(fake.poll_interval))
+                if etag:
+                    self.send_header("ETag", etag)
+                if location:
+                    self.send_header("Location", fake.url + location)
+                if payload:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake GitHub Actions API for offline testing")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--repo", default="owner/repo", help="Repository the runs belong to")
+    parser.add_argument("--archive", required=True, help="Log archive served for every failed run")
+    parser.add_argument("--runs", type=int, default=1, help="Number of failed runs to serve")
+    args = parser.parse_args()
+
+    fake = FakeGitHub(args.host, args.port)
+    for run_id in range(1, args.runs + 1):
+        fake.add_run(args.repo, run_id, args.archive)
+    print(f"Serving {args.runs} failed runs of {args.repo} on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Batched Fix Planner
+
+Plans the monitor's source fixes as offset-based edits instead of
+rewriting a file once per error. Every file is read and brace-matched
+once, all edits for it are collected against the original text, and each
+touched file is written once, atomically, when the plan is applied.
+
+The edits produced are the same as applying the fixes one error at a
+time: properties are appended before the class's closing brace in error
+order, and each missing using directive is inserted right after the
+first using directive (files without one get none, except for CS0246
+fixes, whose directive goes at the top). In the error's file only
+"public class" declarations are matched, like the per-error fixers did.
+Classes declared in other files (CS1061 is reported where a member is
+used) are found through the class index, which also knows non-public,
+partial and record declarations.
+
+Fixers are looked up by name in FIXERS, the names monitor_settings.json
+maps error types and codes to.
+"""
+
+import os
+import re
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+from class_index import ClassIndex, match_braces, parse_declarations
+from symbol_table import SymbolTable
+
+RUNNER_WORKSPACE_PATTERN = re.compile(r"^/home/runner/work/[^/]+/[^/]+/")
+
+MEMBER_PATTERN = re.compile(r"'(\w+)' does not contain a definition for '(\w+)'")
+MISSING_TYPE_PATTERN = re.compile(r"The type or namespace name '(\w+)(?:<[^']*>)?' could not be found")
+CONVERSION_PATTERN = re.compile(r"Cannot implicitly convert type '([^']+)' to '([^']+)'")
+FILE_PATTERN = re.compile(r'([/\\][\w/\\.-]+\.cs)')
+USING_PATTERN = re.compile(r"using [^;]+;")
+ASSIGNMENT_PATTERN = re.compile(r'(\w+)\s*=\s*([^;]+);')
+# Statements that look like "<word> <name>;" without declaring anything
+STATEMENT_KEYWORDS = {"return", "new", "throw", "await", "yield", "else", "case", "goto", "in", "is", "as", "out",
+                      "ref", "nameof", "typeof"}
+
+
+class SourceFile:
+    def __init__(self, path: str):
+        """
+        Read a source file and prepare it for planning edits.
+
+        Args:
+            path: Path of the file
+        """
+        self.path = path
+        with open(path, "r") as f:
+            self.content = f.read()
+        self._brace_pairs: Optional[Dict[int, int]] = None
+        self._class_spans: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._declaration_spans: Optional[Dict[str, Tuple[int, int]]] = None
+        self._line_starts: Optional[List[int]] = None
+        # Text inserted at an offset of the original content, in output order
+        self.inserts: Dict[int, List[str]] = {}
+        # Replacement text for whole lines, keyed by 0-based line index
+        self.line_replacements: Dict[int, str] = {}
+        self.usings_added: List[str] = []
+        # Members added by planned fixes, by the offset of their class's declaration
+        self.members_added: Dict[int, set] = {}
+        using_match = USING_PATTERN.search(self.content)
+        self.first_using_end = using_match.end() if using_match else None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserts or self.line_replacements)
+
+    def brace_pairs(self) -> Dict[int, int]:
+        """
+        Match every opening brace to its closing brace in a single pass.
+        """
+        if self._brace_pairs is None:
+            self._brace_pairs = match_braces(self.content)
+        return self._brace_pairs
+
+    def class_span(self, class_name: str) -> Optional[Tuple[int, int]]:
+        """
+        Locate a public class declaration and its closing brace.
+
+        Args:
+            class_name: Name of the class
+
+        Returns:
+            Tuple of (declaration offset, closing brace offset), or None if not found
+        """
+        if class_name not in self._class_spans:
+            span = None
+            class_match = re.search(rf"public\s+class\s+{class_name}", self.content)
+            if class_match:
+                open_brace = self.content.find("{", class_match.start())
+                close_brace = self.brace_pairs().get(open_brace)
+                span = (class_match.start(), close_brace if close_brace is not None else -1)
+            self._class_spans[class_name] = span
+        return self._class_spans[class_name]
+
+    def declaration_span(self, type_name: str) -> Optional[Tuple[int, int]]:
+        """
+        Locate any class, record or struct declaration and its closing brace,
+        as the class index records them.
+
+        Args:
+            type_name: Name of the type
+
+        Returns:
+            Tuple of (declaration offset, closing brace offset), or None if not found
+        """
+        if self._declaration_spans is None:
+            self._declaration_spans = {}
+            for declaration in parse_declarations(self.content, self.path, self.brace_pairs()):
+                self._declaration_spans.setdefault(declaration.name, (declaration.start, declaration.close_brace))
+        return self._declaration_spans.get(type_name)
+
+    def has_using(self, namespace: str) -> bool:
+        return f"using {namespace};" in self.content or namespace in self.usings_added
+
+    def add_using(self, namespace: str, top_of_file: bool = False) -> None:
+        """
+        Insert a using directive right after the first one, unless present.
+
+        Args:
+            namespace: Namespace to import
+            top_of_file: Insert it at the top of a file without any using
+                directive, which is left unchanged otherwise
+        """
+        if self.has_using(namespace):
+            return
+        if self.first_using_end is None:
+            if not top_of_file:
+                return
+            self.inserts.setdefault(0, []).append(f"using {namespace};\n")
+        else:
+            # Later directives land directly after the first one, ahead of earlier additions
+            self.inserts.setdefault(self.first_using_end, []).insert(0, f"\nusing {namespace};")
+        self.usings_added.append(namespace)
+
+    def declares_member(self, span: Tuple[int, int], name: str) -> bool:
+        """
+        Check whether a class declares a property, field or method of the given name,
+        or a planned fix already adds one.
+
+        Args:
+            span: Declaration and closing brace offsets of the class
+            name: Member name
+        """
+        if name in self.members_added.get(span[0], ()):
+            return True
+        pattern = re.compile(r"([\w>\]?]+)\s+" + re.escape(name) + r"\s*(?:\{|=>|=|;|\()")
+        return any(match.group(1) not in STATEMENT_KEYWORDS
+                   for match in pattern.finditer(self.content, span[0], span[1]))
+
+    def insert_before(self, offset: int, text: str) -> None:
+        """
+        Insert text at an offset, after anything already inserted there.
+        """
+        self.inserts.setdefault(offset, []).append(text)
+
+    def line_span(self, index: int) -> Optional[Tuple[int, int]]:
+        """
+        Get the offsets of a 0-based line, excluding its newline.
+        """
+        if self._line_starts is None:
+            self._line_starts = [0] + [m.end() for m in re.finditer("\n", self.content)]
+        if not 0 <= index < len(self._line_starts):
+            return None
+        start = self._line_starts[index]
+        end = self._line_starts[index + 1] - 1 if index + 1 < len(self._line_starts) else len(self.content)
+        return start, end
+
+    def current_line(self, index: int) -> Optional[str]:
+        if index in self.line_replacements:
+            return self.line_replacements[index]
+        span = self.line_span(index)
+        return self.content[span[0]:span[1]] if span else None
+
+    def replace_line(self, index: int, text: str) -> bool:
+        """
+        Replace a whole line, unless text is already being inserted inside it.
+
+        Returns:
+            True if the replacement was planned
+        """
+        start, end = self.line_span(index)
+        if any(start < offset < end for offset in self.inserts):
+            return False
+        self.line_replacements[index] = text
+        return True
+
+    def render(self) -> str:
+        """
+        Apply all planned edits to the original content.
+        """
+        edits = [(offset, offset, "".join(texts)) for offset, texts in self.inserts.items()]
+        for index, text in self.line_replacements.items():
+            start, end = self.line_span(index)
+            edits.append((start, end, text))
+
+        parts = []
+        position = 0
+        for start, end, text in sorted(edits, key=lambda edit: (edit[0], edit[1])):
+            parts.append(self.content[position:start])
+            parts.append(text)
+            position = end
+        parts.append(self.content[position:])
+        return "".join(parts)
+
+    def write(self) -> None:
+        """
+        Atomically replace the file with the edited content.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".autofix-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render())
+            os.chmod(temp_path, os.stat(self.path).st_mode & 0o7777)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class FixPlanner:
+    def __init__(self, repo_path: str, class_index: Optional[ClassIndex] = None):
+        """
+        Initialize an empty fix plan.
+
+        Args:
+            repo_path: Local checkout that runner paths are mapped to
+            class_index: Index used to find classes declared outside the error's file
+        """
+        self.repo_path = repo_path
+        self.class_index = class_index
+        self.symbols = SymbolTable(class_index)
+        self.files: Dict[str, SourceFile] = {}
+        self._index_refreshed = False
+
+    def source(self, path: str) -> SourceFile:
+        """
+        Get the parsed source file for a path, reading it on first use.
+        """
+        key = os.path.abspath(path)
+        if key not in self.files:
+            self.files[key] = SourceFile(path)
+        return self.files[key]
+
+    def plan(self, fixer: str, error: Dict) -> bool:
+        """
+        Plan the fix of an error with a fixer from FIXERS.
+
+        Args:
+            fixer: Fixer name
+            error: Error object with details
+
+        Returns:
+            True if the fix was planned, False otherwise
+        """
+        return FIXERS[fixer](self, error)
+
+    def refresh_index(self) -> None:
+        """
+        Bring the class index up to date, once per plan.
+        """
+        if self.class_index is not None and not self._index_refreshed:
+            self.class_index.refresh()
+            self._index_refreshed = True
+
+    def local_path(self, path: str) -> str:
+        """
+        Map a path on the Actions runner to the local checkout.
+        """
+        return RUNNER_WORKSPACE_PATTERN.sub(lambda _: self.repo_path + "/", path)
+
+    def resolve_file(self, error: Dict, report: bool = True) -> Optional[str]:
+        """
+        Find the local file an error refers to.
+
+        Args:
+            error: Error object; its "file" is filled in from the message if missing
+            report: Print a message if the file is not found
+
+        Returns:
+            Path of an existing file, or None
+        """
+        if not error.get("file"):
+            # Try to extract file path from the error message
+            file_match = FILE_PATTERN.search(error["message"])
+            if file_match:
+                error["file"] = file_match.group(1)
+        if error.get("file"):
+            # Convert to local path
+            error["file"] = self.local_path(error["file"])
+
+        if not error.get("file") or not os.path.exists(error["file"]):
+            if report:
+                print(f"File not found: {error.get('file')}")
+            return None
+        return error["file"]
+
+    def find_class(self, class_name: str, path: Optional[str]) -> Tuple[Optional[str], Optional[Tuple[int, int]]]:
+        """
+        Locate a class, in the error's file if it declares it as a public class, otherwise
+        in another file through the class index.
+
+        Args:
+            class_name: Name of the class
+            path: File the error was reported in, if it exists locally
+
+        Returns:
+            Tuple of (declaring file, class span), with a None span if not found
+        """
+        if path and path.endswith(".cs"):
+            span = self.source(path).class_span(class_name)
+            if span:
+                return path, span
+        if self.class_index is None:
+            return path, None
+
+        self.refresh_index()
+        own_path = os.path.abspath(path) if path else None
+        locations = [l for l in self.class_index.lookup(class_name) if os.path.abspath(l.path) != own_path]
+        # A partial class can take the property in any of its parts, but only in one with a body
+        for location in sorted(locations, key=lambda l: l.open_brace == -1):
+            span = self.source(location.path).declaration_span(class_name)
+            if span:
+                return location.path, span
+        return path, None
+
+    def plan_missing_property(self, error: Dict) -> bool:
+        """
+        Plan adding a missing property to a view model.
+
+        Args:
+            error: Error object with details
+
+        Returns:
+            True if the fix was planned, False otherwise
+        """
+        path = self.resolve_file(error, report=self.class_index is None)
+        if not path and self.class_index is None:
+            return False
+
+        # Extract class name and property name
+        match = None
+        if error["type"] in ("missing_definition", "missing_property", "missing_member"):
+            match = MEMBER_PATTERN.search(error["message"]) or \
+                MEMBER_PATTERN.search(f"error {error.get('code')}: {error['message']}")
+
+        if not match:
+            print(f"Could not extract class and property names from: {error['message']}")
+            return False
+
+        class_name = match.group(1)
+        property_name = match.group(2)
+
+        path, span = self.find_class(class_name, path)
+        if not span:
+            print(f"Could not find class {class_name} in {path or 'the repository'}")
+            return False
+        source = self.source(path)
+        if span[1] == -1:
+            print(f"Could not find class end for {class_name} in {path}")
+            return False
+
+        if source.declares_member(span, property_name):
+            # Fixed by an earlier run whose commit the build didn't include yet, or twice in this one
+            print(f"Class '{class_name}' already declares '{property_name}' in {path}")
+            return False
+        source.members_added.setdefault(span[0], set()).add(property_name)
+
+        property_type = infer_property_type(property_name)
+        if property_type.startswith("IEnumerable<"):
+            source.add_using("System.Collections.Generic")
+        source.add_using("System.ComponentModel.DataAnnotations")
+
+        # Add the missing property
+        source.insert_before(span[1], f"""
+        [Display(Name = "{' '.join(re.findall('[A-Z][^A-Z]*', property_name))}")]
+        public {property_type} {property_name} {{ get; set; }}
+        """)
+
+        print(f"Added missing property '{property_name}' to class '{class_name}' in {path}")
+        return True
+
+    def plan_type_conversion(self, error: Dict) -> bool:
+        """
+        Plan an explicit cast for a type conversion error.
+
+        Args:
+            error: Error object with details
+
+        Returns:
+            True if the fix was planned, False otherwise
+        """
+        path = self.resolve_file(error)
+        if not path:
+            return False
+
+        # Extract source and target types
+        match = None
+        if error["type"] in ("type_conversion", "implicit_conversion"):
+            match = CONVERSION_PATTERN.search(error["message"]) or \
+                CONVERSION_PATTERN.search(f"error {error.get('code')}: {error['message']}")
+
+        if not match:
+            print(f"Could not extract type information from: {error['message']}")
+            return False
+
+        target_type = match.group(2)
+        source = self.source(path)
+
+        # If we have line information, try to fix that specific line
+        if error.get("line") is not None:
+            index = error["line"] - 1
+            line = source.current_line(index)
+            if line is not None:
+                # Look for assignment patterns
+                assignment_match = ASSIGNMENT_PATTERN.search(line)
+                if assignment_match:
+                    var_name = assignment_match.group(1)
+                    expression = assignment_match.group(2)
+
+                    # Add explicit cast
+                    new_line = line.replace(f"{var_name} = {expression}", f"{var_name} = ({target_type}){expression}")
+                    if source.replace_line(index, new_line):
+                        print(f"Added explicit cast to {target_type} in {path} at line {error['line']}")
+                        return True
+
+        print(f"Could not fix type conversion error in {path}")
+        return False
+
+    def plan_missing_namespace(self, error: Dict) -> bool:
+        """
+        Plan adding the using directive for a type that could not be found.
+
+        Args:
+            error: Error object with details
+
+        Returns:
+            True if the fix was planned, False otherwise
+        """
+        path = self.resolve_file(error)
+        if not path:
+            return False
+
+        match = MISSING_TYPE_PATTERN.search(error["message"])
+        if not match:
+            print(f"Could not extract type name from: {error['message']}")
+            return False
+        type_name = match.group(1)
+
+        self.refresh_index()
+        namespaces = self.symbols.namespaces(type_name)
+        if not namespaces:
+            print(f"Could not find the namespace of {type_name}")
+            return False
+        if len(namespaces) > 1:
+            print(f"Type {type_name} is ambiguous between {', '.join(namespaces)}")
+            return False
+
+        namespace = namespaces[0]
+        source = self.source(path)
+        if namespace in source.usings_added:
+            # Planned for an earlier error in the same file
+            return True
+        if source.has_using(namespace):
+            print(f"{path} already imports {namespace}, {type_name} may be missing an assembly reference")
+            return False
+        source.add_using(namespace, top_of_file=True)
+        print(f"Added using directive for {namespace} ({type_name}) in {path}")
+        return True
+
+    def apply(self) -> List[str]:
+        """
+        Write every file with planned edits, once each.
+
+        Returns:
+            Paths of the files that were written
+        """
+        written = []
+        for source in self.files.values():
+            if source.changed:
+                source.write()
+                written.append(source.path)
+                if self.class_index is not None:
+                    self.class_index.refresh_file(source.path)
+        if written and self.class_index is not None:
+            self.class_index.save()
+        return written
+
+
+# Fixer names used in monitor_settings.json and the FixPlanner methods implementing them
+FIXERS: Dict[str, Callable[[FixPlanner, Dict], bool]] = {
+    "missing_property": FixPlanner.plan_missing_property,
+    "missing_namespace": FixPlanner.plan_missing_namespace,
+    "type_conversion": FixPlanner.plan_type_conversion,
+}
+
+
+def infer_property_type(property_name: str) -> str:
+    """
+    Guess a property's type from naming conventions.
+    """
+    if property_name.startswith("Is") or property_name.startswith("Has") or property_name.endswith("Enabled") or property_name.endswith("Active"):
+        return "bool"
+    if property_name.endswith("Id") or property_name.endswith("Count") or property_name.endswith("Number"):
+        return "int"
+    if property_name.endswith("Date") or property_name.endswith("Time"):
+        return "DateTime"
+    if property_name.endswith("Amount") or property_name.endswith("Price") or property_name.endswith("Value"):
+        return "decimal"
+    if property_name.startswith("Available") and property_name.endswith("s"):
+        # Collection property
+        item_type = property_name[9:-1]  # Remove "Available" and "s"
+        return f"IEnumerable<{item_type}>"
+    return "string"
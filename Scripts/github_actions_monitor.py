@@ -8,104 +8,290 @@ fix common build errors.
 
 Usage:
     python github_actions_monitor.py --token <github_token> --repo <owner/repo>
+    python github_actions_monitor.py --token <github_token> --config <repos.json>
 """
 
 import argparse
+import contextlib
+import hashlib
+import io
 import json
 import os
 import re
 import requests
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Callable, Iterable, Iterator, Union
+
+# Sibling modules live next to this script
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+from archive_scanner import FILE_ERROR_PATTERN, GENERAL_ERROR_PATTERN, SCAN_MEMORY_LIMIT, scan_archive
+from binlog_reader import BinlogFormatError, diagnostic_path, iter_artifact_diagnostics
+from class_index import ClassIndex
+from error_classifier import ErrorClassifier
+from error_fingerprint import error_fingerprint, unique_errors
+from fix_planner import FIXERS, FixPlanner
+from github_api import GitHubClient, RequestBudget
+from history_store import (HISTORY_DB_PATH, HistoryStore, RESULT_APPLIED, RESULT_FAILED, RESULT_SKIPPED,
+                           RESULT_UNSUPPORTED)
+from log_cache import LogCache, DEFAULT_MAX_AGE, DEFAULT_MAX_BYTES
+from metrics import Metrics, MetricsServer
+from monitor_settings import SETTINGS_PATH, SettingsWatcher, fixers_by_error_type, load_settings
+from poll_scheduler import PollScheduler
+from profiling import PROFILE_DIR, KEEP_DUMPS, TOP_N, CycleCapture, CycleProfiler
+from run_state import (RunStateStore, TERMINAL_STATUS, FIX_RESULT_FIXED, FIX_RESULT_FAILED, OUTCOME_BASELINE,
+                       OUTCOME_SKIPPED, OUTCOME_NO_ERRORS, OUTCOME_NO_FIXES, OUTCOME_FIXED, OUTCOME_COMMIT_FAILED,
+                       OUTCOME_SUPERSEDED)
 
 # Configuration
 GITHUB_API_URL = "https://api.github.com"
 POLL_INTERVAL = 50  # seconds - updated to 50 seconds as requested
 MAX_RETRIES = 3
-REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-# Error patterns and fixes
-ERROR_PATTERNS = {
-    # Missing property in view model
-    r"'(\w+)' does not contain a definition for '(\w+)'": {
-        "type": "missing_property",
-        "description": "Missing property in view model"
-    },
-    # Missing using directive
-    r"The type or namespace name '(\w+)' could not be found": {
-        "type": "missing_namespace",
-        "description": "Missing using directive or reference"
-    },
-    # Razor syntax error
-    r"The attribute '([^']+)' is not a valid attribute": {
-        "type": "razor_syntax",
-        "description": "Invalid Razor syntax in view"
-    },
-    # Cannot implicitly convert type
-    r"Cannot implicitly convert type '([^']+)' to '([^']+)'": {
-        "type": "type_conversion",
-        "description": "Type conversion error"
-    },
-    # Missing definition (CS1061)
-    r"error CS1061: '(\w+)' does not contain a definition for '(\w+)'": {
-        "type": "missing_definition",
-        "description": "Missing property or method definition"
-    },
-    # Type conversion error (CS0266)
-    r"error CS0266: Cannot implicitly convert type '([^']+)' to '([^']+)'": {
-        "type": "implicit_conversion",
-        "description": "Cannot implicitly convert between types"
-    },
-    # Missing member (CS0117)
-    r"error CS0117: '(\w+)' does not contain a definition for '(\w+)'": {
-        "type": "missing_member",
-        "description": "Missing member in class"
+RUNS_PER_PAGE = 50
+STATE_DB_PATH = os.path.join(SCRIPT_DIR, "monitor_state.db")
+LOG_SPOOL_MAX_SIZE = 16 * 1024 * 1024  # log archives larger than this are spooled to disk
+REPO_PATH = os.path.dirname(SCRIPT_DIR)
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache")
+LOG_CACHE_DIR = os.path.join(CACHE_DIR, "logs")
+BINLOG_ARTIFACT = "build-logs-{run_id}"  # uploaded by the dotnet-build workflow when the build fails
+ERROR_SOURCE_LOGS = "logs"
+ERROR_SOURCE_BINLOG = "binlog"
+ERROR_SOURCE_ANNOTATIONS = "annotations"
+ANNOTATIONS_PER_JOB = 100  # annotations fetched per failed job by the batched GraphQL query
+ANNOTATION_CAP = 10  # error annotations Actions keeps per step; a job reaching it may have lost some
+PREFETCHED_RUNS = 256  # runs whose prefetched annotations wait for their processing
+# Compiler error code at the start of an annotation's message or title, e.g. "CS1061: ..."
+ANNOTATION_CODE_PATTERN = re.compile(r"^(?:error )?([A-Z]{2,}\d{3,})\b:?\s*(.*)", re.DOTALL)
+# Failed check runs of check suites, with their annotations; a suite is the checks of a workflow run
+ANNOTATIONS_QUERY = """
+query($ids: [ID!]!, $annotations: Int!) {
+  nodes(ids: $ids) {
+    ... on CheckSuite {
+      id
+      checkRuns(first: 50, filterBy: {conclusions: [FAILURE]}) {
+        totalCount
+        nodes {
+          databaseId
+          name
+          annotations(first: $annotations) {
+            totalCount
+            nodes { path annotationLevel title message location { start { line column } } }
+          }
+        }
+      }
     }
+  }
 }
+"""
+PUSH_WINDOW = 0  # seconds commits wait for others to share their push (0 pushes every commit)
+RUN_WORKERS = 4  # failed runs whose logs are downloaded and parsed at the same time
+
+# Error patterns and fixer settings, reloaded from SETTINGS_PATH while the monitor runs
+ERROR_PATTERNS = load_settings(SETTINGS_PATH)["error_patterns"]
+
+LOG_TIMESTAMP_PATTERN = re.compile(r'(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)')
+
+def iter_step_lines(lines: Iterable[str], steps: List[Dict]) -> Iterator[str]:
+    """
+    Keep only the job log lines written while one of the given steps ran.
+    
+    Job logs prefix every line with an ISO timestamp, and the jobs API
+    reports each step's start and completion time to the second, so a
+    line belongs to a step when its timestamp falls inside that window.
+    Lines without a timestamp belong to the line before them.
+    
+    Args:
+        lines: Job log lines
+        steps: Step objects with "started_at" and "completed_at"
+        
+    Yields:
+        Log lines from the given steps
+    """
+    windows = [(step["started_at"][:19], step["completed_at"][:19])
+               for step in steps if step.get("started_at") and step.get("completed_at")]
+    if not windows:
+        yield from lines
+        return
+    
+    inside = False
+    for line in lines:
+        match = LOG_TIMESTAMP_PATTERN.match(line)
+        if match:
+            stamp = match.group(1)
+            inside = any(start <= stamp <= end for start, end in windows)
+        if inside:
+            yield line
+
+
+def iter_archive_lines(archive) -> Iterator[str]:
+    """
+    Stream the lines of every log file in a run's log archive.
+    
+    Args:
+        archive: Binary file object holding the archive
+        
+    Yields:
+        Log lines, with a blank-line separator after each log file
+        
+    Raises:
+        zipfile.BadZipFile, OSError: If the archive or one of its members
+            can't be read, so a partial log is never mistaken for the whole
+    """
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            with zf.open(info) as member:
+                yield from io.TextIOWrapper(member, encoding="utf-8", errors="replace")
+            yield "\n\n"
+
 
 class GitHubActionsMonitor:
-    def __init__(self, token: str, repo: str):
+    def __init__(self, token: str, repo: str, failed_jobs_only: bool = False, state_path: str = ":memory:",
+                 repo_path: str = REPO_PATH, state: Optional[RunStateStore] = None,
+                 budget: Optional[RequestBudget] = None, class_index_path: Optional[str] = None,
+                 workers: int = 1, byte_scan: bool = False, log_cache: Optional[LogCache] = None,
+                 api_url: str = GITHUB_API_URL, metrics: Optional[Metrics] = None, push_window: float = PUSH_WINDOW,
+                 error_source: str = ERROR_SOURCE_LOGS, settings_path: str = SETTINGS_PATH,
+                 heartbeat_path: Optional[str] = None, scan_memory_limit: int = SCAN_MEMORY_LIMIT,
+                 run_workers: int = RUN_WORKERS, early_failures: bool = False,
+                 history: Optional[HistoryStore] = None, profiler: Optional[CycleProfiler] = None):
         """
         Initialize the GitHub Actions monitor.
         
         Args:
             token: GitHub personal access token
             repo: Repository in format 'owner/repo'
+            failed_jobs_only: Only download the logs of failed jobs' failed steps
+            state_path: SQLite file remembering processed runs across restarts
+            repo_path: Local checkout of the repository that fixes are applied to
+            state: Run state store shared with other monitors (overrides state_path)
+            budget: API request budget shared with other monitors
+            class_index_path: JSON file caching the class index of repo_path (derived from it if None)
+            workers: Processes that scan the members of a run's log archive (1 scans in-process)
+            byte_scan: Scan log archive members with bytes regexes, mmap'd when stored uncompressed
+            log_cache: Cache of downloaded logs and the errors parsed from them
+            api_url: Base URL of the GitHub REST API (e.g. GitHub Enterprise or a fake server)
+            metrics: Registry for stage timings and counters, shared with other monitors
+            push_window: Seconds a commit waits so commits of other runs go out in the same push
+            error_source: ERROR_SOURCE_BINLOG reads errors from the run's binary log artifact and
+                ERROR_SOURCE_ANNOTATIONS from the check run annotations of its failed jobs, both
+                falling back to the text logs when they don't have the errors
+            settings_path: Error pattern and fixer settings, reloaded when the file changes
+            heartbeat_path: File touched at the start of every polling cycle and while waiting for the rate limit,
+                for a supervisor's health checks
+            scan_memory_limit: Bytes a byte scan of a compressed archive member may hold at once, per process
+            run_workers: Threads processing runs, so one run's download doesn't hold up the others
+            early_failures: Fix the errors of failed jobs while their run is still in progress
+            history: Store recording every extracted error and its fix result, shared with other monitors
+            profiler: Profiler of polling cycles, shared with other monitors
         """
         self.token = token
         self.repo = repo
-        self.headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        self.last_checked_run_id = None
+        self.repo_path = repo_path
+        self.failed_jobs_only = failed_jobs_only
+        self.workers = workers
+        self.byte_scan = byte_scan
+        self.scan_memory_limit = scan_memory_limit
+        self.error_source = error_source
+        self.log_cache = log_cache
+        self.metrics = metrics or Metrics()
+        self._local = threading.local()
+        self._scan_pool: Optional[ProcessPoolExecutor] = None
+        self._scan_pool_lock = threading.Lock()
+        self.run_workers = run_workers
+        self._run_pool: Optional[ThreadPoolExecutor] = None
+        # Runs submitted to the run pool and not finished yet, by ID
+        self._queued_runs: Dict[int, Future] = {}
+        self._queued_runs_lock = threading.Lock()
+        self.early_failures = early_failures
+        # Failed jobs of in-progress runs already handled, by run ID
+        self._early_jobs: Dict[int, set] = {}
+        self.history = history
+        # Failed jobs with their annotations fetched for runs about to be processed, by run ID
+        self._prefetched: Dict[int, List[Dict]] = {}
+        self._prefetched_lock = threading.Lock()
+        self.profiler = profiler
+        self.client = GitHubClient(token, api_url, budget=budget, on_wait=self.touch_heartbeat)
+        self.state = state or RunStateStore(state_path)
+        # Fixes and commits touch the working tree, so only one run applies them at a time
+        self.fix_lock = threading.Lock()
+        # Commit made by the last commit_and_push_fixes call, guarded by fix_lock
+        self.last_commit: Optional[str] = None
+        self.push_window = push_window
+        # Files written by fixes and not committed yet, and the content committed last for each file
+        self._changed_paths = set()
+        self._committed_digests: Dict[str, str] = {}
+        self._push_timer: Optional[threading.Timer] = None
+        self._push_lock = threading.Lock()
+        # Set while commits are waiting for a push that failed
+        self._unpushed = False
+        # Fingerprints of applied fixes not committed and pushed yet, guarded by fix_lock
+        self._pending_fingerprints: Dict[str, str] = {}
+        self.heartbeat_path = heartbeat_path
+        self.settings = SettingsWatcher(settings_path)
+        settings = self.settings.load()
+        self.classifier = ErrorClassifier(settings["error_patterns"])
+        self.fixers = fixers_by_error_type(settings["fixers"])
+        if class_index_path is None:
+            checkout_id = hashlib.sha1(os.path.abspath(repo_path).encode()).hexdigest()[:12]
+            class_index_path = os.path.join(CACHE_DIR, f"class_index-{checkout_id}.json")
+        self.class_index = ClassIndex(repo_path, class_index_path)
         
-    def get_workflow_runs(self, status: Optional[str] = None) -> List[Dict]:
+    def get_workflow_runs(self, status: Optional[str] = None, created: Optional[str] = None,
+                          per_page: Optional[int] = None) -> List[Dict]:
         """
         Get recent workflow runs from GitHub Actions.
         
         Args:
             status: Filter by status (e.g., 'completed', 'failure')
+            created: Filter by creation date (e.g., '>=2025-05-29T00:00:00Z')
+            per_page: Number of runs to request
             
         Returns:
             List of workflow run objects
         """
-        url = f"{GITHUB_API_URL}/repos/{self.repo}/actions/runs"
         params = {}
         if status:
             params["status"] = status
-            
-        response = requests.get(url, headers=self.headers, params=params)
-        if response.status_code != 200:
-            print(f"Error fetching workflow runs: {response.status_code}")
-            print(response.text)
+        if created:
+            params["created"] = created
+        if per_page:
+            params["per_page"] = per_page
+        
+        # Unchanged results come back as a free 304 and are served from the ETag cache
+        status_code, data = self.client.get_json(f"/repos/{self.repo}/actions/runs", params)
+        if status_code != 200:
+            print(f"Error fetching workflow runs: {status_code}")
             return []
             
-        data = response.json()
-        return data.get("workflow_runs", [])
+        # A copy, since the list is cached for conditional requests and callers add to it
+        return list(data.get("workflow_runs", []))
+    
+    def get_workflow_run(self, run_id: int) -> Optional[Dict]:
+        """
+        Get a single workflow run.
+        
+        Args:
+            run_id: Workflow run ID
+            
+        Returns:
+            Workflow run object, or None if it could not be fetched
+        """
+        status_code, data = self.client.get_json(f"/repos/{self.repo}/actions/runs/{run_id}")
+        if status_code != 200:
+            print(f"Error fetching workflow run {run_id}: {status_code}")
+            return None
+        return data
     
     def get_workflow_logs(self, run_id: int) -> str:
         """
@@ -117,228 +303,571 @@ class GitHubActionsMonitor:
         Returns:
             Log content as string
         """
-        # First, get the available logs
-        url = f"{GITHUB_API_URL}/repos/{self.repo}/actions/runs/{run_id}/logs"
+        return "".join(self.iter_workflow_log_lines(run_id))
+    
+    def _cached_lines(self, key: str, download: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """
+        Stream a log from the log cache, or download it and cache it on the way.
+        
+        Args:
+            key: Cache key of the log
+            download: Function returning the downloaded log's lines
+            
+        Yields:
+            Log lines
+        """
+        if self.log_cache is None:
+            yield from download()
+            return
+        cached = self.log_cache.iter_lines(key)
+        if cached is not None:
+            yield from cached
+            return
+        yield from self.log_cache.store_lines(key, download())
+    
+    def iter_workflow_log_lines(self, run_id: int) -> Iterator[str]:
+        """
+        Stream the lines of every log file in a workflow run's log archive.
+        
+        The archive is spooled in memory (or on disk once it outgrows
+        LOG_SPOOL_MAX_SIZE) and members are decompressed lazily, so only
+        the current line is ever held as text. Logs in the log cache are
+        not downloaded again.
+        
+        Args:
+            run_id: Workflow run ID
+            
+        Yields:
+            Log lines, with a blank-line separator after each log file
+            
+        Raises:
+            zipfile.BadZipFile, OSError: If the archive or one of its log files can't be read
+        """
+        return self._cached_lines(f"run/{self.repo}/{run_id}", lambda: self._download_workflow_log_lines(run_id))
+    
+    def _download_workflow_log_lines(self, run_id: int) -> Iterator[str]:
+        path = f"/repos/{self.repo}/actions/runs/{run_id}/logs"
+        
+        with tempfile.SpooledTemporaryFile(max_size=LOG_SPOOL_MAX_SIZE) as archive:
+            try:
+                if not self._download(path, archive):
+                    print(f"Error fetching logs for run {run_id}")
+                    return
+            except requests.RequestException as e:
+                print(f"Exception while fetching logs for run {run_id}: {e}")
+                return
+            # Read errors propagate, so the log cache drops what was read so far
+            yield from iter_archive_lines(archive)
+    
+    def iter_run_log_lines(self, run_id: int) -> Iterator[str]:
+        """
+        Stream the log lines relevant to a failed run.
+        
+        In failed-jobs-only mode just the failed steps of the failed jobs are
+        downloaded, falling back to the full run archive when the jobs API
+        gives nothing to go on.
+        
+        Args:
+            run_id: Workflow run ID
+            
+        Yields:
+            Log lines
+        """
+        if self.failed_jobs_only:
+            failed_jobs = self.get_failed_jobs(run_id)
+            if failed_jobs:
+                for job in failed_jobs:
+                    print(f"Fetching log for failed job {job['id']} ({job['name']}), "
+                          f"steps: {', '.join(step['name'] for step in job['failed_steps']) or 'all'}")
+                    yield from self.iter_job_log_lines(job["id"], job["failed_steps"])
+                    yield "\n\n"
+                return
+            print(f"No failed jobs reported for run {run_id}, falling back to the full log archive")
+        
+        yield from self.iter_workflow_log_lines(run_id)
+    
+    def _download(self, path: str, target) -> bool:
+        """
+        Download a log through the API client, timing it and counting its bytes.
+        """
+        with self.metrics.stage("download", repo=self.repo):
+            if not self.client.download(path, target):
+                return False
+        size = target.seek(0, io.SEEK_END)
+        target.seek(0)
+        self.metrics.inc("monitor_download_bytes_total", size, help="Log bytes downloaded", repo=self.repo)
+        return True
+    
+    def get_failed_jobs(self, run_id: int) -> List[Dict]:
+        """
+        Get the jobs of a run that concluded with a failure.
+        
+        Args:
+            run_id: Workflow run ID
+            
+        Returns:
+            List of job objects, each with an added "failed_steps" list
+        """
+        params = {"filter": "latest", "per_page": 100}
         
         try:
-            # Download the logs (they're usually in a zip file)
-            response = requests.get(url, headers=self.headers, allow_redirects=True, stream=True)
-            
-            if response.status_code == 302:
-                # Follow redirect to download logs
-                download_url = response.headers.get("Location")
-                log_response = requests.get(download_url, stream=True)
-                
-                if log_response.status_code == 200:
-                    # Save the logs to a temporary file
-                    temp_zip = f"/tmp/workflow_logs_{run_id}.zip"
-                    temp_dir = f"/tmp/workflow_logs_{run_id}"
-                    
-                    with open(temp_zip, 'wb') as f:
-                        for chunk in log_response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    # Extract the logs
-                    os.makedirs(temp_dir, exist_ok=True)
-                    subprocess.run(['unzip', '-o', temp_zip, '-d', temp_dir], check=False)
-                    
-                    # Read all log files and concatenate them
-                    all_logs = ""
-                    for root, _, files in os.walk(temp_dir):
-                        for file in files:
-                            try:
-                                with open(os.path.join(root, file), 'r') as f:
-                                    all_logs += f.read() + "\n\n"
-                            except Exception as e:
-                                print(f"Error reading log file {file}: {e}")
-                    
-                    # Clean up
-                    subprocess.run(['rm', '-rf', temp_dir, temp_zip], check=False)
-                    
-                    return all_logs
-            
-            print(f"Error fetching logs for run {run_id}: {response.status_code}")
-            return ""
-            
-        except Exception as e:
-            print(f"Exception while fetching logs for run {run_id}: {e}")
-            return ""
+            status_code, data = self.client.get_json(f"/repos/{self.repo}/actions/runs/{run_id}/jobs", params)
+        except requests.RequestException as e:
+            print(f"Exception while fetching jobs for run {run_id}: {e}")
+            return []
+        if status_code != 200:
+            print(f"Error fetching jobs for run {run_id}: {status_code}")
+            return []
+        
+        # Copy the jobs rather than annotate objects held by the ETag cache
+        return [
+            dict(job, failed_steps=[step for step in job.get("steps") or [] if step.get("conclusion") == "failure"])
+            for job in data.get("jobs", [])
+            if job.get("conclusion") == "failure"
+        ]
+    
+    def iter_job_log_lines(self, job_id: int, steps: Optional[List[Dict]] = None) -> Iterator[str]:
+        """
+        Stream the plain-text log of a single job.
+        
+        Args:
+            job_id: Workflow job ID
+            steps: Only keep the sections of these steps (all lines if empty)
+            
+        Yields:
+            Log lines (the whole job log is cached, before steps are picked)
+        """
+        lines = self._cached_lines(f"job/{self.repo}/{job_id}", lambda: self._download_job_log_lines(job_id))
+        return iter_step_lines(lines, steps) if steps else lines
+    
+    def _download_job_log_lines(self, job_id: int) -> Iterator[str]:
+        path = f"/repos/{self.repo}/actions/jobs/{job_id}/logs"
+        
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=LOG_SPOOL_MAX_SIZE) as log_file:
+                if not self._download(path, log_file):
+                    print(f"Error fetching log for job {job_id}")
+                    return
+                yield from io.TextIOWrapper(log_file, encoding="utf-8-sig", errors="replace")
+        except requests.RequestException as e:
+            print(f"Exception while fetching log for job {job_id}: {e}")
     
-    def extract_build_errors(self, log_content: str) -> List[Dict]:
+    def extract_build_errors(self, log_content: Union[str, Iterable[str]]) -> List[Dict]:
         """
         Extract build errors from log content.
         
         Args:
-            log_content: Log content as string
+            log_content: Log content as string, or an iterable of log lines
             
         Returns:
             List of error objects with type, message, and file info
         """
-        errors = []
+        return list(self.iter_build_errors(log_content))
+    
+    def iter_build_errors(self, log_content: Union[str, Iterable[str]]) -> Iterator[Dict]:
+        """
+        Lazily extract build errors from log content, one line at a time.
         
-        # Look for .NET build errors with file paths
-        error_lines = re.findall(r'([/\\][\w/\\.-]+\.cs)(?:\((\d+),(\d+)\))?: error (\w+): (.*?)(?:\r?\n|$)', log_content)
-        
-        for match in error_lines:
-            if len(match) >= 5:
-                file_path, line_str, col_str, error_code, error_message = match
-                
-                # Convert line and column to integers if possible
-                line = int(line_str) if line_str and line_str.isdigit() else None
-                column = int(col_str) if col_str and col_str.isdigit() else None
-                
-                error = {
-                    "code": error_code,
-                    "message": error_message.strip(),
-                    "file": file_path,
-                    "line": line,
-                    "column": column
-                }
-                
-                # Identify error type based on patterns
-                for pattern, info in ERROR_PATTERNS.items():
-                    if re.search(pattern, error_message) or re.search(pattern, f"error {error_code}: {error_message}"):
-                        error["type"] = info["type"]
-                        error["description"] = info["description"]
-                        break
-                else:
-                    error["type"] = "unknown"
-                    error["description"] = "Unknown error type"
-                    
-                errors.append(error)
-        
-        # If no errors found with the first pattern, try a more general pattern
-        if not errors:
-            general_errors = re.findall(r'error (\w+): (.*?)(?:\r?\n|$)', log_content)
+        Errors with file locations are yielded as soon as they are found.
+        Errors without a location are only reported when the whole log had
+        no located errors, so they are held back until the end. Repeats of
+        an error (e.g. in MSBuild's summary) are dropped.
+        
+        Args:
+            log_content: Log content as string, or an iterable of log lines
+            
+        Yields:
+            Error objects with type, message, file info and fingerprint
+        """
+        return unique_errors(self._iter_build_errors(log_content))
+    
+    def _iter_build_errors(self, log_content: Union[str, Iterable[str]]) -> Iterator[Dict]:
+        if isinstance(log_content, str):
+            # Whole-string scans are cheaper than splitting text already in memory
+            lines = [log_content]
+        else:
+            lines = log_content
+        found_located = False
+        general_errors = []
+        
+        for line in lines:
+            # Both patterns need the literal "error " so most lines skip the regexes
+            if "error " not in line:
+                continue
+            
+            # Look for .NET build errors with file paths
+            for match in FILE_ERROR_PATTERN.finditer(line):
+                file_path, line_str, col_str, error_code, error_message = match.groups()
+                found_located = True
+                yield self._build_error(error_code, error_message, file_path, line_str, col_str)
+            
+            # Keep the general matches in case no located errors turn up
+            if not found_located:
+                general_errors.extend(match.groups() for match in GENERAL_ERROR_PATTERN.finditer(line))
+        
+        # If no errors found with the first pattern, fall back to the general pattern
+        if not found_located:
             for error_code, error_message in general_errors:
-                error = {
-                    "code": error_code,
-                    "message": error_message.strip(),
-                    "file": None,
-                    "line": None,
-                    "column": None
-                }
-                
-                # Identify error type based on patterns
-                for pattern, info in ERROR_PATTERNS.items():
-                    if re.search(pattern, error_message) or re.search(pattern, f"error {error_code}: {error_message}"):
-                        error["type"] = info["type"]
-                        error["description"] = info["description"]
-                        break
-                else:
-                    error["type"] = "unknown"
-                    error["description"] = "Unknown error type"
-                    
-                errors.append(error)
-                
+                yield self._build_error(error_code, error_message)
+    
+    def extract_run_errors(self, run_id: int) -> List[Dict]:
+        """
+        Extract the build errors of a failed run.
+        
+        Errors already parsed from the run's logs with the current patterns
+        are taken from the log cache. With the binlog error source, errors
+        are read from the run's binary log artifact if it has one, and with
+        the annotations source from the annotations of its failed jobs if
+        they have every error. With
+        several workers or byte scanning,
+        the run's log archive is written to disk and its members are scanned
+        by archive_scanner; otherwise the logs are streamed through
+        extract_build_errors. Either way the log goes through the log cache,
+        and a log that can't be read completely gives no errors.
+        
+        Args:
+            run_id: Workflow run ID
+            
+        Returns:
+            List of error objects with type, message, and file info
+        """
+        key = f"run/{self.repo}/{run_id}" + ("/failed-jobs" if self.failed_jobs_only else "")
+        if self.error_source != ERROR_SOURCE_LOGS:
+            key += f"/{self.error_source}"
+        if self.log_cache is not None:
+            errors = self.log_cache.get_errors(key, self.errors_version())
+            if errors is not None:
+                return errors
+        
+        with self.metrics.stage("extract", repo=self.repo):
+            self._local.classify_seconds = 0.0
+            errors = self._extract_run_errors(run_id)
+            self.metrics.record_stage("classify", self._local.classify_seconds, repo=self.repo)
+        # An empty list may just mean the download failed, so only errors are kept
+        if errors and self.log_cache is not None:
+            self.log_cache.put_errors(key, self.errors_version(), errors)
         return errors
     
-    def fix_missing_property(self, error: Dict) -> bool:
+    def errors_version(self) -> str:
         """
-        Fix missing property in view model.
+        Identify the patterns errors are extracted and classified with.
+        """
+        sources = FILE_ERROR_PATTERN.pattern + GENERAL_ERROR_PATTERN.pattern + self.classifier.version
+        return hashlib.sha1(sources.encode()).hexdigest()[:12]
+    
+    def _extract_run_errors(self, run_id: int) -> List[Dict]:
+        if self.error_source == ERROR_SOURCE_BINLOG:
+            errors = self.extract_binlog_errors(run_id)
+            if errors is not None:
+                return errors
+            print(f"No binary log for run {run_id}, reading its text logs")
+        elif self.error_source == ERROR_SOURCE_ANNOTATIONS:
+            errors = self.extract_annotation_errors(run_id)
+            if errors is not None:
+                return errors
+        
+        if self.failed_jobs_only or (self.workers <= 1 and not self.byte_scan):
+            try:
+                return self.extract_build_errors(self.iter_run_log_lines(run_id))
+            except (zipfile.BadZipFile, OSError) as e:
+                print(f"Exception while reading logs for run {run_id}: {e}")
+                return []
+        
+        key = f"run/{self.repo}/{run_id}"
+        if self.log_cache is not None:
+            cached = self.log_cache.iter_lines(key)
+            if cached is not None:
+                return self.extract_build_errors(cached)
+        
+        path = f"/repos/{self.repo}/actions/runs/{run_id}/logs"
+        
+        try:
+            # Workers open the archive by name, so it can't stay in memory
+            with tempfile.NamedTemporaryFile(prefix=f"run-{run_id}-", suffix=".zip") as archive:
+                if not self._download(path, archive):
+                    print(f"Error fetching logs for run {run_id}")
+                    return []
+                archive.flush()
+                located, general = scan_archive(archive.name, self.scan_pool(), self.byte_scan,
+                                               self.scan_memory_limit)
+                if self.log_cache is not None:
+                    # Cached as the streaming path would, so a replay doesn't download the archive again
+                    for _ in self.log_cache.store_lines(key, iter_archive_lines(archive)):
+                        pass
+        except (requests.RequestException, zipfile.BadZipFile, OSError) as e:
+            print(f"Exception while fetching logs for run {run_id}: {e}")
+            return []
+        
+        if located:
+            errors = (self._build_error(code, message, file_path, line_str, col_str)
+                      for file_path, line_str, col_str, code, message in located)
+        else:
+            errors = (self._build_error(code, message) for code, message in general)
+        return list(unique_errors(errors))
+    
+    def extract_binlog_errors(self, run_id: int) -> Optional[List[Dict]]:
+        """
+        Read the errors of a run from the binary logs in its build-logs artifact.
         
         Args:
-            error: Error object with details
+            run_id: Workflow run ID
             
         Returns:
-            True if fix was applied, False otherwise
+            List of error objects, or None if the run has no readable binary log
         """
-        if not error.get("file"):
-            # Try to extract file path from the error message
-            file_match = re.search(r'([/\\][\w/\\.-]+\.cs)', error["message"])
-            if file_match:
-                error["file"] = file_match.group(1)
-                # Convert to local path
-                error["file"] = error["file"].replace("/home/runner/work/AccountingModule/AccountingModule/", REPO_PATH + "/")
+        name = BINLOG_ARTIFACT.format(run_id=run_id)
+        status_code, data = self.client.get_json(f"/repos/{self.repo}/actions/runs/{run_id}/artifacts", {"name": name})
+        if status_code != 200:
+            return None
+        artifacts = [artifact for artifact in data.get("artifacts", [])
+                     if artifact.get("name") == name and not artifact.get("expired")]
+        if not artifacts:
+            return None
         
-        if not error.get("file") or not os.path.exists(error["file"]):
-            print(f"File not found: {error.get('file')}")
-            return False
+        located, general = [], []
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=LOG_SPOOL_MAX_SIZE) as archive:
+                if not self._download(f"/repos/{self.repo}/actions/artifacts/{artifacts[0]['id']}/zip", archive):
+                    return None
+                for diagnostic in iter_artifact_diagnostics(archive):
+                    line = str(diagnostic.line) if diagnostic.line > 0 else None
+                    column = str(diagnostic.column) if diagnostic.column > 0 else None
+                    path = diagnostic_path(diagnostic)
+                    if path:
+                        located.append(self._build_error(diagnostic.code or "", diagnostic.message, path, line, column))
+                    else:
+                        general.append(self._build_error(diagnostic.code or "", diagnostic.message))
+        except (requests.RequestException, zipfile.BadZipFile, BinlogFormatError) as e:
+            print(f"Exception while reading the binary log of run {run_id}: {e}")
+            return None
+        
+        # As with text logs, errors without a location only count when no error has one
+        return list(unique_errors(located or general))
+    
+    def extract_annotation_errors(self, run_id: int, jobs: Optional[List[Dict]] = None) -> Optional[List[Dict]]:
+        """
+        Read the errors of a run from the check run annotations of its failed jobs.
+        
+        Annotations prefetched when the run was discovered are used if there
+        are any; otherwise the failed jobs and their annotations are fetched
+        through the REST API, a page of annotations at a time.
+        
+        Args:
+            run_id: Workflow run ID
+            jobs: Only read the annotations of these failed jobs
             
-        # Extract class name and property name
-        match = None
-        if error["type"] == "missing_definition" or error["type"] == "missing_property" or error["type"] == "missing_member":
-            match = re.search(r"'(\w+)' does not contain a definition for '(\w+)'", error["message"])
-            if not match:
-                match = re.search(r"'(\w+)' does not contain a definition for '(\w+)'", f"error {error['code']}: {error['message']}")
+        Returns:
+            List of error objects, or None if the annotations may not have every
+            error: a failed job has no compiler error annotation, or as many as
+            Actions keeps per step
+        """
+        if jobs is None:
+            with self._prefetched_lock:
+                jobs = self._prefetched.pop(run_id, None)
+        if jobs is None:
+            jobs = self.get_failed_jobs(run_id)
+        if not jobs:
+            return None
         
-        if not match:
-            print(f"Could not extract class and property names from: {error['message']}")
-            return False
+        errors = []
+        for job in jobs:
+            annotations = job.get("annotations")
+            if annotations is None:
+                annotations = self.get_job_annotations(job["id"])
+                if annotations is None:
+                    return None
+            job_errors = [error for error in map(self._annotation_error, annotations) if error is not None]
+            if not job_errors:
+                print(f"No compiler errors annotated on failed job {job['id']} ({job['name']}) of run {run_id}, "
+                      f"reading its text logs")
+                return None
+            if len(job_errors) >= ANNOTATION_CAP:
+                print(f"Failed job {job['id']} ({job['name']}) of run {run_id} has {len(job_errors)} error "
+                      f"annotations, which may be truncated, reading its text logs")
+                return None
+            errors += job_errors
+        return list(unique_errors(errors))
+    
+    def get_job_annotations(self, job_id: int) -> Optional[List[Dict]]:
+        """
+        Get every annotation of a job's check run, following pagination.
+        
+        Args:
+            job_id: Workflow job ID, which is also its check run ID
             
-        class_name = match.group(1)
-        property_name = match.group(2)
+        Returns:
+            List of annotation objects, or None if they could not be fetched
+        """
+        annotations = []
+        page = 1
+        while True:
+            try:
+                status_code, data = self.client.get_json(f"/repos/{self.repo}/check-runs/{job_id}/annotations",
+                                                         {"per_page": 100, "page": page})
+            except requests.RequestException as e:
+                print(f"Exception while fetching annotations for job {job_id}: {e}")
+                return None
+            if status_code != 200:
+                print(f"Error fetching annotations for job {job_id}: {status_code}")
+                return None
+            annotations += data
+            if len(data) < 100:
+                return annotations
+            page += 1
+    
+    def prefetch_annotations(self, runs: List[Dict]) -> int:
+        """
+        Fetch the failed jobs of failed runs with their annotations in one GraphQL query.
         
-        # Read the file
-        with open(error["file"], "r") as f:
-            content = f.read()
+        Runs the query doesn't answer are left to extract_annotation_errors,
+        which falls back to the REST API for them.
         
-        # Find the class definition
-        class_pattern = rf"public\s+class\s+{class_name}"
-        class_match = re.search(class_pattern, content)
-        if not class_match:
-            print(f"Could not find class {class_name} in {error['file']}")
-            return False
+        Args:
+            runs: Workflow runs about to be processed
             
-        # Find the class closing brace
-        class_start = class_match.start()
-        brace_count = 0
-        class_end = -1
-        
-        for i in range(class_start, len(content)):
-            if content[i] == '{':
-                brace_count += 1
-            elif content[i] == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    class_end = i
-                    break
-        
-        if class_end == -1:
-            print(f"Could not find class end for {class_name} in {error['file']}")
-            return False
+        Returns:
+            Number of runs whose annotations were prefetched
+        """
+        suites = {run["check_suite_node_id"]: run["id"] for run in runs
+                  if run.get("conclusion") == "failure" and run.get("check_suite_node_id")}
+        if not suites:
+            return 0
+        try:
+            status_code, data = self.client.graphql(ANNOTATIONS_QUERY, {"ids": list(suites),
+                                                                        "annotations": ANNOTATIONS_PER_JOB})
+        except requests.RequestException as e:
+            print(f"Exception while fetching annotations: {e}")
+            return 0
+        if status_code != 200 or data is None:
+            print(f"Error fetching annotations: {status_code}")
+            return 0
         
-        # Determine property type based on name
-        property_type = "string"
-        if property_name.startswith("Is") or property_name.startswith("Has") or property_name.endswith("Enabled") or property_name.endswith("Active"):
-            property_type = "bool"
-        elif property_name.endswith("Id") or property_name.endswith("Count") or property_name.endswith("Number"):
-            property_type = "int"
-        elif property_name.endswith("Date") or property_name.endswith("Time"):
-            property_type = "DateTime"
-        elif property_name.endswith("Amount") or property_name.endswith("Price") or property_name.endswith("Value"):
-            property_type = "decimal"
-        elif property_name.startswith("Available") and property_name.endswith("s"):
-            # Collection property
-            item_type = property_name[9:-1]  # Remove "Available" and "s"
-            property_type = f"IEnumerable<{item_type}>"
-            
-            # Add using System.Collections.Generic if not present
-            if "using System.Collections.Generic;" not in content:
-                using_match = re.search(r"using [^;]+;", content)
-                if using_match:
-                    content = content[:using_match.end()] + "\nusing System.Collections.Generic;" + content[using_match.end():]
-        
-        # Add the missing property
-        property_code = f"""
-        [Display(Name = "{' '.join(re.findall('[A-Z][^A-Z]*', property_name))}")]
-        public {property_type} {property_name} {{ get; set; }}
-        """
-        
-        # Add using System.ComponentModel.DataAnnotations if not present and we're using Display attribute
-        if "using System.ComponentModel.DataAnnotations;" not in content and "[Display" in property_code:
-            using_match = re.search(r"using [^;]+;", content)
-            if using_match:
-                content = content[:using_match.end()] + "\nusing System.ComponentModel.DataAnnotations;" + content[using_match.end():]
-        
-        new_content = content[:class_end] + property_code + content[class_end:]
-        
-        # Write the updated content
-        with open(error["file"], "w") as f:
-            f.write(new_content)
-            
-        print(f"Added missing property '{property_name}' to class '{class_name}' in {error['file']}")
-        return True
+        prefetched = {}
+        for suite in data.get("nodes") or []:
+            check_runs = suite.get("checkRuns") if suite else None
+            if not check_runs or suite["id"] not in suites or check_runs["totalCount"] > len(check_runs["nodes"]):
+                continue
+            jobs = []
+            for check_run in check_runs["nodes"]:
+                annotations = check_run["annotations"]
+                jobs.append({"id": check_run["databaseId"], "name": check_run["name"],
+                             # More than one page is fetched through the REST API
+                             "annotations": [self._rest_annotation(node) for node in annotations["nodes"]]
+                             if annotations["totalCount"] <= len(annotations["nodes"]) else None})
+            prefetched[suites[suite["id"]]] = jobs
+        with self._prefetched_lock:
+            self._prefetched.update(prefetched)
+            while len(self._prefetched) > PREFETCHED_RUNS:
+                del self._prefetched[next(iter(self._prefetched))]
+        return len(prefetched)
+    
+    @staticmethod
+    def _rest_annotation(node: Dict) -> Dict:
+        """
+        Convert a GraphQL CheckAnnotation to the shape of the REST API's annotations.
+        """
+        start = (node.get("location") or {}).get("start") or {}
+        return {"path": node.get("path"), "annotation_level": (node.get("annotationLevel") or "").lower(),
+                "title": node.get("title"), "message": node.get("message"),
+                "start_line": start.get("line"), "start_column": start.get("column")}
+    
+    def _annotation_error(self, annotation: Dict) -> Optional[Dict]:
+        """
+        Build an error object from a failure annotation that reports a compiler error.
+        """
+        if annotation.get("annotation_level") != "failure":
+            return None
+        message = annotation.get("message") or ""
+        # Annotations of a log line keep the whole line, path included
+        match = FILE_ERROR_PATTERN.search(message)
+        if match:
+            file_path, line_str, col_str, code, text = match.groups()
+            return self._build_error(code, text, file_path, line_str, col_str)
+        
+        match = ANNOTATION_CODE_PATTERN.match(message) or GENERAL_ERROR_PATTERN.search(message)
+        if match:
+            code, text = match.groups()
+        else:
+            title_match = ANNOTATION_CODE_PATTERN.match(annotation.get("title") or "")
+            if not title_match:
+                # e.g. "Process completed with exit code 1"
+                return None
+            code, text = title_match.group(1), message
+        
+        path = annotation.get("path")
+        if path == ".github":
+            # Annotations without a file are reported on the workflow
+            path = None
+        relative = path if path and not os.path.isabs(path) else None
+        if relative:
+            # Annotation paths are relative to the repository root
+            path = os.path.join(self.repo_path, path)
+        line, column = annotation.get("start_line"), annotation.get("start_column")
+        error = self._build_error(code, text, path, str(line) if line else None, str(column) if column else None)
+        if relative:
+            # Fingerprinted on the path relative to the checkout, like errors read from logs, so
+            # errors handled in runs using the other source are recognised
+            error["fingerprint"] = error_fingerprint(dict(error, file=relative))
+        return error
+    
+    def scan_pool(self) -> Optional[ProcessPoolExecutor]:
+        """
+        Get the process pool that scans log archive members, starting it on first use.
+        """
+        if self.workers <= 1:
+            return None
+        with self._scan_pool_lock:
+            if self._scan_pool is None:
+                self._scan_pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._scan_pool
+    
+    def run_pool(self) -> ThreadPoolExecutor:
+        """
+        Get the thread pool that processes runs, starting it on first use.
+        """
+        with self._queued_runs_lock:
+            if self._run_pool is None:
+                self._run_pool = ThreadPoolExecutor(max_workers=max(self.run_workers, 1),
+                                                    thread_name_prefix=f"runs-{self.repo}")
+            return self._run_pool
+    
+    def _build_error(self, error_code: str, error_message: str, file_path: Optional[str] = None,
+                     line_str: Optional[str] = None, col_str: Optional[str] = None) -> Dict:
+        """
+        Build a classified error object from the fields of a matched log line.
+        """
+        # Convert line and column to integers if possible
+        line = int(line_str) if line_str and line_str.isdigit() else None
+        column = int(col_str) if col_str and col_str.isdigit() else None
+        start = time.perf_counter()
+        error_type, description = self.classifier.classify(error_code, error_message)
+        # Summed per run, since timing every call as a stage would cost more than classifying
+        self._local.classify_seconds = getattr(self._local, "classify_seconds", 0.0) + time.perf_counter() - start
+        
+        return {
+            "code": error_code,
+            "message": error_message.strip(),
+            "file": file_path,
+            "line": line,
+            "column": column,
+            "type": error_type,
+            "description": description
+        }
+    
+    def fix_missing_property(self, error: Dict) -> bool:
+        """
+        Fix missing property in view model.
+        
+        Args:
+            error: Error object with details
+            
+        Returns:
+            True if fix was applied, False otherwise
+        """
+        planner = FixPlanner(self.repo_path, self.class_index)
+        success = planner.plan_missing_property(error)
+        planner.apply()
+        return success
     
     def fix_type_conversion(self, error: Dict) -> bool:
         """
@@ -350,92 +879,142 @@ class GitHubActionsMonitor:
         Returns:
             True if fix was applied, False otherwise
         """
-        if not error.get("file"):
-            # Try to extract file path from the error message
-            file_match = re.search(r'([/\\][\w/\\.-]+\.cs)', error["message"])
-            if file_match:
-                error["file"] = file_match.group(1)
-                # Convert to local path
-                error["file"] = error["file"].replace("/home/runner/work/AccountingModule/AccountingModule/", REPO_PATH + "/")
-        
-        if not error.get("file") or not os.path.exists(error["file"]):
-            print(f"File not found: {error.get('file')}")
-            return False
-        
-        # Extract source and target types
-        match = None
-        if error["type"] == "type_conversion" or error["type"] == "implicit_conversion":
-            match = re.search(r"Cannot implicitly convert type '([^']+)' to '([^']+)'", error["message"])
-            if not match:
-                match = re.search(r"Cannot implicitly convert type '([^']+)' to '([^']+)'", f"error {error['code']}: {error['message']}")
-        
-        if not match:
-            print(f"Could not extract type information from: {error['message']}")
-            return False
+        planner = FixPlanner(self.repo_path, self.class_index)
+        success = planner.plan_type_conversion(error)
+        planner.apply()
+        return success
+    
+    def fix_missing_namespace(self, error: Dict) -> bool:
+        """
+        Fix a type that could not be found by adding its using directive.
         
-        source_type = match.group(1)
-        target_type = match.group(2)
-        
-        # Read the file
-        with open(error["file"], "r") as f:
-            content = f.read()
-        
-        # If we have line information, try to fix that specific line
-        if error.get("line") is not None:
-            lines = content.split('\n')
-            if 0 <= error["line"] - 1 < len(lines):
-                line = lines[error["line"] - 1]
-                
-                # Look for assignment patterns
-                assignment_match = re.search(r'(\w+)\s*=\s*([^;]+);', line)
-                if assignment_match:
-                    var_name = assignment_match.group(1)
-                    expression = assignment_match.group(2)
-                    
-                    # Add explicit cast
-                    new_line = line.replace(f"{var_name} = {expression}", f"{var_name} = ({target_type}){expression}")
-                    lines[error["line"] - 1] = new_line
-                    
-                    # Write the updated content
-                    with open(error["file"], "w") as f:
-                        f.write('\n'.join(lines))
-                    
-                    print(f"Added explicit cast to {target_type} in {error['file']} at line {error['line']}")
-                    return True
-        
-        print(f"Could not fix type conversion error in {error['file']}")
-        return False
+        Args:
+            error: Error object with details
+            
+        Returns:
+            True if fix was applied, False otherwise
+        """
+        planner = FixPlanner(self.repo_path, self.class_index)
+        success = planner.plan_missing_namespace(error)
+        planner.apply()
+        return success
     
     def fix_errors(self, errors: List[Dict]) -> int:
         """
         Apply fixes for detected errors.
         
+        All fixes are planned first, then every touched file is written once.
+        
         Args:
             errors: List of error objects
             
         Returns:
             Number of successfully applied fixes
         """
+        with self.metrics.stage("fix", repo=self.repo):
+            return self._fix_errors(errors)
+    
+    def _fix_errors(self, errors: List[Dict]) -> int:
+        planner = FixPlanner(self.repo_path, self.class_index)
         fixes_applied = 0
         
+        results = {}
+        # Fixed errors are only remembered once their fix went out, see settle_fingerprints
+        self._local.fixed_fingerprints = {}
+        # (error, fixer, result) of every error, for the history
+        self._local.fix_results = []
+        
         for error in errors:
             success = False
+            attempted = True
             
-            if error["type"] == "missing_property" or error["type"] == "missing_definition" or error["type"] == "missing_member":
-                success = self.fix_missing_property(error)
-            elif error["type"] == "type_conversion" or error["type"] == "implicit_conversion":
-                success = self.fix_type_conversion(error)
-            # Add more fix implementations here
+            fixer = self.fixers.get(error["type"]) or self.fixers.get(error.get("code"))
+            if fixer in FIXERS:
+                success = planner.plan(fixer, error)
+            else:
+                attempted = False
             
+            result = RESULT_APPLIED if success else RESULT_FAILED if attempted else RESULT_UNSUPPORTED
+            self.metrics.inc("monitor_fixes_total", help="Fix attempts by error type and result", repo=self.repo,
+                             type=error["type"], result=result)
+            self._local.fix_results.append((error, fixer if attempted else None, result))
             if success:
                 fixes_applied += 1
-                    
+            # Errors no fixer handles yet stay eligible for fixers added later
+            if success and error.get("fingerprint"):
+                self._local.fixed_fingerprints[error["fingerprint"]] = FIX_RESULT_FIXED
+            elif attempted and error.get("fingerprint"):
+                results[error["fingerprint"]] = FIX_RESULT_FAILED
+        
+        self._changed_paths.update(planner.apply())
+        self.state.remember_fingerprints(self.repo, results)
         return fixes_applied
     
+    def settle_fingerprints(self, fixed: Dict[str, str], delivered: bool) -> None:
+        """
+        Remember the errors fixed so far once their fixes are committed and pushed.
+        
+        Until then they stay pending, so later runs with the same errors aren't
+        skipped as fixed while the fixes sit uncommitted or unpushed. Called with
+        fix_lock held.
+        
+        Args:
+            fixed: Fingerprints of the errors just fixed
+            delivered: Whether the fixes (and any pending ones) were committed and pushed
+        """
+        self._pending_fingerprints.update(fixed)
+        if delivered and self._pending_fingerprints:
+            self.state.remember_fingerprints(self.repo, self._pending_fingerprints)
+            self._pending_fingerprints = {}
+    
+    def retry_pending_fixes(self) -> None:
+        """
+        Commit fixes whose commit failed and push commits whose push failed.
+        
+        Called with fix_lock held.
+        """
+        if self._changed_paths:
+            print("Retrying to commit and push earlier fixes")
+            self.last_commit = None
+            delivered = self.commit_and_push_fixes(max(len(self._pending_fingerprints), 1))
+        elif self._unpushed:
+            print("Retrying to push earlier fixes")
+            delivered = self.push()
+        else:
+            return
+        self.settle_fingerprints({}, delivered)
+    
+    def skip_handled_errors(self, errors: List[Dict]) -> List[Dict]:
+        """
+        Drop errors that earlier runs already fixed or failed to fix.
+        
+        Args:
+            errors: Error objects with fingerprints
+            
+        Returns:
+            Errors not handled before
+        """
+        handled = self.state.handled_fingerprints(self.repo, [error["fingerprint"] for error in errors])
+        if not handled:
+            return errors
+        
+        remaining = [error for error in errors if error["fingerprint"] not in handled]
+        fixed = sum(1 for result in handled.values() if result == FIX_RESULT_FIXED)
+        print(f"Skipping {len(handled)} errors handled in earlier runs "
+              f"({fixed} fixed, {len(handled) - fixed} failed)")
+        # Seen again, so they are kept longest
+        self.state.remember_fingerprints(self.repo, handled)
+        return remaining
+    
     def commit_and_push_fixes(self, fixes_count: int) -> bool:
         """
         Commit and push fixes to the repository.
         
+        Only the files written by fix_errors are staged. Files whose content
+        matches what was committed last are left out, and if nothing is left
+        no commit is made. With a push window, the push waits for commits of
+        other runs so they go out together.
+        
         Args:
             fixes_count: Number of fixes applied
             
@@ -444,99 +1023,670 @@ class GitHubActionsMonitor:
         """
         if fixes_count == 0:
             return False
-            
+        
+        with self.metrics.stage("commit", repo=self.repo):
+            success = self._commit_and_push(fixes_count)
+        self.metrics.inc("monitor_commits_total", help="Commit attempts by result", repo=self.repo,
+                         result="committed" if success else "failed")
+        return success
+    
+    def _commit_and_push(self, fixes_count: int) -> bool:
+        digests = self._changed_digests()
+        paths = list(digests)
+        if not paths:
+            print("Fixed files are unchanged since the last commit, nothing to commit")
+            self._changed_paths.clear()
+            return True
+        
         try:
-            # Stage changes
-            subprocess.run(["git", "add", "."], cwd=REPO_PATH, check=True)
+            # Stage only the fixed files; "git add ." walks the whole working tree
+            subprocess.run(["git", "add", "--"] + paths, cwd=self.repo_path, check=True)
             
             # Commit changes
             commit_message = f"Auto-fix: Applied {fixes_count} fixes for build errors"
-            subprocess.run(["git", "commit", "-m", commit_message], cwd=REPO_PATH, check=True)
+            subprocess.run(["git", "commit", "-m", commit_message, "--"] + paths, cwd=self.repo_path, check=True)
+            self.last_commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=self.repo_path, check=True,
+                                              capture_output=True, text=True).stdout.strip()
+        except subprocess.CalledProcessError as e:
+            print(f"Error committing fixes: {e}")
+            return False
+        
+        self._committed_digests.update(digests)
+        self._changed_paths.clear()
+        
+        if self.push_window <= 0:
+            return self.push()
+        with self._push_lock:
+            if self._push_timer is None:
+                self._push_timer = threading.Timer(self.push_window, self.push)
+                self._push_timer.daemon = True
+                self._push_timer.start()
+        print(f"Committed {fixes_count} fixes, pushing within {self.push_window:g}s")
+        return True
+    
+    def _changed_digests(self) -> Dict[str, Optional[str]]:
+        """
+        Content hashes of the changed files whose content differs from what
+        was committed last, keyed by path relative to the checkout (None for
+        deleted files).
+        """
+        root = os.path.abspath(self.repo_path)
+        digests = {}
+        for path in sorted(self._changed_paths):
+            relative = os.path.relpath(os.path.abspath(path), root)
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+            except FileNotFoundError:
+                digest = None
+            if digest is None or self._committed_digests.get(relative) != digest:
+                digests[relative] = digest
+        return digests
+    
+    def push(self) -> bool:
+        """
+        Push every commit made so far, ending the current push window.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        with self._push_lock:
+            self._push_timer = None
+        try:
+            with self.metrics.stage("push", repo=self.repo):
+                subprocess.run(["git", "push"], cwd=self.repo_path, check=True)
+        except subprocess.CalledProcessError as e:
+            # The commits stay local and go out with the next push
+            print(f"Error pushing fixes: {e}")
+            self._unpushed = True
+            self.metrics.inc("monitor_pushes_total", help="Pushes by result", repo=self.repo, result="failed")
+            return False
+        self._unpushed = False
+        print("Successfully pushed fixes")
+        self.metrics.inc("monitor_pushes_total", help="Pushes by result", repo=self.repo, result="pushed")
+        return True
+    
+    def flush_push(self) -> None:
+        """
+        Push now if commits are waiting for their push window to end.
+        """
+        with self._push_lock:
+            timer, self._push_timer = self._push_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.push()
+    
+    def report_cycle_stats(self) -> Dict[str, int]:
+        """
+        Print and reset the API usage counters of the cycle that just ended.
+        
+        Returns:
+            Dictionary with "requests", "not_modified" and "bytes" counts
+        """
+        stats = self.client.reset_stats()
+        if self.history is not None:
+            self.history.flush()
+        self.metrics.inc("monitor_api_requests_total", stats["requests"], help="GitHub API requests", repo=self.repo)
+        self.metrics.inc("monitor_api_not_modified_total", stats["not_modified"],
+                         help="GitHub API requests answered from the ETag cache", repo=self.repo)
+        cache = self.log_cache.reset_stats() if self.log_cache is not None else None
+        if self.metrics.emit("cycle", repo=self.repo, api=stats, rate_limit_remaining=self.client.rate_limit_remaining,
+                             log_cache=cache, stage_seconds_total=self.metrics.stage_totals(repo=self.repo)):
+            return stats
+        
+        summary = (f"API usage this cycle: {stats['requests']} requests, "
+                   f"{stats['not_modified']} not modified, {stats['bytes']} bytes")
+        if self.client.rate_limit_remaining is not None:
+            summary += f", rate limit remaining {self.client.rate_limit_remaining}"
+        if cache is not None:
+            summary += (f"; log cache {cache['hits']} hits, {cache['misses']} misses, "
+                        f"parsed errors {cache['error_hits']} hits, {cache['error_misses']} misses")
+        print(summary)
+        return stats
+    
+    def touch_heartbeat(self) -> None:
+        """
+        Touch the heartbeat file, if there is one.
+        """
+        if self.heartbeat_path:
+            with open(self.heartbeat_path, "a"):
+                os.utime(self.heartbeat_path)
+    
+    def start_cycle(self) -> None:
+        """
+        Touch the heartbeat file, retry fixes that didn't go out and pick up changed settings.
+        """
+        self.touch_heartbeat()
+        if self._changed_paths or self._unpushed:
+            with self.fix_lock:
+                self.retry_pending_fixes()
+        
+        settings = self.settings.poll()
+        if settings is None:
+            return
+        # Swapped rather than reloaded in place, since other threads may be classifying
+        self.classifier, compiled = self.classifier.reloaded(settings["error_patterns"])
+        self.fixers = fixers_by_error_type(settings["fixers"])
+        print(f"Reloaded settings from {self.settings.path}: {len(settings['error_patterns'])} error patterns "
+              f"({compiled} recompiled), fixers for {', '.join(sorted(self.fixers)) or 'no error types'}")
+    
+    def discover_runs(self) -> List[Dict]:
+        """
+        Record new and changed runs and return the ones that reached a
+        terminal status since they were last seen and still need processing.
+        
+        Returns:
+            List of workflow runs to process, oldest first
+        """
+        self.start_cycle()
+        with self.metrics.stage("poll", repo=self.repo):
+            runs = self._discover_runs()
+            if self.error_source == ERROR_SOURCE_ANNOTATIONS:
+                self.prefetch_annotations(runs)
+        return runs
+    
+    def _discover_runs(self) -> List[Dict]:
+        bootstrap = self.state.is_empty(self.repo)
+        since = self.state.latest_created_at(self.repo)
+        runs = self.get_workflow_runs(created=f">={since}" if since else None, per_page=RUNS_PER_PAGE)
+        
+        # Runs that were still in progress may have dropped off the first page
+        listed = {run["id"] for run in runs}
+        for run_id in self.state.pending_run_ids(self.repo):
+            if run_id not in listed:
+                run = self.get_workflow_run(run_id)
+                if run:
+                    runs.append(run)
+        
+        if not runs:
+            print(f"No new or changed workflow runs found for {self.repo}")
+            return []
+        
+        to_process = []
+        for run in sorted(runs, key=lambda r: r["id"]):
+            self.state.record_run(self.repo, run)
             
-            # Push changes
-            subprocess.run(["git", "push"], cwd=REPO_PATH, check=True)
+            # On first start, failures that predate the monitor are left alone
+            if bootstrap and run["status"] == TERMINAL_STATUS:
+                self.state.mark_processed(run["id"], OUTCOME_BASELINE)
+                continue
             
-            print(f"Successfully committed and pushed {fixes_count} fixes")
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"Error committing and pushing fixes: {e}")
+            if self.state.needs_processing(run["id"]):
+                to_process.append(run)
+        
+        return to_process
+    
+    def poll_once(self, wait: bool = True) -> List[Dict]:
+        """
+        Run one polling cycle: discover runs and process the completed ones
+        in the run pool, several at a time.
+        
+        Args:
+            wait: Wait for the runs to be processed; otherwise they carry on
+                while later cycles poll, and runs still queued are not submitted again
+        
+        Returns:
+            List of workflow runs processed in this cycle (submitted, if not waiting)
+        """
+        submitted = []
+        for run in self.discover_runs():
+            future = self._submit_run(run, self.handle_run, run)
+            if future:
+                submitted.append((run, future))
+        early = []
+        if self.early_failures:
+            for run, jobs in self.discover_failed_jobs():
+                early.append(self._submit_run(run, self.handle_failed_jobs, run, jobs))
+        if not wait:
+            return [run for run, _ in submitted]
+        for future in early:
+            if future:
+                future.result()
+        return [run for run, future in submitted if future.result()]
+    
+    def _submit_run(self, run: Dict, function: Callable, *args) -> Optional[Future]:
+        # Work on a run still queued or going is not submitted again
+        with self._queued_runs_lock:
+            if run["id"] in self._queued_runs:
+                return None
+        capture = getattr(self._local, "capture", None)
+        if capture is not None:
+            # The run's processing counts towards the profile of the cycle submitting it
+            function = capture.wrap(function)
+        future = self.run_pool().submit(function, *args)
+        if capture is not None:
+            capture.track(future)
+        with self._queued_runs_lock:
+            self._queued_runs[run["id"]] = future
+        future.add_done_callback(lambda done: self._run_done(run, done))
+        return future
+    
+    def _run_done(self, run: Dict, future: Future) -> None:
+        with self._queued_runs_lock:
+            self._queued_runs.pop(run["id"], None)
+        if not future.cancelled() and future.exception() is not None:
+            # Left unprocessed, so the next cycle picks the run up again
+            print(f"Error processing run {run['id']}: {future.exception()}")
+    
+    def superseded(self, run: Dict) -> bool:
+        """
+        Check whether a newer run of the same workflow on the same branch was
+        recorded, in which case fixing this one would be wasted work.
+        """
+        newer = self.state.newer_run_id(self.repo, run)
+        if newer is None:
             return False
+        print(f"Run {run['id']} is superseded by run {newer} on {run['head_branch']}, skipping it")
+        return True
+    
+    def handle_run(self, run: Dict) -> bool:
+        """
+        Process a recorded run unless another worker already claimed it.
+        
+        Args:
+            run: Workflow run object
+            
+        Returns:
+            True if the run was processed by this call
+        """
+        if not self.state.claim_run(run["id"]):
+            return False
+        outcome = None
+        start = time.perf_counter()
+        try:
+            outcome = self.process_run(run)
+        finally:
+            # A failed attempt releases the claim so a later cycle retries the run
+            self.state.mark_processed(run["id"], outcome)
+            self.metrics.inc("monitor_runs_total", help="Runs processed by outcome", repo=self.repo,
+                             outcome=outcome or "error")
+            self.metrics.emit("run", repo=self.repo, run_id=run["id"], outcome=outcome or "error",
+                              seconds=round(time.perf_counter() - start, 3))
+        return True
+    
+    def process_run(self, run: Dict) -> str:
+        """
+        Extract build errors from a completed run and apply fixes for them.
+        
+        Args:
+            run: Workflow run object
+            
+        Returns:
+            Processing outcome, one of the run_state OUTCOME_* constants
+        """
+        # Only process completed runs with failure status
+        if run["status"] != "completed" or run["conclusion"] != "failure":
+            return OUTCOME_SKIPPED
+        
+        # Older failures are left alone once a newer run is on its way, here and after each slow stage
+        if self.superseded(run):
+            return OUTCOME_SUPERSEDED
+        
+        run_id = run["id"]
+        print(f"Found failed workflow run: {run_id} ({run['name']})")
+        
+        # Fetch the logs for the failed run and extract build errors
+        errors = self.extract_run_errors(run_id)
+        if self.superseded(run):
+            return OUTCOME_SUPERSEDED
+        return self.fix_run_errors(run, errors)
+    
+    def fix_run_errors(self, run: Dict, errors: List[Dict]) -> str:
+        """
+        Fix the build errors extracted from a run and commit the fixes.
+        
+        Args:
+            run: Workflow run object
+            errors: Error objects extracted from the run's logs
+            
+        Returns:
+            Processing outcome, one of the run_state OUTCOME_* constants
+        """
+        if not errors:
+            print("No actionable build errors found in logs")
+            return OUTCOME_NO_ERRORS
+        
+        errors = list(unique_errors(errors))
+        with self.fix_lock:
+            # Fixes of earlier runs that didn't go out are handled before their errors count as new
+            self.retry_pending_fixes()
+            # Runs fixing at the same time would otherwise both pass the check and apply the same fix,
+            # so errors are skipped and remembered (by fix_errors) under the same lock
+            remaining = self.skip_handled_errors(errors)
+            if len(remaining) < len(errors):
+                new = {error["fingerprint"] for error in remaining}
+                self.record_history(run, [(error, None, RESULT_SKIPPED) for error in errors
+                                          if error["fingerprint"] not in new])
+            errors = remaining
+            if not errors:
+                print("No new build errors since earlier runs")
+                return OUTCOME_NO_FIXES
+            
+            for error in errors:
+                self.metrics.inc("monitor_build_errors_total", help="Build errors found by type", repo=self.repo,
+                                 type=error["type"])
+            print(f"Found {len(errors)} build errors")
+            for i, error in enumerate(errors):
+                print(f"Error {i+1}: {error['type']} - {error['message']}")
+            
+            # Fixes of other runs may have taken a while
+            if self.superseded(run):
+                return OUTCOME_SUPERSEDED
+            
+            # Apply fixes
+            fixes_count = self.fix_errors(errors)
+            if fixes_count == 0:
+                self.record_history(run, self._local.fix_results)
+                return OUTCOME_NO_FIXES
+            
+            # Commit and push fixes
+            self.last_commit = None
+            committed = self.commit_and_push_fixes(fixes_count)
+            self.settle_fingerprints(self._local.fixed_fingerprints, committed)
+            self.record_history(run, self._local.fix_results, self.last_commit if committed else None)
+            return OUTCOME_FIXED if committed else OUTCOME_COMMIT_FAILED
+    
+    def record_history(self, run: Dict, entries: List[Tuple[Dict, Optional[str], str]],
+                       commit_sha: Optional[str] = None) -> None:
+        """
+        Record errors of a run and their fix results in the history, if there is one.
+        
+        Args:
+            run: Workflow run object
+            entries: (error, fixer, result) of every error, result being a history_store RESULT_* constant
+            commit_sha: Commit the applied fixes went out in
+        """
+        if self.history is not None and entries:
+            self.history.record(self.repo, run["id"], entries, commit_sha)
+    
+    def discover_failed_jobs(self) -> List[Tuple[Dict, List[Dict]]]:
+        """
+        Find the jobs of in-progress runs that failed since the last poll.
+        
+        Logs of a job can be downloaded as soon as the job completes, which
+        is often long before the run's other jobs do.
+        
+        Returns:
+            List of (run, failed jobs) tuples
+        """
+        pending = self.state.pending_run_ids(self.repo)
+        # Runs that completed are processed as a whole, so their jobs are forgotten
+        self._early_jobs = {run_id: jobs for run_id, jobs in self._early_jobs.items() if run_id in pending}
+        
+        found = []
+        for run_id in pending:
+            run = self.state.get_run(run_id)
+            if run["status"] != "in_progress" or self.state.newer_run_id(self.repo, run):
+                continue
+            handled = self._early_jobs.setdefault(run_id, set())
+            jobs = [job for job in self.get_failed_jobs(run_id) if job["id"] not in handled]
+            if jobs:
+                handled.update(job["id"] for job in jobs)
+                found.append((run, jobs))
+        return found
+    
+    def handle_failed_jobs(self, run: Dict, jobs: List[Dict]) -> str:
+        """
+        Handle failed jobs of an in-progress run, recording metrics. The run
+        itself is still processed once it completes; errors fixed now are
+        skipped then through their fingerprints.
+        
+        Args:
+            run: Workflow run object
+            jobs: Failed job objects with "failed_steps"
+            
+        Returns:
+            Processing outcome, one of the run_state OUTCOME_* constants
+        """
+        outcome = None
+        start = time.perf_counter()
+        try:
+            outcome = self.process_failed_jobs(run, jobs)
+            return outcome
+        finally:
+            self.metrics.inc("monitor_early_failures_total", help="Failed jobs of in-progress runs handled, by outcome",
+                             repo=self.repo, outcome=outcome or "error")
+            self.metrics.emit("early_failure", repo=self.repo, run_id=run["id"], jobs=[job["id"] for job in jobs],
+                              outcome=outcome or "error", seconds=round(time.perf_counter() - start, 3))
+    
+    def process_failed_jobs(self, run: Dict, jobs: List[Dict]) -> str:
+        """
+        Extract build errors from the failed steps of jobs and apply fixes for
+        them, without waiting for the rest of the run.
+        
+        Args:
+            run: Workflow run object
+            jobs: Failed job objects with "failed_steps"
+            
+        Returns:
+            Processing outcome, one of the run_state OUTCOME_* constants
+        """
+        if self.superseded(run):
+            return OUTCOME_SUPERSEDED
+        
+        errors = None
+        if self.error_source == ERROR_SOURCE_ANNOTATIONS:
+            with self.metrics.stage("extract", repo=self.repo):
+                errors = self.extract_annotation_errors(run["id"], jobs)
+        if errors is None:
+            errors = []
+            for job in jobs:
+                print(f"Job {job['id']} ({job['name']}) of run {run['id']} failed while the run is in progress, "
+                      f"steps: {', '.join(step['name'] for step in job['failed_steps']) or 'all'}")
+                with self.metrics.stage("extract", repo=self.repo):
+                    errors.extend(self.extract_build_errors(self.iter_job_log_lines(job["id"], job["failed_steps"])))
+        if self.superseded(run):
+            return OUTCOME_SUPERSEDED
+        return self.fix_run_errors(run, errors)
+    
+    def active_run_count(self) -> int:
+        """
+        Count the runs that were queued or in progress at the last poll.
+        """
+        return len(self.state.pending_run_ids(self.repo))
+    
+    def run_cycle(self, scheduler: PollScheduler) -> float:
+        """
+        Run one polling cycle and decide how long to wait before the next one.
+        
+        Args:
+            scheduler: Scheduler tracking activity and errors across cycles
+            
+        Returns:
+            Delay in seconds before the next cycle
+        """
+        with self.profile_cycle():
+            try:
+                # Runs are processed in the run pool while the next cycles poll
+                self.poll_once(wait=False)
+                delay, reason = scheduler.next_delay(self.active_run_count(), self.client.poll_interval)
+            except Exception as e:
+                print(f"Error in monitoring loop: {e}")
+                delay, reason = scheduler.on_error()
+        
+        self.report_cycle_stats()
+        print(f"Next poll of {self.repo} in {delay:.0f}s ({reason})")
+        return delay
+    
+    @contextlib.contextmanager
+    def profile_cycle(self) -> Iterator[Optional[CycleCapture]]:
+        """
+        Profile the cycle run in this block, with the runs it submits, if the profiler picks it.
+        
+        Yields:
+            Capture of the cycle, or None if it is not profiled
+        """
+        capture = self.profiler.start_cycle(self.repo) if self.profiler is not None else None
+        if capture is None:
+            yield None
+            return
+        self._local.capture = capture
+        try:
+            with capture:
+                yield capture
+        finally:
+            self._local.capture = None
     
     def monitor_and_fix(self) -> None:
         """
         Main monitoring loop to check for failed builds and apply fixes.
         """
         print(f"Starting GitHub Actions monitor for {self.repo}...")
+        scheduler = PollScheduler(POLL_INTERVAL, max_retries=MAX_RETRIES)
         
-        while True:
-            try:
-                # Get recent workflow runs
-                runs = self.get_workflow_runs()
-                
-                if not runs:
-                    print("No workflow runs found")
-                    time.sleep(POLL_INTERVAL)
-                    continue
-                
-                # Check for new failed runs
-                for run in runs:
-                    run_id = run["id"]
-                    
-                    # Skip if we've already checked this run
-                    if self.last_checked_run_id and run_id <= self.last_checked_run_id:
-                        continue
-                    
-                    # Update the last checked run ID
-                    if not self.last_checked_run_id or run_id > self.last_checked_run_id:
-                        self.last_checked_run_id = run_id
-                    
-                    # Only process completed runs with failure status
-                    if run["status"] == "completed" and run["conclusion"] == "failure":
-                        print(f"Found failed workflow run: {run_id} ({run['name']})")
-                        
-                        # Get logs for the failed run
-                        logs = self.get_workflow_logs(run_id)
-                        
-                        if logs:
-                            # Extract build errors
-                            errors = self.extract_build_errors(logs)
-                            
-                            if errors:
-                                print(f"Found {len(errors)} build errors")
-                                for i, error in enumerate(errors):
-                                    print(f"Error {i+1}: {error['type']} - {error['message']}")
-                                
-                                # Apply fixes
-                                fixes_count = self.fix_errors(errors)
-                                
-                                if fixes_count > 0:
-                                    # Commit and push fixes
-                                    self.commit_and_push_fixes(fixes_count)
-                            else:
-                                print("No actionable build errors found in logs")
-                
+        try:
+            while True:
                 # Wait before checking again
-                time.sleep(POLL_INTERVAL)
-                
-            except Exception as e:
-                print(f"Error in monitoring loop: {e}")
-                time.sleep(POLL_INTERVAL)
+                time.sleep(self.run_cycle(scheduler))
+        finally:
+            # Runs not started yet are dropped and picked up again after a restart
+            self.run_pool().shutdown(cancel_futures=True)
+            self.flush_push()
+            if self.history is not None:
+                self.history.flush()
 
 def main():
+    if sys.argv[1:2] == ["history"]:
+        import history_store
+        
+        history_store.main(sys.argv[2:])
+        return
+    
     # Define argument parser
     parser = argparse.ArgumentParser(description="Monitor GitHub Actions workflow runs and auto-fix build errors")
     parser.add_argument("--token", required=True, help="GitHub personal access token")
-    parser.add_argument("--repo", required=True, help="Repository in format 'owner/repo'")
+    parser.add_argument("--repo", action="append",
+                        help="Repository in format 'owner/repo'; several repositories are listed in --config "
+                             "with their checkouts")
+    parser.add_argument("--config", help="JSON file listing the repositories to monitor")
     parser.add_argument("--interval", type=int, help="Polling interval in seconds")
+    parser.add_argument("--api-url", default=GITHUB_API_URL, help="Base URL of the GitHub REST API")
+    parser.add_argument("--failed-jobs-only", action="store_true",
+                        help="Download only the failed steps of failed jobs instead of the whole run archive")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes that scan log archive members in parallel")
+    parser.add_argument("--byte-scan", action="store_true",
+                        help="Scan log archive members as bytes (mmap'd when stored uncompressed)")
+    parser.add_argument("--scan-memory", type=int, default=SCAN_MEMORY_LIMIT // (1024 * 1024),
+                        help="MB a byte scan of a compressed log archive member may hold at once, per process")
+    parser.add_argument("--log-cache-dir", default=LOG_CACHE_DIR, help="Directory caching downloaded logs")
+    parser.add_argument("--log-cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Size in MB the log cache is evicted down to")
+    parser.add_argument("--log-cache-age", type=float, default=DEFAULT_MAX_AGE / 86400,
+                        help="Days a cached log may go unused before it is dropped")
+    parser.add_argument("--no-log-cache", action="store_true", help="Download logs every time")
+    parser.add_argument("--error-source", choices=(ERROR_SOURCE_LOGS, ERROR_SOURCE_BINLOG, ERROR_SOURCE_ANNOTATIONS),
+                        default=ERROR_SOURCE_LOGS,
+                        help="Read errors from the text logs, the build-logs binary log artifact "
+                             "or the check run annotations of failed jobs")
+    parser.add_argument("--settings", default=SETTINGS_PATH,
+                        help="Error pattern and fixer settings, reloaded when the file changes")
+    parser.add_argument("--heartbeat-file", help="File touched every polling cycle for health checks")
+    parser.add_argument("--run-workers", type=int, default=RUN_WORKERS,
+                        help="Failed runs downloaded and parsed at the same time")
+    parser.add_argument("--early-failures", action="store_true",
+                        help="Fix the errors of failed jobs while their run is still in progress")
+    parser.add_argument("--push-window", type=float, default=PUSH_WINDOW,
+                        help="Seconds a fix commit waits so commits of other runs share its push")
+    parser.add_argument("--profile", action="store_true",
+                        help="Dump cProfile statistics of polling cycles (SIGUSR1 toggles profiling at runtime)")
+    parser.add_argument("--trace-memory", action="store_true", help="Dump tracemalloc snapshots of polling cycles")
+    parser.add_argument("--profile-every", type=int,
+                        help="Dump every Nth cycle (every cycle unless --profile-slow is given)")
+    parser.add_argument("--profile-slow", type=float, help="Dump cycles taking at least this many seconds")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="Directory profile dumps are written to")
+    parser.add_argument("--profile-keep", type=int, default=KEEP_DUMPS, help="Cycles whose profile dumps are kept")
+    parser.add_argument("--profile-top", type=int, default=TOP_N,
+                        help="Functions and allocation sites listed in a profile summary")
+    parser.add_argument("--json-logs", action="store_true", help="Print run and cycle summaries as JSON lines")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics at /metrics on this port")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Interface the metrics endpoint listens on")
+    parser.add_argument("--state-db", default=STATE_DB_PATH, help="SQLite file remembering processed runs")
+    parser.add_argument("--history-db", default=HISTORY_DB_PATH,
+                        help="SQLite file recording errors and fix results (query it with the history command)")
+    parser.add_argument("--no-history", action="store_true", help="Don't record errors and fix results")
+    parser.add_argument("--budget", type=int, help="API requests per hour shared by all repositories")
+    parser.add_argument("--per-repo-concurrency", type=int, help="Concurrent API/processing tasks per repository")
+    parser.add_argument("--webhook", action="store_true",
+                        help="Receive workflow_run/workflow_job webhooks and only poll to reconcile")
+    parser.add_argument("--webhook-host", default="127.0.0.1", help="Interface the webhook server listens on")
+    parser.add_argument("--webhook-port", type=int, default=8080, help="Port the webhook server listens on")
+    parser.add_argument("--webhook-secret", default=os.environ.get("GITHUB_WEBHOOK_SECRET"),
+                        help="Webhook secret (defaults to $GITHUB_WEBHOOK_SECRET)")
+    parser.add_argument("--reconcile-interval", type=int,
+                        help="Polling interval in seconds while in webhook mode")
     
     args = parser.parse_args()
+    if not args.repo and not args.config:
+        parser.error("either --repo or --config is required")
+    if args.webhook and (args.config or len(args.repo) > 1):
+        parser.error("--webhook monitors a single --repo")
+    if args.webhook and not args.webhook_secret:
+        parser.error("--webhook requires --webhook-secret or $GITHUB_WEBHOOK_SECRET")
+    if args.profile_keep < 1:
+        parser.error("--profile-keep must be at least 1")
+    
+    # Stopping through SystemExit runs the cleanup in finally blocks, e.g. pushing pending commits
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    metrics = Metrics(json_logs=args.json_logs)
+    if args.metrics_port is not None:
+        MetricsServer(metrics, args.metrics_host, args.metrics_port).start()
+    
+    history = None if args.no_history else HistoryStore(args.history_db)
+    profiler = CycleProfiler(args.profile_dir, cpu=args.profile, memory=args.trace_memory, every=args.profile_every,
+                             slow_seconds=args.profile_slow, keep=args.profile_keep, top=args.profile_top)
+    profiler.install_signal()
+    
+    log_cache = None
+    if not args.no_log_cache:
+        log_cache = LogCache(args.log_cache_dir, args.log_cache_size * 1024 * 1024, args.log_cache_age * 86400)
     
     # Use global variable
     if args.interval:
         global POLL_INTERVAL
         POLL_INTERVAL = args.interval
     
-    monitor = GitHubActionsMonitor(args.token, args.repo)
+    if args.config or len(args.repo) > 1:
+        import asyncio
+        from multi_repo_monitor import MultiRepoMonitor, check_repo_paths, load_config
+        
+        try:
+            config = load_config(args.config) if args.config else {"repos": []}
+            config["repos"] += [{"repo": repo} for repo in args.repo or []]
+            check_repo_paths(config["repos"])
+        except ValueError as e:
+            parser.error(str(e))
+        options = {"interval": args.interval or config.get("interval", POLL_INTERVAL)}
+        for key, value in (("budget_per_hour", args.budget), ("per_repo_concurrency", args.per_repo_concurrency)):
+            if value or key in config:
+                options[key] = value or config[key]
+        
+        monitor = MultiRepoMonitor(args.token, config["repos"], state_path=args.state_db,
+                                   failed_jobs_only=args.failed_jobs_only, workers=args.workers,
+                                   byte_scan=args.byte_scan, scan_memory_limit=args.scan_memory * 1024 * 1024,
+                                   run_workers=args.run_workers, early_failures=args.early_failures,
+                                   history=history, profiler=profiler, log_cache=log_cache, api_url=args.api_url,
+                                   metrics=metrics, push_window=args.push_window, error_source=args.error_source,
+                                   settings_path=args.settings, heartbeat_path=args.heartbeat_file, **options)
+        asyncio.run(monitor.run())
+        return
+    
+    monitor = GitHubActionsMonitor(args.token, args.repo[0], failed_jobs_only=args.failed_jobs_only,
+                                   state_path=args.state_db, workers=args.workers, byte_scan=args.byte_scan,
+                                   scan_memory_limit=args.scan_memory * 1024 * 1024, run_workers=args.run_workers,
+                                   early_failures=args.early_failures, history=history, profiler=profiler,
+                                   log_cache=log_cache, api_url=args.api_url, metrics=metrics,
+                                   push_window=args.push_window, error_source=args.error_source,
+                                   settings_path=args.settings, heartbeat_path=args.heartbeat_file)
+    
+    if args.webhook:
+        from webhook_server import WebhookReceiver, RECONCILE_INTERVAL
+        
+        receiver = WebhookReceiver(monitor, args.webhook_secret, args.webhook_host, args.webhook_port)
+        receiver.serve_forever(args.reconcile_interval or RECONCILE_INTERVAL)
+        return
+    
     monitor.monitor_and_fix()
 
 if __name__ == "__main__":
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+GitHub REST API Client
+
+A small client shared by the monitor's API calls. It keeps one pooled
+keep-alive session, answers repeated GETs from an ETag cache via
+conditional requests (304 responses do not count against the rate limit),
+throttles itself from the X-RateLimit-* headers before GitHub starts
+returning 403s, and counts requests, 304s and bytes per polling cycle.
+GraphQL queries go through the same session.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GITHUB_API_URL = "https://api.github.com"
+POOL_SIZE = 10
+ETAG_CACHE_SIZE = 256
+RATE_LIMIT_FLOOR = 50  # requests kept in reserve before pausing until the reset
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+WAIT_SLICE = 60  # longest sleep between on_wait calls while throttled
+
+
+class RequestBudget:
+    def __init__(self, requests_per_hour: int):
+        """
+        A token bucket shared by several clients so they stay within one
+        global request budget. Safe to use from multiple threads.
+
+        Args:
+            requests_per_hour: Sustained request rate; also the burst size
+        """
+        self.capacity = max(1, requests_per_hour)
+        self.rate = self.capacity / 3600.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, on_wait: Optional[Callable[[], None]] = None) -> None:
+        """
+        Take one request from the budget, waiting until one is available.
+
+        Args:
+            on_wait: Called before each wait, e.g. to show the caller is alive
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            if on_wait:
+                on_wait()
+            time.sleep(min(wait, WAIT_SLICE))
+
+
+class GitHubClient:
+    def __init__(self, token: str, api_url: str = GITHUB_API_URL, pool_size: int = POOL_SIZE,
+                 rate_limit_floor: int = RATE_LIMIT_FLOOR, budget: Optional[RequestBudget] = None,
+                 on_wait: Optional[Callable[[], None]] = None):
+        """
+        Initialize the API client.
+
+        Args:
+            token: GitHub personal access token
+            api_url: Base URL of the GitHub REST API
+            pool_size: Number of keep-alive connections to keep per host
+            rate_limit_floor: Remaining requests at which to wait for the rate limit reset
+            budget: Request budget shared with other clients
+            on_wait: Called at least every WAIT_SLICE seconds while waiting for the rate limit or budget,
+                e.g. to touch a heartbeat so a supervisor doesn't take a throttled client for a hung one
+        """
+        self.api_url = api_url.rstrip("/")
+        self.rate_limit_floor = rate_limit_floor
+        self.budget = budget
+        self.on_wait = on_wait
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        })
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_reset: Optional[int] = None
+        self.poll_interval: Optional[int] = None
+        self._etags: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"requests": 0, "not_modified": 0, "bytes": 0}
+
+    def url(self, path: str) -> str:
+        """
+        Resolve an API path such as "/repos/owner/repo" against the base URL.
+        """
+        return path if path.startswith(("http://", "https://")) else f"{self.api_url}{path}"
+
+    def reset_stats(self) -> Dict[str, int]:
+        """
+        Return the counters collected since the last call and start new ones.
+
+        Returns:
+            Dictionary with "requests", "not_modified" and "bytes" counts
+        """
+        with self._lock:
+            stats, self.stats = self.stats, self._empty_stats()
+        return stats
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request through the pooled session.
+
+        Args:
+            path: API path or absolute URL
+            **kwargs: Passed through to requests
+
+        Returns:
+            The response
+        """
+        if self.budget:
+            self.budget.acquire(self.on_wait)
+        self._throttle()
+        response = self.session.get(self.url(path), **kwargs)
+        self._record(response, count_body=not kwargs.get("stream"))
+        return response
+
+    def graphql_url(self) -> str:
+        """
+        URL of the GraphQL API next to the REST API (/api/graphql on GitHub Enterprise Server).
+        """
+        if self.api_url.endswith("/api/v3"):
+            return self.api_url[:-len("/v3")] + "/graphql"
+        return self.api_url + "/graphql"
+
+    def graphql(self, query: str, variables: Optional[Dict] = None) -> Tuple[int, Any]:
+        """
+        Run a GraphQL query.
+
+        Args:
+            query: GraphQL query document
+            variables: Values of the query's variables
+
+        Returns:
+            Tuple of (status code, "data" of the response or None). A response
+            with errors is reported as None, since partial data can't be told
+            apart from missing data.
+        """
+        if self.budget:
+            self.budget.acquire(self.on_wait)
+        self._throttle()
+        response = self.session.post(self.graphql_url(), json={"query": query, "variables": variables or {}})
+        self._record(response, count_body=True)
+        if response.status_code != 200:
+            return response.status_code, None
+        body = response.json()
+        if body.get("errors"):
+            print(f"GraphQL query failed: {'; '.join(error.get('message', '') for error in body['errors'])}")
+            return 200, None
+        return 200, body.get("data")
+
+    def get_json(self, path: str, params: Optional[Dict] = None) -> Tuple[int, Any]:
+        """
+        GET a JSON resource, revalidating cached copies with If-None-Match.
+
+        Args:
+            path: API path or absolute URL
+            params: Query parameters
+
+        Returns:
+            Tuple of (status code, parsed JSON or None). A 304 is reported as
+            200 with the cached body.
+        """
+        key = self.url(path) + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        cached = self._etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        response = self.get(path, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self.stats["not_modified"] += 1
+                self._etags.move_to_end(key)
+            return 200, cached[1]
+        if response.status_code != 200:
+            return response.status_code, None
+
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._etags[key] = (etag, data)
+                self._etags.move_to_end(key)
+                while len(self._etags) > ETAG_CACHE_SIZE:
+                    self._etags.popitem(last=False)
+        return 200, data
+
+    def download(self, path: str, target: BinaryIO) -> bool:
+        """
+        Download a (possibly redirected) API resource into a file object.
+
+        Args:
+            path: API path or absolute URL that answers with the content or a redirect to it
+            target: Writable binary file object, rewound after the download
+
+        Returns:
+            True if the content was downloaded, False otherwise
+        """
+        response = self.get(path, allow_redirects=False, stream=True)
+        if response.status_code in REDIRECT_CODES:
+            # The redirect points at pre-signed storage that must not receive our token
+            download_url = response.headers.get("Location")
+            response.close()
+            response = self.session.get(download_url, headers={"Authorization": None}, stream=True)
+            self._record(response, count_body=False)
+
+        with response:
+            if response.status_code != 200:
+                print(f"Download of {path} failed: {response.status_code}")
+                return False
+            downloaded = 0
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                target.write(chunk)
+                downloaded += len(chunk)
+
+        with self._lock:
+            self.stats["bytes"] += downloaded
+        target.seek(0)
+        return True
+
+    def _record(self, response: requests.Response, count_body: bool) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            # Streamed bodies are counted by whoever consumes them
+            if count_body:
+                self.stats["bytes"] += len(response.content or b"")
+
+        # GraphQL has its own rate limit, which must not hold up REST requests
+        if response.headers.get("X-RateLimit-Resource", "core") != "core":
+            return
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self.rate_limit_reset = int(reset)
+        poll_interval = response.headers.get("X-Poll-Interval")
+        if poll_interval is not None and poll_interval.isdigit():
+            self.poll_interval = int(poll_interval)
+
+    def _throttle(self) -> None:
+        """
+        Wait for the rate limit window to reset once the reserve is reached.
+        """
+        if self.rate_limit_remaining is None or self.rate_limit_reset is None:
+            return
+        if self.rate_limit_remaining > self.rate_limit_floor:
+            return
+
+        wait = self.rate_limit_reset - time.time() + 1
+        if wait > 0:
+            print(f"Rate limit nearly exhausted ({self.rate_limit_remaining} left), "
+                  f"waiting {int(wait)}s for the reset")
+            while wait > 0:
+                if self.on_wait:
+                    self.on_wait()
+                time.sleep(min(wait, WAIT_SLICE))
+                wait -= WAIT_SLICE
+        self.rate_limit_remaining = None
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Error and Fix History
+
+An indexed SQLite record of every build error the monitor extracted: its
+code, classification, the fixer that handled it, the result and the commit
+the fix went out in. Rows are buffered and written in batched transactions,
+so recording never costs a commit per error, and the indexes cover the
+aggregate queries the history command answers:
+
+    python history_store.py codes --days 30                  (top recurring error codes)
+    python history_store.py fixers --repo owner/repo         (fix success rate per fixer)
+    python history_store.py errors --code CS0246 --format csv --output cs0246.csv
+
+The monitor exposes the same command as "github_actions_monitor.py history".
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_DB_PATH = os.path.join(SCRIPT_DIR, "monitor_history.db")
+BATCH_SIZE = 500  # buffered rows that trigger a write
+
+# Fix results, as in the monitor_fixes_total metric, plus errors fixed or failed in an earlier run
+RESULT_APPLIED = "applied"
+RESULT_FAILED = "failed"
+RESULT_UNSUPPORTED = "unsupported"
+RESULT_SKIPPED = "skipped"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS error_history (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    recorded_at TEXT NOT NULL,
+    code TEXT,
+    type TEXT,
+    message TEXT,
+    file TEXT,
+    line INTEGER,
+    fingerprint TEXT,
+    fixer TEXT,
+    result TEXT NOT NULL,
+    commit_sha TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_error_history_time ON error_history (recorded_at, code, run_id);
+CREATE INDEX IF NOT EXISTS ix_error_history_repo ON error_history (repo, recorded_at, code, run_id);
+CREATE INDEX IF NOT EXISTS ix_error_history_fixer ON error_history (fixer, recorded_at, result, commit_sha);
+CREATE INDEX IF NOT EXISTS ix_error_history_code ON error_history (code, recorded_at, run_id);
+"""
+
+COLUMNS = ("repo", "run_id", "recorded_at", "code", "type", "message", "file", "line", "fingerprint", "fixer",
+           "result", "commit_sha")
+
+# A fix attempt: the error, the fixer that handled it (None if none did) and the RESULT_* constant
+FixEntry = Tuple[Dict, Optional[str], str]
+
+
+def utc_timestamp(moment: Optional[datetime] = None) -> str:
+    """
+    Format a time the way the history stores it, so timestamps compare as strings.
+    """
+    return (moment or datetime.now(timezone.utc)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class HistoryStore:
+    def __init__(self, path: str = ":memory:", batch_size: int = BATCH_SIZE):
+        """
+        Open (and create if needed) the history database.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a throwaway store
+            batch_size: Buffered rows that trigger a write
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[Tuple] = []
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.flush()
+        # Keeps the statistics the query planner picks indexes by up to date
+        self.conn.execute("PRAGMA optimize")
+        self.conn.close()
+
+    def record(self, repo: str, run_id: int, entries: List[FixEntry], commit_sha: Optional[str] = None) -> None:
+        """
+        Buffer the errors of a run with their fix results, writing them once the batch is full.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+            run_id: Workflow run ID
+            entries: Fix attempts of the run's errors
+            commit_sha: Commit the applied fixes went out in
+        """
+        now = utc_timestamp()
+        rows = [
+            (repo, run_id, now, error.get("code"), error.get("type"), error.get("message"), error.get("file"),
+             error.get("line"), error.get("fingerprint"), fixer, result,
+             commit_sha if result == RESULT_APPLIED else None)
+            for error, fixer, result in entries
+        ]
+        with self._lock:
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._write()
+
+    def flush(self) -> int:
+        """
+        Write the buffered rows.
+
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            return self._write()
+
+    def _write(self) -> int:
+        rows, self._pending = self._pending, []
+        if rows:
+            with self.conn:
+                self.conn.executemany(
+                    f"INSERT INTO error_history ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    rows
+                )
+        return len(rows)
+
+    def _query(self, sql: str, where: List[str], params: List, suffix: str = "") -> List[Dict]:
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            self._write()
+            rows = self.conn.execute(sql + suffix, params).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _filters(since: Optional[str], repo: Optional[str], code: Optional[str] = None) -> Tuple[List[str], List]:
+        where, params = [], []
+        for column, operator, value in (("repo", "=", repo), ("recorded_at", ">=", since), ("code", "=", code)):
+            if value is not None:
+                where.append(f"{column} {operator} ?")
+                params.append(value)
+        return where, params
+
+    def top_codes(self, since: Optional[str] = None, repo: Optional[str] = None, limit: int = 10,
+                  code: Optional[str] = None) -> List[Dict]:
+        """
+        Rank error codes by how often they were extracted.
+
+        Args:
+            since: Only count errors recorded at or after this utc_timestamp
+            repo: Only count errors of this repository
+            limit: Number of codes returned
+            code: Only count errors with this code
+
+        Returns:
+            Rows with "code", "errors", "runs", "first_seen" and "last_seen", most frequent first
+        """
+        where, params = self._filters(since, repo, code)
+        return self._query(
+            "SELECT code, COUNT(*) AS errors, COUNT(DISTINCT run_id) AS runs, MIN(recorded_at) AS first_seen, "
+            "MAX(recorded_at) AS last_seen FROM error_history", where, params + [limit],
+            " GROUP BY code ORDER BY errors DESC, code LIMIT ?"
+        )
+
+    def fixer_results(self, since: Optional[str] = None, repo: Optional[str] = None,
+                      code: Optional[str] = None) -> List[Dict]:
+        """
+        Summarize the fix attempts of every fixer.
+
+        Args:
+            since: Only count attempts recorded at or after this utc_timestamp
+            repo: Only count attempts in this repository
+            code: Only count attempts on errors with this code
+
+        Returns:
+            Rows with "fixer", "attempts", "applied", "failed", "committed" and
+            "success_rate" (applied / attempts), by fixer name
+        """
+        where, params = self._filters(since, repo, code)
+        where.append("fixer IS NOT NULL AND result IN (?, ?)")
+        params += [RESULT_APPLIED, RESULT_FAILED]
+        rows = self._query(
+            "SELECT fixer, COUNT(*) AS attempts, SUM(result = ?) AS applied, SUM(result = ?) AS failed, "
+            "COUNT(commit_sha) AS committed FROM error_history", where, [RESULT_APPLIED, RESULT_FAILED] + params,
+            " GROUP BY fixer ORDER BY fixer"
+        )
+        for row in rows:
+            row["success_rate"] = round(row["applied"] / row["attempts"], 3)
+        return rows
+
+    def errors(self, since: Optional[str] = None, repo: Optional[str] = None, code: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict]:
+        """
+        List recorded errors, newest first.
+
+        Args:
+            since: Only errors recorded at or after this utc_timestamp
+            repo: Only errors of this repository
+            code: Only errors with this code
+            limit: Maximum number of rows (all if None)
+
+        Returns:
+            Rows with the columns in COLUMNS
+        """
+        where, params = self._filters(since, repo, code)
+        suffix = " ORDER BY recorded_at DESC, id DESC"
+        if limit is not None:
+            suffix += " LIMIT ?"
+            params.append(limit)
+        return self._query(f"SELECT {', '.join(COLUMNS)} FROM error_history", where, params, suffix)
+
+
+def write_rows(rows: List[Dict], output_format: str, out) -> None:
+    """
+    Write query results as an aligned table, CSV or JSON.
+    """
+    if output_format == "json":
+        json.dump(rows, out, indent=2)
+        out.write("\n")
+        return
+    if not rows:
+        if output_format == "table":
+            out.write("No history recorded\n")
+        return
+    columns = list(rows[0])
+    if output_format == "csv":
+        writer = csv.DictWriter(out, columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    cells = [[str(row[column]) if row[column] is not None else "" for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in cells)) for i, column in enumerate(columns)]
+    for line in [columns] + cells:
+        out.write("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query the monitor's history of build errors and fixes")
+    parser.add_argument("--db", default=HISTORY_DB_PATH, help="History database")
+    parser.add_argument("query", choices=("codes", "fixers", "errors"),
+                        help="codes: top recurring error codes; fixers: fix success rate per fixer; "
+                             "errors: the recorded errors")
+    period = parser.add_mutually_exclusive_group()
+    period.add_argument("--days", type=float, help="Only the last N days")
+    period.add_argument("--since", help="Only since this UTC date or time, e.g. 2025-06-01")
+    parser.add_argument("--repo", help="Only this repository")
+    parser.add_argument("--code", help="Only this error code")
+    parser.add_argument("--limit", type=int, help="Maximum number of rows")
+    parser.add_argument("--format", choices=("table", "csv", "json"), default="table", help="Output format")
+    parser.add_argument("--output", help="Write to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.exit(1, f"No history database at {args.db}\n")
+    since = args.since
+    if args.days is not None:
+        since = utc_timestamp(datetime.now(timezone.utc) - timedelta(days=args.days))
+
+    store = HistoryStore(args.db)
+    try:
+        if args.query == "codes":
+            rows = store.top_codes(since, args.repo, args.limit or 10, args.code)
+        elif args.query == "fixers":
+            rows = store.fixer_results(since, args.repo, args.code)
+        else:
+            rows = store.errors(since, args.repo, args.code, args.limit)
+    finally:
+        store.close()
+
+    if args.output:
+        with open(args.output, "w", newline="") as out:
+            write_rows(rows, args.format, out)
+    else:
+        write_rows(rows, args.format, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Compressed Workflow Log Cache
+
+Keeps downloaded workflow logs on disk so replaying a run, debugging a fix
+or restarting the monitor doesn't download them again. Log text is stored
+gzip-compressed in content-addressed blobs (identical logs share a blob),
+and the build errors parsed from a log are stored next to it, keyed by the
+version of the patterns that produced them.
+
+A SQLite index maps keys (e.g. "run/owner/repo/123") to blobs and tracks
+when each entry was last used. Entries unused for longer than the maximum
+age are dropped, and the least recently used ones are evicted whenever the
+blobs outgrow the size limit.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = 14 * 24 * 3600  # seconds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_logs_accessed ON logs (accessed_at);
+CREATE INDEX IF NOT EXISTS ix_logs_digest ON logs (digest);
+CREATE TABLE IF NOT EXISTS errors (
+    key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    errors TEXT NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (key, version)
+);
+"""
+
+
+class LogCache:
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, max_age: float = DEFAULT_MAX_AGE):
+        """
+        Open (and create if needed) a log cache directory.
+
+        Args:
+            directory: Directory holding the blobs and the index database
+            max_bytes: Total compressed size the blobs are evicted down to
+            max_age: Seconds an entry may go unused before it is dropped
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = {"hits": 0, "misses": 0, "error_hits": 0, "error_misses": 0, "evictions": 0}
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], digest + ".gz")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def iter_lines(self, key: str) -> Optional[Iterator[str]]:
+        """
+        Stream a cached log.
+
+        Args:
+            key: Cache key of the log
+
+        Returns:
+            Iterator over the log's lines, or None on a cache miss
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT digest FROM logs WHERE key = ?", (key,)).fetchone()
+            if row:
+                with self.conn:
+                    self.conn.execute("UPDATE logs SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        path = self._blob_path(row[0]) if row else None
+        if not path or not os.path.exists(path):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return self._read_blob(path)
+
+    @staticmethod
+    def _read_blob(path: str) -> Iterator[str]:
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            yield from f
+
+    def store_lines(self, key: str, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Pass log lines through while writing them to the cache.
+
+        The entry is only added once the lines are exhausted, so a download
+        that fails part-way leaves nothing behind. Empty logs aren't cached,
+        since a failed download looks the same.
+
+        Args:
+            key: Cache key of the log
+            lines: Log lines as they are downloaded
+
+        Yields:
+            The same lines
+        """
+        digest = hashlib.sha256()
+        empty = True
+        fd, temp_path = tempfile.mkstemp(dir=os.path.join(self.directory, "blobs"), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8", newline="") as f:
+                for line in lines:
+                    digest.update(line.encode("utf-8", errors="replace"))
+                    f.write(line)
+                    empty = False
+                    yield line
+            if not empty:
+                self._add_blob(key, digest.hexdigest(), temp_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def _add_blob(self, key: str, digest: str, temp_path: str) -> None:
+        path = self._blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(temp_path)
+        else:
+            os.replace(temp_path, path)
+        now = time.time()
+        with self._lock, self.conn:
+            # A log downloaded again may differ, so errors parsed from the old text go
+            self.conn.execute("DELETE FROM errors WHERE key = ? AND key NOT IN "
+                              "(SELECT key FROM logs WHERE key = ? AND digest = ?)", (key, key, digest))
+            self.conn.execute("INSERT OR REPLACE INTO logs (key, digest, size, created_at, accessed_at) "
+                              "VALUES (?, ?, ?, ?, ?)", (key, digest, os.path.getsize(path), now, now))
+        self.evict()
+
+    def get_errors(self, key: str, version: str) -> Optional[List[Dict]]:
+        """
+        Get the build errors parsed from a log.
+
+        Args:
+            key: Cache key of the log
+            version: Version of the patterns the errors must have been parsed with
+
+        Returns:
+            List of error objects, or None on a cache miss
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT errors FROM errors WHERE key = ? AND version = ?",
+                                    (key, version)).fetchone()
+            if row:
+                with self.conn:
+                    self.conn.execute("UPDATE errors SET accessed_at = ? WHERE key = ? AND version = ?",
+                                      (time.time(), key, version))
+        self._count("error_hits" if row else "error_misses")
+        return json.loads(row[0]) if row else None
+
+    def put_errors(self, key: str, version: str, errors: List[Dict]) -> None:
+        """
+        Store the build errors parsed from a log.
+        """
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO errors (key, version, errors, accessed_at) VALUES (?, ?, ?, ?)",
+                              (key, version, json.dumps(errors), time.time()))
+        # Error lists of logs that aren't cached have no blob to trigger eviction
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop entries unused for longer than max_age, then the least recently
+        used ones until the blobs fit in max_bytes.
+
+        Returns:
+            Number of log entries removed
+        """
+        with self._lock:
+            cutoff = time.time() - self.max_age
+            rows = self.conn.execute("SELECT key, digest, size, accessed_at FROM logs "
+                                     "ORDER BY accessed_at").fetchall()
+            # Blobs shared by several keys only count once, and only free space with their last key
+            sizes = {digest: size for _, digest, size, _ in rows}
+            references = Counter(digest for _, digest, _, _ in rows)
+            total = sum(sizes.values())
+            evicted = []
+            for key, digest, size, accessed_at in rows:
+                if accessed_at >= cutoff and total <= self.max_bytes:
+                    break
+                evicted.append((key, digest))
+                references[digest] -= 1
+                if not references[digest]:
+                    total -= size
+
+            if evicted:
+                with self.conn:
+                    self.conn.executemany("DELETE FROM logs WHERE key = ?", [(key,) for key, _ in evicted])
+                    self.conn.executemany("DELETE FROM errors WHERE key = ?", [(key,) for key, _ in evicted])
+                for digest in {digest for _, digest in evicted if not references[digest]}:
+                    try:
+                        os.unlink(self._blob_path(digest))
+                    except FileNotFoundError:
+                        pass
+            # Error lists of logs that were never cached (e.g. scanned from an archive) age out too
+            with self.conn:
+                self.conn.execute("DELETE FROM errors WHERE accessed_at < ? AND key NOT IN (SELECT key FROM logs)",
+                                  (cutoff,))
+            self.stats["evictions"] += len(evicted)
+        return len(evicted)
+
+    def reset_stats(self) -> Dict[str, int]:
+        """
+        Return the hit/miss counters and start counting from zero.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            for name in self.stats:
+                self.stats[name] = 0
+        return stats
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Monitor Metrics
+
+Per-stage timing histograms and counters for the monitor: how long each
+cycle spends polling the API, downloading logs, extracting and
+classifying errors, fixing files and committing, plus byte counters,
+error-type counts and fix results.
+
+Stages nest: a stage's histogram records its own time, excluding the
+stages timed inside it, so a streamed log's download isn't also counted
+as extraction time.
+
+Metrics can be printed as structured JSON log lines and served in the
+Prometheus text format from a local /metrics endpoint.
+"""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Bucket upper bounds with cumulative counts, ending with "+Inf".
+        """
+        total = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            result.append((str(bound), total))
+        return result
+
+
+class Metrics:
+    def __init__(self, json_logs: bool = False):
+        """
+        Initialize an empty metrics registry. Safe to use from multiple threads.
+
+        Args:
+            json_logs: Print events as JSON lines instead of leaving output to the caller
+        """
+        self.json_logs = json_logs
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels) -> None:
+        """
+        Add to a counter.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self.help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels) -> None:
+        """
+        Record a value in a histogram.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+            if help:
+                self.help.setdefault(name, help)
+
+    @contextmanager
+    def stage(self, stage: str, **labels) -> Iterator[None]:
+        """
+        Time a pipeline stage, excluding the stages timed inside it.
+
+        Args:
+            stage: Stage name: poll, download, extract, classify, fix, commit or push
+            **labels: Extra labels, e.g. repo
+        """
+        stack = self._local.__dict__.setdefault("stack", [])
+        # Each frame collects the time spent in stages nested inside it
+        frame = [0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            self.observe("monitor_stage_seconds", elapsed - frame[0],
+                         help="Time spent in each pipeline stage, excluding nested stages",
+                         stage=stage, **labels)
+
+    def record_stage(self, stage: str, seconds: float, **labels) -> None:
+        """
+        Record time measured separately for a stage nested in the current one,
+        e.g. many short calls summed up to avoid timing each of them.
+        """
+        stack = self._local.__dict__.get("stack")
+        if stack:
+            stack[-1][0] += seconds
+        self.observe("monitor_stage_seconds", seconds, stage=stage, **labels)
+
+    def stage_totals(self, **labels) -> Dict[str, float]:
+        """
+        Total seconds recorded per stage, optionally filtered by labels.
+        """
+        wanted = set(_labels(labels))
+        totals = {}
+        with self._lock:
+            for key, histogram in self.histograms.get("monitor_stage_seconds", {}).items():
+                if wanted <= set(key):
+                    stage = dict(key)["stage"]
+                    totals[stage] = totals.get(stage, 0.0) + histogram.sum
+        return totals
+
+    def emit(self, event: str, **fields) -> bool:
+        """
+        Print a structured JSON log line if JSON logging is enabled.
+
+        Returns:
+            True if the line was printed
+        """
+        if not self.json_logs:
+            return False
+        record = {"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), "event": event}
+        record.update(fields)
+        print(json.dumps(record, default=str), flush=True)
+        return True
+
+    def render_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:.15g}")
+            for name, series in sorted(self.histograms.items()):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', bound))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9464):
+        """
+        Serve metrics at /metrics in the Prometheus text format.
+
+        Args:
+            metrics: Registry to expose
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        """
+        self.metrics = metrics
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def _handler_class(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"Serving metrics on {self.url}")
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
@@ -5,66 +5,354 @@ GitHub Actions Monitor Launcher Script
 This script sets up and runs the GitHub Actions monitor as a background process.
 It handles authentication, configuration, and ensures the monitor stays running.
 
+The monitor runs under a supervisor that records its own PID in a pidfile,
+restarts the monitor with an exponential backoff when it exits or stops
+touching its heartbeat file, stops it gracefully on SIGTERM/SIGINT, and
+writes its output to a size-rotated log. Error patterns and fixer settings
+are reloaded by the running monitor, so changing them needs no restart.
+SIGUSR1 is passed on to the monitor, where it toggles cycle profiling.
+
 Usage:
-    python monitor_launcher.py --token <github_token> --repo <owner/repo>
+    python monitor_launcher.py --token <github_token> --repo <owner/repo> [--repo <owner/repo> ...]
+    python monitor_launcher.py --token <github_token> --config <repos.json>
+    python monitor_launcher.py --token <github_token> --repo <owner/repo> --foreground
+    python monitor_launcher.py --toggle-profiling
+    python monitor_launcher.py --stop
 """
 
 import argparse
+import logging
 import os
+import signal
 import subprocess
 import sys
+import threading
 import time
-from pathlib import Path
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
 
 # Get the absolute path to the script directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 REPO_PATH = os.path.dirname(SCRIPT_DIR)
 MONITOR_SCRIPT = os.path.join(SCRIPT_DIR, "github_actions_monitor.py")
 LOG_FILE = os.path.join(SCRIPT_DIR, "monitor.log")
+PID_FILE = os.path.join(SCRIPT_DIR, "monitor.pid")
+HEARTBEAT_FILE = os.path.join(SCRIPT_DIR, "monitor.heartbeat")
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+HEALTH_TIMEOUT = 1800  # seconds without a heartbeat before the monitor is restarted; idle polls back off to 10 minutes,
+# and rate limit waits touch the heartbeat every minute
+MIN_BACKOFF = 1  # seconds before the first restart
+MAX_BACKOFF = 300
+STABLE_AFTER = 600  # seconds a monitor must run before its restart backoff resets
+STOP_TIMEOUT = 30  # seconds a monitor gets to exit after SIGTERM before it is killed
+CHECK_INTERVAL = 1  # seconds between health checks
+
 
-def setup_monitor(token, repo, interval=60):
+def read_pid(pidfile: str) -> Optional[int]:
     """
-    Set up and launch the GitHub Actions monitor.
-    
+    PID recorded in a pidfile if that process is still running.
+    """
+    try:
+        with open(pidfile, "r") as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
+class MonitorSupervisor:
+    def __init__(self, command: List[str], pidfile: str = PID_FILE, log_file: str = LOG_FILE,
+                 heartbeat_file: str = HEARTBEAT_FILE, health_timeout: float = HEALTH_TIMEOUT,
+                 min_backoff: float = MIN_BACKOFF, max_backoff: float = MAX_BACKOFF,
+                 stable_after: float = STABLE_AFTER, stop_timeout: float = STOP_TIMEOUT,
+                 log_max_bytes: int = LOG_MAX_BYTES, log_backups: int = LOG_BACKUPS,
+                 check_interval: float = CHECK_INTERVAL):
+        """
+        Initialize the supervisor.
+
+        Args:
+            command: Monitor command line; --heartbeat-file is appended
+            pidfile: File holding the supervisor's PID while it runs
+            log_file: Log of the supervisor and the monitor's output, rotated by size
+            heartbeat_file: File the monitor touches every polling cycle
+            health_timeout: Seconds without a heartbeat before the monitor is restarted
+            min_backoff: Seconds before the first restart
+            max_backoff: Ceiling of the doubling restart delay
+            stable_after: Seconds of running after which the backoff starts over
+            stop_timeout: Seconds the monitor gets to exit after SIGTERM before it is killed
+            log_max_bytes: Size at which the log is rotated
+            log_backups: Number of rotated logs kept
+            check_interval: Seconds between health checks
+        """
+        self.command = command + ["--heartbeat-file", heartbeat_file]
+        self.pidfile = pidfile
+        self.heartbeat_file = heartbeat_file
+        self.health_timeout = health_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.stop_timeout = stop_timeout
+        self.check_interval = check_interval
+        self.restarts = 0
+        self.process: Optional[subprocess.Popen] = None
+        self._output_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        self.logger = logging.getLogger(f"monitor_supervisor.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self._handler = RotatingFileHandler(log_file, maxBytes=log_max_bytes, backupCount=log_backups)
+        self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.logger.addHandler(self._handler)
+
+    def _acquire_pidfile(self) -> None:
+        pid = read_pid(self.pidfile)
+        if pid is not None:
+            raise RuntimeError(f"Monitor supervisor already running with PID {pid}")
+        with open(self.pidfile, "w") as f:
+            f.write(f"{os.getpid()}\n")
+
+    def _release_pidfile(self) -> None:
+        if read_pid(self.pidfile) == os.getpid():
+            os.unlink(self.pidfile)
+
+    def _start_monitor(self) -> None:
+        # The monitor is healthy until it had the chance to poll once
+        with open(self.heartbeat_file, "a"):
+            os.utime(self.heartbeat_file)
+        self.process = subprocess.Popen(self.command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        cwd=REPO_PATH, text=True, errors="replace")
+        self.logger.info(f"Monitor started with PID {self.process.pid}")
+        self._output_thread = threading.Thread(target=self._pump_output, args=(self.process,), daemon=True)
+        self._output_thread.start()
+
+    def _pump_output(self, process: subprocess.Popen) -> None:
+        for line in process.stdout:
+            self.logger.info(line.rstrip("\n"))
+
+    def _healthy(self) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self.heartbeat_file) < self.health_timeout
+        except OSError:
+            return False
+
+    def _stop_monitor(self) -> None:
+        process = self.process
+        if process is None:
+            return
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(self.stop_timeout)
+            except subprocess.TimeoutExpired:
+                self.logger.info(f"Monitor did not exit within {self.stop_timeout}s, killing it")
+                process.kill()
+                process.wait()
+        # The rest of its output is logged before the log is closed
+        self._output_thread.join(5)
+        process.stdout.close()
+        self.process = None
+
+    def forward(self, signum: int, frame=None) -> None:
+        """
+        Pass a signal on to the monitor, if it is running. Safe to call from a signal handler.
+        """
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.send_signal(signum)
+
+    def stop(self, signum: Optional[int] = None, frame=None) -> None:
+        """
+        Ask the supervisor to stop the monitor and exit. Safe to call from a signal handler.
+        """
+        self._stopping.set()
+
+    def run(self) -> None:
+        """
+        Keep the monitor running until stop is called.
+
+        Raises:
+            RuntimeError: If another supervisor is already running
+        """
+        try:
+            self._acquire_pidfile()
+        except RuntimeError:
+            self._close_log()
+            raise
+        self.logger.info(f"Supervisor started with PID {os.getpid()}")
+        backoff = self.min_backoff
+        try:
+            while not self._stopping.is_set():
+                self._start_monitor()
+                started = time.monotonic()
+                while not self._stopping.wait(self.check_interval):
+                    if self.process.poll() is not None:
+                        self.logger.info(f"Monitor exited with code {self.process.returncode}")
+                        break
+                    if not self._healthy():
+                        self.logger.info(f"No heartbeat for {self.health_timeout:.0f}s, restarting the monitor")
+                        break
+                if self._stopping.is_set():
+                    break
+                self._stop_monitor()
+
+                if time.monotonic() - started >= self.stable_after:
+                    backoff = self.min_backoff
+                self.restarts += 1
+                self.logger.info(f"Restarting the monitor in {backoff:.0f}s (restart {self.restarts})")
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+        finally:
+            self._stop_monitor()
+            self.logger.info("Supervisor stopped")
+            self._release_pidfile()
+            self._close_log()
+
+    def _close_log(self) -> None:
+        self._handler.close()
+        self.logger.removeHandler(self._handler)
+
+
+def monitor_command(token, repo=None, interval=60, failed_jobs_only=False, config=None,
+                    script=MONITOR_SCRIPT, extra_args=None) -> List[str]:
+    """
+    Build the command line of the monitor (or of another script taking its arguments).
+
+    extra_args are passed on as they are, e.g. the monitor options the launcher has no flag of its own for.
+    """
+    repos = [repo] if isinstance(repo, str) else list(repo or [])
+    command = [
+        sys.executable,
+        script,
+        "--token", token,
+        "--interval", str(interval)
+    ]
+    for name in repos:
+        command += ["--repo", name]
+    if config:
+        command += ["--config", config]
+    if failed_jobs_only:
+        command.append("--failed-jobs-only")
+    return command + list(extra_args or [])
+
+def setup_monitor(token, repo=None, interval=60, failed_jobs_only=False, config=None, extra_args=None,
+                  health_timeout=HEALTH_TIMEOUT):
+    """
+    Set up and launch the supervised GitHub Actions monitor in the background.
+
     Args:
         token: GitHub personal access token
-        repo: Repository in format 'owner/repo'
+        repo: Repository in format 'owner/repo', or a list of them
         interval: Polling interval in seconds
+        failed_jobs_only: Only download the logs of failed jobs' failed steps
+        config: JSON file listing the repositories to monitor
+        extra_args: Further monitor options, e.g. ["--webhook", "--profile-every", "10"]
+        health_timeout: Seconds without a heartbeat before the supervisor restarts the monitor
     """
-    print(f"Setting up GitHub Actions monitor for {repo}")
+    repos = [repo] if isinstance(repo, str) else list(repo or [])
+    print(f"Setting up GitHub Actions monitor for {', '.join(repos + ([config] if config else []))}")
     print(f"Logs will be written to {LOG_FILE}")
-    
-    # Ensure the monitor script is executable
-    os.chmod(MONITOR_SCRIPT, 0o755)
-    
-    # Launch the monitor script as a background process
-    with open(LOG_FILE, "a") as log:
-        process = subprocess.Popen(
-            [
-                "python3", 
-                MONITOR_SCRIPT, 
-                "--token", token, 
-                "--repo", repo, 
-                "--interval", str(interval)
-            ],
-            stdout=log,
-            stderr=log,
-            cwd=REPO_PATH
-        )
-    
-    print(f"Monitor started with PID {process.pid}")
+
+    pid = read_pid(PID_FILE)
+    if pid is not None:
+        print(f"Monitor supervisor already running with PID {pid}")
+        return
+
+    command = monitor_command(token, repos, interval, failed_jobs_only, config, os.path.abspath(__file__), extra_args)
+    command += ["--foreground", "--health-timeout", str(health_timeout)]
+
+    # Launch the supervisor in its own session, so it outlives this shell
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, cwd=REPO_PATH, start_new_session=True)
+
+    print(f"Monitor supervisor started with PID {process.pid}")
     print("The monitor will now run in the background and automatically fix build errors.")
     print("You can check the logs at any time by running: cat " + LOG_FILE)
+    print("Stop it with: python " + os.path.abspath(__file__) + " --stop")
+
+def stop_monitor(pidfile=PID_FILE, timeout=STOP_TIMEOUT + 10) -> bool:
+    """
+    Stop a running supervisor and its monitor.
+
+    Returns:
+        True if a supervisor was running and has stopped
+    """
+    pid = read_pid(pidfile)
+    if pid is None:
+        print("Monitor supervisor is not running")
+        return False
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while read_pid(pidfile) == pid and time.monotonic() < deadline:
+        time.sleep(0.2)
+    stopped = read_pid(pidfile) != pid
+    print(f"Monitor supervisor {'stopped' if stopped else 'is still stopping'} (PID {pid})")
+    return stopped
+
+def toggle_profiling(pidfile=PID_FILE) -> bool:
+    """
+    Turn cycle profiling of the running monitor on or off.
+
+    Returns:
+        True if a supervisor was running to pass the request on
+    """
+    pid = read_pid(pidfile)
+    if pid is None:
+        print("Monitor supervisor is not running")
+        return False
+    os.kill(pid, signal.SIGUSR1)
+    print(f"Toggled profiling of the monitor supervised by PID {pid}; see its log for where dumps go")
+    return True
 
 def main():
-    parser = argparse.ArgumentParser(description="Launch GitHub Actions monitor")
-    parser.add_argument("--token", required=True, help="GitHub personal access token")
-    parser.add_argument("--repo", required=True, help="Repository in format 'owner/repo'")
+    parser = argparse.ArgumentParser(description="Launch GitHub Actions monitor",
+                                     epilog="Any other options, such as --webhook, --error-source or --profile, "
+                                            "are passed on to the monitor",
+                                     allow_abbrev=False)
+    parser.add_argument("--token", help="GitHub personal access token")
+    parser.add_argument("--repo", action="append",
+                        help="Repository in format 'owner/repo' (repeat to monitor several repositories)")
+    parser.add_argument("--config", help="JSON file listing the repositories to monitor")
     parser.add_argument("--interval", type=int, default=60, help="Polling interval in seconds")
-    
-    args = parser.parse_args()
-    
-    setup_monitor(args.token, args.repo, args.interval)
+    parser.add_argument("--failed-jobs-only", action="store_true",
+                        help="Download only the failed steps of failed jobs instead of the whole run archive")
+    parser.add_argument("--foreground", action="store_true",
+                        help="Run the supervisor in this process, e.g. under systemd")
+    parser.add_argument("--health-timeout", type=float, default=HEALTH_TIMEOUT,
+                        help="Seconds without a heartbeat before the monitor is restarted")
+    parser.add_argument("--stop", action="store_true", help="Stop the running supervisor and monitor")
+    parser.add_argument("--toggle-profiling", action="store_true",
+                        help="Turn cycle profiling of the running monitor on or off")
+
+    args, monitor_args = parser.parse_known_args()
+    if args.stop:
+        sys.exit(0 if stop_monitor() else 1)
+    if args.toggle_profiling:
+        sys.exit(0 if toggle_profiling() else 1)
+    if not args.token:
+        parser.error("--token is required")
+    if not args.repo and not args.config:
+        parser.error("either --repo or --config is required")
+
+    if not args.foreground:
+        setup_monitor(args.token, args.repo, args.interval, args.failed_jobs_only, args.config, monitor_args,
+                      args.health_timeout)
+        return
+
+    supervisor = MonitorSupervisor(monitor_command(args.token, args.repo, args.interval, args.failed_jobs_only,
+                                                   args.config, extra_args=monitor_args),
+                                   health_timeout=args.health_timeout)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    signal.signal(signal.SIGINT, supervisor.stop)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, supervisor.forward)
+    try:
+        supervisor.run()
+    except RuntimeError as e:
+        parser.exit(1, f"{e}\n")
 
 if __name__ == "__main__":
     main()
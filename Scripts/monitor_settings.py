@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Monitor Settings
+
+The error patterns and fixer settings live in monitor_settings.json, so
+they can be changed without restarting the monitor: SettingsWatcher
+notices when the file changes and the monitor swaps in the new settings
+at the start of its next polling cycle.
+
+    {
+      "error_patterns": [
+        {"pattern": "<regex>", "type": "<error type>", "description": "<text>"},
+        ...                                     (priority order: first match wins)
+      ],
+      "fixers": {
+        "<fixer>": {"enabled": true, "error_types": ["<error type>", ...],
+                    "error_codes": ["<compiler code>", ...]},
+        ...
+      }
+    }
+
+A fixer handles the errors classified as one of its error_types and, if
+the patterns classify them differently, the errors with one of its
+error_codes. Fixer names refer to fix_planner.FIXERS.
+"""
+
+import json
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SETTINGS_PATH = os.path.join(SCRIPT_DIR, "monitor_settings.json")
+
+
+def parse_settings(data: Dict, source: str = "settings") -> Dict:
+    """
+    Validate settings and normalize them for the monitor.
+
+    Args:
+        data: Settings as read from JSON
+        source: Name used in error messages
+
+    Returns:
+        Dictionary with "error_patterns" (regex source to {"type", "description"},
+        in priority order) and "fixers" (fixer name to {"enabled", "error_types", "error_codes"})
+
+    Raises:
+        ValueError: If the settings are malformed or a pattern does not compile
+    """
+    patterns = {}
+    for entry in data.get("error_patterns", []):
+        if not all(isinstance(entry.get(key), str) for key in ("pattern", "type", "description")):
+            raise ValueError(f"Invalid error pattern in {source}: {entry}")
+        try:
+            re.compile(entry["pattern"])
+        except re.error as e:
+            raise ValueError(f"Invalid error pattern {entry['pattern']!r} in {source}: {e}") from e
+        patterns[entry["pattern"]] = {"type": entry["type"], "description": entry["description"]}
+
+    fixers = {}
+    for name, fixer in data.get("fixers", {}).items():
+        for key in ("error_types", "error_codes"):
+            if not isinstance(fixer.get(key, []), list):
+                raise ValueError(f"Invalid {key} of fixer {name} in {source}")
+        fixers[name] = {"enabled": bool(fixer.get("enabled", True)), "error_types": list(fixer.get("error_types", [])),
+                        "error_codes": list(fixer.get("error_codes", []))}
+    return {"error_patterns": patterns, "fixers": fixers}
+
+
+def load_settings(path: str = SETTINGS_PATH) -> Dict:
+    """
+    Load and validate a settings file; see parse_settings.
+    """
+    with open(path, "r") as f:
+        return parse_settings(json.load(f), path)
+
+
+def fixers_by_error_type(fixers: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    Map every error type and error code to the enabled fixer that handles it.
+    """
+    return {key: name for name, fixer in fixers.items() if fixer["enabled"]
+            for key in fixer["error_types"] + fixer["error_codes"]}
+
+
+class SettingsWatcher:
+    def __init__(self, path: str = SETTINGS_PATH):
+        """
+        Watch a settings file for changes.
+
+        Args:
+            path: Settings file
+        """
+        self.path = path
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> Dict:
+        """
+        Load the settings, remembering the file version they came from.
+
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the settings are invalid
+        """
+        signature = self._stat()
+        settings = load_settings(self.path)
+        self._signature = signature
+        return settings
+
+    def poll(self) -> Optional[Dict]:
+        """
+        Load the settings again if the file changed since they were last loaded.
+
+        Returns:
+            The new settings, or None if the file is unchanged or the new
+            version is invalid (reported once; the old settings stay in effect)
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        try:
+            return self.load()
+        except (OSError, ValueError) as e:
+            self._signature = signature
+            print(f"Ignoring invalid settings in {self.path}: {e}")
+            return None
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Multi-Repository GitHub Actions Monitor
+
+Watches many repositories from a single process. One asyncio event loop
+drives a GitHubActionsMonitor per repository; the blocking API calls, log
+parsing and fixes run in worker threads. All repositories draw from one
+shared API request budget, and each repository is limited to a fixed
+number of concurrent API/processing tasks.
+
+Every repository is fixed and committed in its own checkout, so with
+several repositories each entry names a distinct "path" (a single
+repository may leave it out and use the default checkout).
+
+Config file format (JSON):
+    {
+        "repos": [{"repo": "owner/repo", "path": "/src/repo"},
+                  {"repo": "owner/other", "path": "/src/other", "interval": 120}],
+        "budget_per_hour": 4500,
+        "per_repo_concurrency": 2,
+        "interval": 50
+    }
+"""
+
+import asyncio
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+from github_actions_monitor import GitHubActionsMonitor, MAX_RETRIES, POLL_INTERVAL, REPO_PATH
+from github_api import RequestBudget
+from poll_scheduler import PollScheduler
+from run_state import RunStateStore
+
+DEFAULT_BUDGET_PER_HOUR = 4500  # stays under the 5000/hour limit of a personal access token
+DEFAULT_PER_REPO_CONCURRENCY = 2
+
+
+def load_config(path: str) -> Dict:
+    """
+    Load a multi-repository config file.
+
+    Args:
+        path: Path to the JSON config file
+
+    Returns:
+        Config dictionary with "repos" normalized to a list of dictionaries
+    """
+    with open(path, "r") as f:
+        config = json.load(f)
+
+    config["repos"] = [
+        {"repo": entry} if isinstance(entry, str) else dict(entry)
+        for entry in config.get("repos", [])
+    ]
+    for entry in config["repos"]:
+        if "/" not in entry.get("repo", ""):
+            raise ValueError(f"Invalid repository entry in {path}: {entry}")
+    check_repo_paths(config["repos"])
+    return config
+
+
+def check_repo_paths(repos: List[Dict]) -> None:
+    """
+    Make sure no two repositories are fixed and committed in the same checkout.
+
+    Raises:
+        ValueError: If several repositories leave out "path" or share one
+    """
+    if len(repos) < 2:
+        return
+    seen = {}
+    for entry in repos:
+        if not entry.get("path"):
+            raise ValueError(f"{entry['repo']} needs a \"path\" to its own checkout when several "
+                             f"repositories are monitored")
+        path = os.path.realpath(entry["path"])
+        if path in seen:
+            raise ValueError(f"{seen[path]} and {entry['repo']} share the checkout {entry['path']}")
+        seen[path] = entry["repo"]
+
+
+class RepoWatch:
+    def __init__(self, monitor: GitHubActionsMonitor, interval: int, concurrency: int):
+        self.monitor = monitor
+        self.scheduler = PollScheduler(interval, max_retries=MAX_RETRIES)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+
+class MultiRepoMonitor:
+    def __init__(self, token: str, repos: List[Dict], budget_per_hour: int = DEFAULT_BUDGET_PER_HOUR,
+                 per_repo_concurrency: int = DEFAULT_PER_REPO_CONCURRENCY, interval: Optional[int] = None,
+                 state_path: str = ":memory:", **monitor_options):
+        """
+        Initialize the multi-repository monitor.
+
+        Args:
+            token: GitHub personal access token
+            repos: Repository entries with "repo" and optional "path", "interval" and "token";
+                with several repositories, "path" is required and distinct
+
+        Raises:
+            ValueError: If repositories would share a checkout
+            budget_per_hour: API requests per hour shared by all repositories
+            per_repo_concurrency: Maximum concurrent API/processing tasks per repository
+            interval: Default polling interval in seconds
+            state_path: SQLite file remembering processed runs across restarts
+            **monitor_options: Passed through to every GitHubActionsMonitor
+        """
+        check_repo_paths(repos)
+        self.token = token
+        self.budget = RequestBudget(budget_per_hour)
+        self.state = RunStateStore(state_path)
+        self.per_repo_concurrency = per_repo_concurrency
+        self.interval = interval or POLL_INTERVAL
+        self.repos = repos
+        self.monitor_options = monitor_options
+        self.watches: List[RepoWatch] = []
+
+    def _create_watches(self) -> None:
+        # Semaphores belong to the running loop, so watches are created inside it
+        self.watches = [
+            RepoWatch(
+                GitHubActionsMonitor(entry.get("token", self.token), entry["repo"], repo_path=entry.get("path", REPO_PATH),
+                                     state=self.state, budget=self.budget, **self.monitor_options),
+                entry.get("interval", self.interval),
+                self.per_repo_concurrency
+            )
+            for entry in self.repos
+        ]
+
+    async def run(self, cycles: Optional[int] = None) -> None:
+        """
+        Monitor all repositories concurrently.
+
+        Args:
+            cycles: Stop after this many polling cycles per repository (forever if None)
+        """
+        self._create_watches()
+        print(f"Starting GitHub Actions monitor for {len(self.watches)} repositories...")
+        try:
+            await asyncio.gather(*(self._watch(watch, cycles) for watch in self.watches))
+        finally:
+            # Commits still waiting for their push window go out before stopping
+            for watch in self.watches:
+                watch.monitor.flush_push()
+            history = self.monitor_options.get("history")
+            if history is not None:
+                history.flush()
+
+    async def _watch(self, watch: RepoWatch, cycles: Optional[int]) -> None:
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            delay = await self.poll_repo(watch)
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                await asyncio.sleep(delay)
+
+    async def poll_repo(self, watch: RepoWatch) -> float:
+        """
+        Run one polling cycle for a repository, processing its completed runs concurrently.
+
+        Args:
+            watch: Repository being watched
+
+        Returns:
+            Delay in seconds before the repository's next cycle
+        """
+        monitor = watch.monitor
+        capture = monitor.profiler.start_cycle(monitor.repo) if monitor.profiler is not None else None
+        # The event loop runs every repository's cycle, so only the work handed to threads is profiled
+        profiled = capture.wrap if capture is not None else (lambda function: function)
+        try:
+            async with watch.semaphore:
+                runs = await asyncio.to_thread(profiled(monitor.discover_runs))
+                failed_jobs = (await asyncio.to_thread(profiled(monitor.discover_failed_jobs))
+                               if monitor.early_failures else [])
+            await asyncio.gather(*(self._process(watch, run, profiled(monitor.handle_run), run) for run in runs),
+                                 *(self._process(watch, run, profiled(monitor.handle_failed_jobs), run, jobs)
+                                   for run, jobs in failed_jobs))
+            delay, reason = watch.scheduler.next_delay(monitor.active_run_count(), monitor.client.poll_interval)
+        except Exception as e:
+            print(f"[{monitor.repo}] Error in monitoring loop: {e}")
+            delay, reason = watch.scheduler.on_error()
+        finally:
+            if capture is not None:
+                capture.end()
+        monitor.report_cycle_stats()
+        print(f"[{monitor.repo}] Next poll in {delay:.0f}s ({reason})")
+        return delay
+
+    async def _process(self, watch: RepoWatch, run: Dict, function: Callable, *args) -> None:
+        monitor = watch.monitor
+        try:
+            async with watch.semaphore:
+                await asyncio.to_thread(function, *args)
+        except Exception as e:
+            # Left unprocessed, so the next cycle picks the run up again
+            print(f"[{monitor.repo}] Error processing run {run['id']}: {e}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Adaptive Polling Scheduler
+
+Decides how long the monitor waits before its next poll. While runs are
+queued or in progress it polls quickly so failures are seen soon after
+they happen; while the repository is idle it backs off exponentially
+(with jitter, so many monitors don't poll in lockstep) up to a ceiling.
+GitHub's X-Poll-Interval header is treated as a lower bound. Failed
+cycles are retried on their own short backoff schedule, up to a number
+of retries, before falling back to the normal cadence.
+"""
+
+import math
+import random
+from typing import Optional, Tuple
+
+ACTIVE_POLL_INTERVAL = 15  # seconds between polls while runs are active
+MAX_IDLE_INTERVAL = 600  # ceiling for the idle backoff
+IDLE_BACKOFF_FACTOR = 2.0
+RETRY_DELAY = 5  # first retry after a failed cycle, doubled per retry
+JITTER = 0.1  # +/- fraction applied to every delay
+
+
+class PollScheduler:
+    def __init__(self, base_interval: float, active_interval: float = ACTIVE_POLL_INTERVAL,
+                 max_interval: float = MAX_IDLE_INTERVAL, backoff_factor: float = IDLE_BACKOFF_FACTOR,
+                 max_retries: int = 3, retry_delay: float = RETRY_DELAY, jitter: float = JITTER,
+                 rng: Optional[random.Random] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            base_interval: Interval of the first idle poll; the normal cadence
+            active_interval: Interval while runs are queued or in progress
+            max_interval: Ceiling for the idle backoff
+            backoff_factor: Multiplier applied per consecutive idle cycle
+            max_retries: Number of quick retries after consecutive failed cycles
+            retry_delay: Delay before the first retry, doubled for each further one
+            jitter: Fraction of random spread applied to every delay
+            rng: Random number generator (for reproducible tests)
+        """
+        self.base_interval = base_interval
+        self.active_interval = min(active_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.backoff_factor = backoff_factor
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.idle_cycles = 0
+        self.failures = 0
+
+    def _spread(self, delay: float) -> float:
+        return delay * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _idle_interval(self) -> float:
+        exponent = self.idle_cycles - 1
+        if self.backoff_factor > 1 and self.base_interval > 0:
+            # Past the ceiling the exponent only matters for overflowing, so it stops growing there
+            exponent = min(exponent, math.ceil(math.log(self.max_interval / self.base_interval,
+                                                         self.backoff_factor)))
+        return self.base_interval * self.backoff_factor ** exponent
+
+    def next_delay(self, active_runs: int, server_interval: Optional[int] = None) -> Tuple[float, str]:
+        """
+        Compute the delay after a successful cycle.
+
+        Args:
+            active_runs: Number of runs still queued or in progress
+            server_interval: X-Poll-Interval from the last API response, if any
+
+        Returns:
+            Tuple of (delay in seconds, reason)
+        """
+        self.failures = 0
+        if active_runs:
+            self.idle_cycles = 0
+            delay = self._spread(self.active_interval)
+            reason = f"{active_runs} run{'s' if active_runs != 1 else ''} active"
+        else:
+            self.idle_cycles += 1
+            delay = self._spread(min(self._idle_interval(), self.max_interval))
+            reason = f"idle for {self.idle_cycles} cycle{'s' if self.idle_cycles != 1 else ''}"
+
+        if server_interval and delay < server_interval:
+            delay = float(server_interval)
+            reason += f", raised to X-Poll-Interval {server_interval}s"
+        return delay, reason
+
+    def on_error(self) -> Tuple[float, str]:
+        """
+        Compute the delay after a failed cycle.
+
+        Returns:
+            Tuple of (delay in seconds, reason)
+        """
+        self.failures += 1
+        if self.failures <= self.max_retries:
+            delay = self._spread(self.retry_delay * 2 ** (self.failures - 1))
+            return delay, f"retry {self.failures}/{self.max_retries} after error"
+
+        self.failures = 0
+        return self._spread(self.base_interval), "retries exhausted, back to normal cadence"
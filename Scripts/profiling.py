@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Cycle Profiling
+
+Captures cProfile statistics and tracemalloc snapshots of polling cycles,
+so a slow cycle or a growing process can be diagnosed in the running
+monitor rather than by attaching tools to it. A cycle covers its poll and
+the processing of the runs it submitted, in whichever threads they run;
+cProfile only sees the thread it is enabled in, so every piece of work is
+profiled in its own thread and the statistics are merged when the cycle
+ends. From Python 3.12 cProfile runs on sys.monitoring, which allows one
+active profiler per process: work that starts while another piece of work
+is being profiled runs unprofiled, so cycles that process runs in parallel
+only show part of their CPU time there.
+
+Every Nth cycle is dumped, and with a latency threshold every cycle is
+profiled and the ones that took longer are dumped too. Each dump is written
+to the profile directory as:
+
+    cycle-<time>-<n>.prof         cProfile statistics, for pstats or snakeviz
+    cycle-<time>-<n>.tracemalloc  tracemalloc snapshot, for tracemalloc.Snapshot.load
+    cycle-<time>-<n>.txt          top functions, top allocations and the growth since the last dump
+
+Only the newest dumps are kept. SIGUSR1 turns profiling on and off at runtime.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.path.join(SCRIPT_DIR, "profiles")
+KEEP_DUMPS = 20  # cycles whose dumps are kept
+TOP_N = 25  # functions and allocation sites listed in a summary
+TRACE_FRAMES = 10  # frames tracemalloc keeps per allocation
+
+# Allocations of the profiler itself and of imports are left out of summaries
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class CycleCapture:
+    def __init__(self, profiler: "CycleProfiler", cycle: int, label: str, cpu: bool):
+        """
+        Profile of one cycle, finished once the cycle and the work it submitted are done.
+
+        Args:
+            profiler: Profiler the capture reports to
+            cycle: Cycle number, counted across all repositories
+            label: What the cycle polled, e.g. the repository
+            cpu: Run the cycle's work under cProfile
+        """
+        self.profiler = profiler
+        self.cycle = cycle
+        self.label = label
+        self.cpu = cpu
+        self.started = time.perf_counter()
+        self.profiles: List[cProfile.Profile] = []
+        # The cycle itself counts as pending work until end() is called
+        self._pending = 1
+        self._lock = threading.Lock()
+
+    def wrap(self, function: Callable) -> Callable:
+        """
+        Wrap a function so it is profiled as work of this cycle in whichever thread it runs.
+
+        The cycle only waits for work it awaits itself before end(), or whose future is tracked.
+        """
+        def run(*args, **kwargs):
+            profile = self._start_profile()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._stop_profile(profile)
+        return run
+
+    def track(self, future) -> None:
+        """
+        Make the cycle wait for a future running its work, done or cancelled.
+
+        Args:
+            future: concurrent.futures or asyncio future
+        """
+        with self._lock:
+            self._pending += 1
+        future.add_done_callback(lambda done: self._done())
+
+    def _start_profile(self) -> Optional[cProfile.Profile]:
+        # A thread already being profiled (wrapped work calling wrapped work) keeps its profile
+        if not self.cpu or getattr(self.profiler._local, "profiling", False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another thread's profile is active (Python 3.12+), so this work runs unprofiled
+            return None
+        self.profiler._local.profiling = True
+        return profile
+
+    def _stop_profile(self, profile: Optional[cProfile.Profile]) -> None:
+        if profile is None:
+            return
+        profile.disable()
+        self.profiler._local.profiling = False
+        with self._lock:
+            self.profiles.append(profile)
+
+    def __enter__(self) -> "CycleCapture":
+        # The block is the cycle itself, profiled in the calling thread
+        self._profile = self._start_profile()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop_profile(self._profile)
+        self.end()
+
+    def end(self) -> None:
+        """
+        Mark the cycle itself as done; the capture finishes with the last of its work.
+        """
+        self._done()
+
+    def _done(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            self.profiler.finish(self, time.perf_counter() - self.started)
+
+
+class CycleProfiler:
+    def __init__(self, output_dir: str = PROFILE_DIR, cpu: bool = False, memory: bool = False,
+                 every: Optional[int] = None, slow_seconds: Optional[float] = None, keep: int = KEEP_DUMPS,
+                 top: int = TOP_N):
+        """
+        Initialize the profiler.
+
+        Without every or slow_seconds, every cycle is dumped while profiling is on.
+
+        Args:
+            output_dir: Directory the dumps are written to
+            cpu: Capture cProfile statistics
+            memory: Capture tracemalloc snapshots
+            every: Dump every Nth cycle
+            slow_seconds: Profile every cycle and dump the ones taking at least this long
+            keep: Cycles whose dumps are kept, at least 1 so the new dump survives its rotation
+            top: Functions and allocation sites listed in a summary
+
+        Raises:
+            ValueError: If keep is less than 1
+        """
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1, got {keep}")
+        self.output_dir = output_dir
+        self.cpu = cpu
+        self.memory = memory
+        self.every = every if every or slow_seconds else 1
+        self.slow_seconds = slow_seconds
+        self.keep = keep
+        self.top = top
+        self.cycles = 0
+        self.dumps = 0
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._toggle = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Kinds turned on by SIGUSR1; both unless some were chosen up front
+        self._kinds = (cpu, memory) if cpu or memory else (True, True)
+        if memory:
+            tracemalloc.start(TRACE_FRAMES)
+
+    @property
+    def enabled(self) -> bool:
+        return self.cpu or self.memory
+
+    def install_signal(self, signum: int = getattr(signal, "SIGUSR1", 0)) -> bool:
+        """
+        Toggle profiling when the process receives signum (SIGUSR1 by default).
+
+        Returns:
+            False if the platform has no such signal
+        """
+        if not signum:
+            return False
+        signal.signal(signum, self.request_toggle)
+        return True
+
+    def request_toggle(self, signum: Optional[int] = None, frame=None) -> None:
+        """
+        Turn profiling on or off from the next cycle. Safe to call from a signal handler.
+        """
+        self._toggle = not self._toggle
+
+    def _apply_toggle(self) -> None:
+        if not self._toggle:
+            return
+        self._toggle = False
+        if self.enabled:
+            self.cpu = self.memory = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._previous = None
+            print("Profiling turned off")
+            return
+        self.cpu, self.memory = self._kinds
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        kinds = [kind for kind, on in (("cpu", self.cpu), ("memory", self.memory)) if on]
+        print(f"Profiling turned on ({', '.join(kinds)}), dumps go to {self.output_dir}")
+
+    def start_cycle(self, label: str) -> Optional[CycleCapture]:
+        """
+        Start capturing a cycle, if it is going to be profiled.
+
+        Args:
+            label: What the cycle polls, e.g. the repository
+
+        Returns:
+            Capture to wrap the cycle's work with and end when the cycle is done, or None
+        """
+        with self._lock:
+            self._apply_toggle()
+            if not self.enabled:
+                return None
+            self.cycles += 1
+            cycle = self.cycles
+        if self.slow_seconds is None and cycle % self.every:
+            return None
+        return CycleCapture(self, cycle, label, self.cpu)
+
+    def finish(self, capture: CycleCapture, seconds: float) -> Optional[str]:
+        """
+        Dump a finished cycle if it was sampled or slow.
+
+        Returns:
+            Path of the summary written, or None
+        """
+        reasons = []
+        if self.every and capture.cycle % self.every == 0:
+            reasons.append(f"every {self.every} cycles" if self.every > 1 else "every cycle")
+        if self.slow_seconds is not None and seconds >= self.slow_seconds:
+            reasons.append(f"slower than {self.slow_seconds:g}s")
+        if not reasons:
+            return None
+
+        with self._lock:
+            os.makedirs(self.output_dir, exist_ok=True)
+            prefix = os.path.join(self.output_dir,
+                                  f"cycle-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{capture.cycle:06d}")
+            summary = io.StringIO()
+            summary.write(f"Cycle {capture.cycle} ({capture.label}) took {seconds:.3f}s, "
+                          f"dumped {' and '.join(reasons)}\n")
+            if capture.profiles:
+                self._dump_stats(capture.profiles, prefix, summary)
+            if self.memory and tracemalloc.is_tracing():
+                self._dump_snapshot(prefix, summary)
+            with open(prefix + ".txt", "w") as f:
+                f.write(summary.getvalue())
+            self.dumps += 1
+            self._rotate()
+        print(f"Profile of cycle {capture.cycle} ({capture.label}, {seconds:.1f}s) written to {prefix}.txt")
+        return prefix + ".txt"
+
+    def _dump_stats(self, profiles: List[cProfile.Profile], prefix: str, summary: io.StringIO) -> None:
+        stats = pstats.Stats(profiles[0], stream=summary)
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(prefix + ".prof")
+        summary.write(f"\nTop {self.top} functions by cumulative time ({len(profiles)} threads):\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+
+    def _dump_snapshot(self, prefix: str, summary: io.StringIO) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        snapshot.dump(prefix + ".tracemalloc")
+        current, peak = tracemalloc.get_traced_memory()
+        summary.write(f"\nTraced memory: {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB\n")
+        summary.write(f"\nTop {self.top} allocation sites:\n")
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            summary.write(f"{stat}\n")
+        if self._previous is not None:
+            summary.write(f"\nTop {self.top} growths since the last dump:\n")
+            for stat in snapshot.compare_to(self._previous, "lineno")[:self.top]:
+                summary.write(f"{stat}\n")
+        self._previous = snapshot
+
+    def _rotate(self) -> None:
+        prefixes = sorted({name.rsplit(".", 1)[0] for name in os.listdir(self.output_dir)
+                           if name.startswith("cycle-")})
+        for prefix in prefixes[:-self.keep]:
+            for extension in (".prof", ".tracemalloc", ".txt"):
+                try:
+                    os.unlink(os.path.join(self.output_dir, prefix + extension))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Workflow Run State Store
+
+A small SQLite store that remembers every workflow run the monitor has
+seen, so restarts neither reprocess old failures nor miss runs that were
+still in progress when the monitor stopped. Runs are only processed once
+they reach a terminal status, and each one records its processing outcome.
+Runs are also looked up by branch and workflow, so a failed run that a
+newer run of the same workflow on the same branch supersedes is skipped.
+
+It also keeps a bounded set of error fingerprints the fixers already
+handled, so an error that keeps failing builds is not fixed (or failed
+on) again in every later run.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+TERMINAL_STATUS = "completed"
+
+# Processing outcomes
+OUTCOME_PROCESSING = "processing"  # claimed by a worker, not finished yet
+OUTCOME_BASELINE = "baseline"  # already finished when the store was first created
+OUTCOME_SKIPPED = "skipped"  # completed without failing
+OUTCOME_NO_ERRORS = "no_errors"
+OUTCOME_NO_FIXES = "no_fixes"
+OUTCOME_FIXED = "fixed"
+OUTCOME_COMMIT_FAILED = "commit_failed"
+OUTCOME_SUPERSEDED = "superseded"  # a newer run of the same workflow on the same branch came along
+
+# Newer runs with these conclusions never got to build, so they don't supersede older ones
+UNBUILT_CONCLUSIONS = ("cancelled", "skipped")
+
+# Results remembered for error fingerprints
+FIX_RESULT_FIXED = "fixed"
+FIX_RESULT_FAILED = "failed"
+
+FINGERPRINT_LIMIT = 10000  # fingerprints kept per repository, least recently seen dropped first
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    name TEXT,
+    status TEXT,
+    conclusion TEXT,
+    head_sha TEXT,
+    head_branch TEXT,
+    workflow_id INTEGER,
+    created_at TEXT,
+    updated_at TEXT,
+    outcome TEXT,
+    processed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_runs_repo_status ON runs (repo, status);
+CREATE INDEX IF NOT EXISTS ix_runs_repo_created ON runs (repo, created_at);
+CREATE INDEX IF NOT EXISTS ix_runs_lineage ON runs (repo, head_branch, workflow_id, id);
+CREATE TABLE IF NOT EXISTS error_fingerprints (
+    repo TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    result TEXT NOT NULL,
+    seen_at TEXT NOT NULL,
+    PRIMARY KEY (repo, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS ix_error_fingerprints_seen ON error_fingerprints (repo, seen_at);
+"""
+
+
+class RunStateStore:
+    def __init__(self, path: str = ":memory:", fingerprint_limit: int = FINGERPRINT_LIMIT):
+        """
+        Open (and create if needed) the run state database.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a throwaway store
+            fingerprint_limit: Error fingerprints kept per repository
+        """
+        self.path = path
+        self.fingerprint_limit = fingerprint_limit
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            # Runs claimed by a monitor that stopped mid-way are processed again
+            self.conn.execute("UPDATE runs SET outcome = NULL WHERE outcome = ?", (OUTCOME_PROCESSING,))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def is_empty(self, repo: str) -> bool:
+        """
+        Check whether any run of the repository has been recorded yet.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM runs WHERE repo = ? LIMIT 1", (repo,)).fetchone()
+        return row is None
+
+    def record_run(self, repo: str, run: Dict) -> bool:
+        """
+        Insert or update a run from a GitHub API run object.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+            run: Workflow run object
+
+        Returns:
+            True if the run is new or its status or conclusion changed
+        """
+        with self._lock, self.conn:
+            previous = self.conn.execute(
+                "SELECT status, conclusion FROM runs WHERE id = ?", (run["id"],)
+            ).fetchone()
+            self.conn.execute(
+                """
+                INSERT INTO runs (id, repo, name, status, conclusion, head_sha, head_branch,
+                                  workflow_id, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    status = excluded.status,
+                    conclusion = excluded.conclusion,
+                    updated_at = excluded.updated_at
+                """,
+                (run["id"], repo, run.get("name"), run.get("status"), run.get("conclusion"),
+                 run.get("head_sha"), run.get("head_branch"), run.get("workflow_id"),
+                 run.get("created_at"), run.get("updated_at"))
+            )
+        return previous is None or (previous["status"], previous["conclusion"]) != \
+            (run.get("status"), run.get("conclusion"))
+
+    def get_run(self, run_id: int) -> Optional[Dict]:
+        """
+        Get the stored state of a run.
+
+        Args:
+            run_id: Workflow run ID
+
+        Returns:
+            Dictionary of the stored columns, or None if the run is unknown
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def needs_processing(self, run_id: int) -> bool:
+        """
+        Check whether a run has reached a terminal status but was not processed yet.
+        """
+        state = self.get_run(run_id)
+        return bool(state) and state["status"] == TERMINAL_STATUS and state["outcome"] is None
+
+    def claim_run(self, run_id: int) -> bool:
+        """
+        Atomically claim a completed, unprocessed run for processing, so that
+        a run reported by both a webhook and a poll is only processed once.
+        
+        Args:
+            run_id: Workflow run ID
+            
+        Returns:
+            True if the caller now owns the run and must call mark_processed
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE runs SET outcome = ? WHERE id = ? AND status = ? AND outcome IS NULL",
+                (OUTCOME_PROCESSING, run_id, TERMINAL_STATUS)
+            )
+        return cursor.rowcount == 1
+
+    def mark_processed(self, run_id: int, outcome: Optional[str]) -> None:
+        """
+        Record the processing outcome of a run.
+
+        Args:
+            run_id: Workflow run ID
+            outcome: One of the OUTCOME_* constants, or None to release a claim for another attempt
+        """
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE runs SET outcome = ?, processed_at = ? WHERE id = ?",
+                (outcome, datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"), run_id)
+            )
+
+    def newer_run_id(self, repo: str, run: Dict) -> Optional[int]:
+        """
+        Find the newest recorded run that supersedes a run: one of the same
+        workflow on the same branch, started later and not cancelled or skipped.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+            run: Workflow run object
+
+        Returns:
+            ID of the superseding run, or None
+        """
+        if run.get("head_branch") is None or run.get("workflow_id") is None:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                f"""
+                SELECT id FROM runs
+                WHERE repo = ? AND head_branch = ? AND workflow_id = ? AND id > ?
+                    AND (conclusion IS NULL OR conclusion NOT IN ({", ".join("?" * len(UNBUILT_CONCLUSIONS))}))
+                ORDER BY id DESC LIMIT 1
+                """,
+                (repo, run["head_branch"], run["workflow_id"], run["id"], *UNBUILT_CONCLUSIONS)
+            ).fetchone()
+        return row["id"] if row else None
+
+    def pending_run_ids(self, repo: str) -> List[int]:
+        """
+        Get the runs that have not reached a terminal status yet.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+
+        Returns:
+            Run IDs, oldest first
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id FROM runs WHERE repo = ? AND status != ? ORDER BY id", (repo, TERMINAL_STATUS)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def latest_created_at(self, repo: str) -> Optional[str]:
+        """
+        Get the creation time of the newest recorded run.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+
+        Returns:
+            ISO 8601 timestamp, or None if no runs are recorded
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT MAX(created_at) AS latest FROM runs WHERE repo = ?", (repo,)).fetchone()
+        return row["latest"]
+
+    def handled_fingerprints(self, repo: str, fingerprints: List[str]) -> Dict[str, str]:
+        """
+        Look up which error fingerprints were already fixed or failed in earlier runs.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+            fingerprints: Fingerprints to look up
+
+        Returns:
+            Mapping of the known fingerprints to their FIX_RESULT_* result
+        """
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(fingerprints), 500):
+                chunk = fingerprints[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT fingerprint, result FROM error_fingerprints WHERE repo = ? "
+                    f"AND fingerprint IN ({','.join('?' * len(chunk))})", [repo] + chunk
+                ).fetchall()
+                found.update((row["fingerprint"], row["result"]) for row in rows)
+        return found
+
+    def remember_fingerprints(self, repo: str, results: Dict[str, str]) -> None:
+        """
+        Remember the fix results of error fingerprints, dropping the least
+        recently seen ones beyond the per-repository limit.
+
+        Args:
+            repo: Repository in format 'owner/repo'
+            results: Mapping of fingerprint to FIX_RESULT_* result
+        """
+        if not results:
+            return
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO error_fingerprints (repo, fingerprint, result, seen_at) VALUES (?, ?, ?, ?)",
+                [(repo, fingerprint, result, now) for fingerprint, result in results.items()]
+            )
+            self.conn.execute(
+                """
+                DELETE FROM error_fingerprints WHERE repo = ? AND fingerprint IN (
+                    SELECT fingerprint FROM error_fingerprints WHERE repo = ?
+                    ORDER BY seen_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (repo, repo, self.fingerprint_limit)
+            )
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+C# Type Symbol Table
+
+Maps a type name to the namespaces that declare it, so a CS0246 error
+("The type or namespace name 'X' could not be found") can be fixed by
+adding the right using directive. Types declared in the checkout come
+from the class index, which is persisted and refreshed incrementally;
+framework types come from a bundled table in type_namespaces.json. Both
+are dictionaries, so resolving an error scans nothing.
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from class_index import ClassIndex
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+KNOWN_TYPES_PATH = os.path.join(SCRIPT_DIR, "type_namespaces.json")
+
+
+@lru_cache(maxsize=None)
+def load_known_types(path: str = KNOWN_TYPES_PATH) -> Dict[str, Tuple[str, ...]]:
+    """
+    Load the bundled table of framework types.
+
+    Args:
+        path: JSON file mapping each namespace to the types it declares
+
+    Returns:
+        Dictionary mapping each type name to its namespaces, in file order
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    types: Dict[str, Tuple[str, ...]] = {}
+    for namespace, names in data.items():
+        for name in names:
+            types[name] = types.get(name, ()) + (namespace,)
+    return types
+
+
+class SymbolTable:
+    def __init__(self, class_index: Optional[ClassIndex] = None, known_types_path: str = KNOWN_TYPES_PATH):
+        """
+        Initialize the symbol table.
+
+        Args:
+            class_index: Index of the types declared in the checkout (kept up to date by the caller)
+            known_types_path: Bundled table of framework types
+        """
+        self.class_index = class_index
+        self.known_types = load_known_types(known_types_path)
+
+    def namespaces(self, type_name: str) -> List[str]:
+        """
+        Find the namespaces a type can be imported from.
+
+        Types declared in the checkout take precedence over framework types
+        of the same name. Attributes are looked up with and without their
+        "Attribute" suffix, since [Display] refers to DisplayAttribute.
+
+        Args:
+            type_name: Type name without namespace or type arguments
+
+        Returns:
+            Candidate namespaces; empty if the type is unknown, several if it is ambiguous
+        """
+        names = [type_name] if type_name.endswith("Attribute") else [type_name, type_name + "Attribute"]
+        if self.class_index is not None:
+            for name in names:
+                declared = sorted({location.namespace for location in self.class_index.lookup(name)
+                                   if location.namespace})
+                if declared:
+                    return declared
+        for name in names:
+            if name in self.known_types:
+                return list(self.known_types[name])
+        return []
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Synthetic Build Log Generator
+
+Produces dotnet build logs and GitHub Actions log archives of any size,
+from a few KB to several GB, with a configurable density of compiler
+errors. Logs are written line by line, so generating a huge archive never
+holds more than one line in memory.
+
+Error lines reference view models in a synthetic checkout written by
+write_repo, so the monitor can also fix what it finds:
+    ViewModels/File<f>.cs declaring ViewModel<f>_<c> classes
+
+The same builds can be written as MSBuild binary logs (format version
+18), as uploaded in the build-logs-<run_id> artifact, with one record per
+log line, so both error sources can be compared on identical builds.
+
+Usage:
+    python synthetic_logs.py archive logs.zip --size 50MB --members 8 --errors-per-mb 20
+    python synthetic_logs.py log build.txt --size 1GB --errors-per-mb 2
+    python synthetic_logs.py artifact build-logs.zip --size 50MB --errors-per-mb 20
+    python synthetic_logs.py binlog-fixtures fixtures/binlog
+"""
+
+import argparse
+import gzip
+import os
+import random
+import re
+import struct
+import zipfile
+from typing import BinaryIO, Iterator, List, Optional, TextIO
+
+from binlog_reader import (FIELD_ARGUMENTS, FIELD_BUILD_EVENT_CONTEXT, FIELD_EXTENDED, FIELD_IMPORTANCE,
+                           FIELD_MESSAGE, FIELD_SENDER_NAME, FIELD_THREAD_ID, FIELD_TIMESTAMP, MIN_FORMAT_VERSION,
+                           RECORD_END_OF_FILE, RECORD_ERROR, RECORD_NAME_VALUE_LIST, RECORD_STRING, RECORD_WARNING,
+                           STRING_START_INDEX)
+
+RUNNER_ROOT = "/home/runner/work/AccountingModule/AccountingModule/"
+TIMESTAMP = "2025-05-29T00:00:{second:02d}.0000000Z "
+
+NOISE_LINES = [
+    "  Compiling module {n} ...",
+    "  Determining projects to restore...",
+    "  Restored /home/runner/work/AccountingModule/AccountingModule/AccountingModule.csproj (in {n} ms).",
+    "  AccountingModule -> /home/runner/work/AccountingModule/AccountingModule/bin/Release/net8.0/AccountingModule.dll",
+    "warning CS8618: Non-nullable property 'Name{n}' must contain a non-null value when exiting constructor.",
+]
+PROPERTY_SUFFIXES = ["Name", "IsActive", "ClientId", "DueDate", "TotalAmount", "Reference"]
+UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+# Record kinds only written, never read, by the monitor
+RECORD_BUILD_STARTED = 1
+RECORD_MESSAGE = 11
+TICKS_2025 = 638712864000000000  # 2025-01-01T00:00:00Z in .NET ticks
+DIAGNOSTIC_LINE_PATTERN = re.compile(r"^(?:\S+Z )?(?:(?P<file>.+?)\((?P<line>\d+),(?P<column>\d+)\): )?"
+                                     r"(?P<severity>error|warning) (?P<code>\w+): (?P<message>.*)$")
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a size such as "512KB", "20MB" or "1.5GB" (plain numbers are bytes).
+    """
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def error_line(rng: random.Random, index: int, files: int, classes: int) -> str:
+    """
+    Build a compiler error line for one of the synthetic view models.
+    """
+    file_index = rng.randrange(files)
+    class_index = rng.randrange(classes)
+    roll = rng.random()
+    location = f"{RUNNER_ROOT}ViewModels/File{file_index}.cs({rng.randint(1, 400)},{rng.randint(1, 80)})"
+    if roll < 0.7:
+        property_name = f"Extra{index}{PROPERTY_SUFFIXES[index % len(PROPERTY_SUFFIXES)]}"
+        return (f"{location}: error CS1061: 'ViewModel{file_index}_{class_index}' does not contain a definition "
+                f"for '{property_name}' and no accessible extension method '{property_name}' accepting a first "
+                f"argument of type 'ViewModel{file_index}_{class_index}' could be found")
+    if roll < 0.85:
+        return f"{location}: error CS0103: The name 'entry{index}' does not exist in the current context"
+    return f"{location}: error CS1002: ; expected"
+
+
+def iter_build_log(size: int, errors_per_mb: float, seed: int = 1, files: int = 10, classes: int = 20) -> Iterator[str]:
+    """
+    Generate the lines of a build log.
+
+    Args:
+        size: Approximate log size in bytes
+        errors_per_mb: Average number of error lines per MB of log
+        seed: Random seed, so the same arguments give the same log
+        files: Number of view model files errors refer to
+        classes: Number of classes per view model file
+
+    Yields:
+        Log lines, each ending with a newline
+    """
+    rng = random.Random(seed)
+    written = 0
+    index = 0
+    # Chance of an error per line, given noise lines of roughly 90 bytes
+    error_chance = min(1.0, errors_per_mb * 90 / UNITS["MB"])
+    while written < size:
+        if rng.random() < error_chance:
+            text = error_line(rng, index, files, classes)
+            index += 1
+        else:
+            text = rng.choice(NOISE_LINES).format(n=rng.randint(0, 10 ** 6))
+        line = TIMESTAMP.format(second=written * 60 // max(size, 1)) + text + "\n"
+        written += len(line)
+        yield line
+
+
+def write_build_log(out: TextIO, size: int, errors_per_mb: float, seed: int = 1, **kwargs) -> None:
+    """
+    Write a build log to a text file object; see iter_build_log.
+    """
+    for line in iter_build_log(size, errors_per_mb, seed, **kwargs):
+        out.write(line)
+
+
+def write_log_archive(path: str, size: int, errors_per_mb: float, members: int = 4, seed: int = 1,
+                      compression: int = zipfile.ZIP_DEFLATED, **kwargs) -> None:
+    """
+    Write a run log archive shaped like GitHub's: one log file per job step.
+
+    Args:
+        path: Archive path
+        size: Approximate total uncompressed size in bytes
+        errors_per_mb: Average number of error lines per MB of log
+        members: Number of job logs in the archive
+        seed: Random seed
+        compression: zipfile compression method
+        **kwargs: Passed through to iter_build_log
+    """
+    with zipfile.ZipFile(path, "w", compression) as archive:
+        for member in range(members):
+            with archive.open(f"build ({member})/{member + 1}_Build.txt", "w", force_zip64=True) as raw:
+                for line in iter_build_log(size // members, errors_per_mb, seed * 1000 + member, **kwargs):
+                    raw.write(line.encode())
+
+
+def _encode_int(value: int) -> bytes:
+    # 7-bit encoding of the value's unsigned 32-bit form
+    value &= 0xFFFFFFFF
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append(value & 0x7F | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+class BinlogWriter:
+    def __init__(self, out: BinaryIO, version: int = MIN_FORMAT_VERSION):
+        """
+        Write an MSBuild binary log the way MSBuild's BinaryLogger lays it out.
+
+        Args:
+            out: Writable binary file object
+            version: File format version written in the header
+        """
+        self.out = gzip.GzipFile(fileobj=out, mode="wb", mtime=0)
+        self.out.write(struct.pack("<ii", version, MIN_FORMAT_VERSION))
+        self.strings = {}
+        self.name_value_lists = 0
+
+    def record(self, kind: int, payload: bytes) -> None:
+        self.out.write(_encode_int(kind) + _encode_int(len(payload)) + payload)
+
+    def string(self, text: Optional[str]) -> bytes:
+        """
+        Reference a string, writing its String record the first time it is used.
+        """
+        if text is None:
+            return _encode_int(0)
+        if text == "":
+            return _encode_int(1)
+        index = self.strings.get(text)
+        if index is None:
+            encoded = text.encode("utf-8")
+            self.record(RECORD_STRING, encoded)
+            index = self.strings[text] = STRING_START_INDEX + len(self.strings)
+        return _encode_int(index)
+
+    def name_value_list(self, pairs: List[tuple]) -> bytes:
+        """
+        Write a NameValueList record and return a reference to it.
+        """
+        payload = _encode_int(len(pairs)) + b"".join(self.string(key) + self.string(value) for key, value in pairs)
+        self.record(RECORD_NAME_VALUE_LIST, payload)
+        self.name_value_lists += 1
+        return _encode_int(STRING_START_INDEX + self.name_value_lists - 1)
+
+    def _common_fields(self, flags: int, message: str, arguments: Optional[List[str]] = None,
+                       importance: Optional[int] = None, extended: Optional[dict] = None) -> bytes:
+        flags |= FIELD_MESSAGE | FIELD_BUILD_EVENT_CONTEXT | FIELD_THREAD_ID | FIELD_SENDER_NAME | FIELD_TIMESTAMP
+        if arguments:
+            flags |= FIELD_ARGUMENTS
+        if importance is not None:
+            flags |= FIELD_IMPORTANCE
+        if extended is not None:
+            flags |= FIELD_EXTENDED
+        payload = _encode_int(flags) + self.string(message)
+        payload += b"".join(_encode_int(value) for value in (0, 1, 2, 3, 0, 1, -1))
+        payload += _encode_int(1) + self.string("MSBuild")
+        payload += struct.pack("<q", TICKS_2025) + _encode_int(1)
+        if arguments:
+            payload += _encode_int(len(arguments)) + b"".join(self.string(argument) for argument in arguments)
+        if importance is not None:
+            payload += _encode_int(importance)
+        if extended is not None:
+            payload += (self.string(extended.get("type")) + self.name_value_list(extended.get("metadata", []))
+                        + self.string(extended.get("data")))
+        return payload
+
+    def diagnostic(self, severity: str, code: str, message: str, file: Optional[str] = None,
+                   project_file: Optional[str] = None, line: int = 0, column: int = 0, end_line: int = 0,
+                   end_column: int = 0, subcategory: Optional[str] = None, arguments: Optional[List[str]] = None,
+                   extended: Optional[dict] = None) -> None:
+        """
+        Write an Error or Warning record.
+        """
+        payload = self._common_fields(0, message, arguments, extended=extended)
+        payload += (self.string(subcategory) + self.string(code) + self.string(file) + self.string(project_file))
+        payload += b"".join(_encode_int(value) for value in (line, column, end_line, end_column))
+        self.record(RECORD_ERROR if severity == "error" else RECORD_WARNING, payload)
+
+    def message(self, text: str, importance: int = 1) -> None:
+        """
+        Write a Message record.
+        """
+        self.record(RECORD_MESSAGE, self._common_fields(0, text, importance=importance))
+
+    def close(self) -> None:
+        self.out.write(_encode_int(RECORD_END_OF_FILE))
+        self.out.close()
+
+
+def write_log_binlog(out: BinaryIO, lines: Iterator[str], project_file: str = RUNNER_ROOT + "AccountingModule.csproj") -> None:
+    """
+    Write build log lines as a binary log: diagnostics as Error and Warning
+    records, everything else as Message records.
+    """
+    writer = BinlogWriter(out)
+    writer.record(RECORD_BUILD_STARTED, writer._common_fields(0, "Build started."))
+    for line in lines:
+        text = line.rstrip("\n")
+        match = DIAGNOSTIC_LINE_PATTERN.match(text)
+        if match is None:
+            writer.message(text[len(TIMESTAMP.format(second=0)):])
+            continue
+        writer.diagnostic(match.group("severity"), match.group("code"), match.group("message"),
+                          match.group("file"), project_file, int(match.group("line") or 0),
+                          int(match.group("column") or 0), subcategory="")
+    writer.close()
+
+
+def write_build_artifact(path: str, size: int, errors_per_mb: float, members: int = 4, seed: int = 1,
+                         **kwargs) -> None:
+    """
+    Write a build-logs artifact holding a binary log of the same build that
+    write_log_archive writes as text logs.
+
+    Args:
+        path: Artifact zip path
+        size: Approximate total size of the equivalent text logs in bytes
+        errors_per_mb: Average number of error lines per MB of log
+        members: Number of job logs in the equivalent log archive
+        seed: Random seed
+        **kwargs: Passed through to iter_build_log
+    """
+    def lines():
+        for member in range(members):
+            yield from iter_build_log(size // members, errors_per_mb, seed * 1000 + member, **kwargs)
+
+    # Binary logs are already compressed
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        with archive.open("build.binlog", "w", force_zip64=True) as raw:
+            write_log_binlog(raw, lines())
+
+
+def write_binlog_fixtures(directory: str) -> None:
+    """
+    Write the binary logs the tests read.
+    """
+    os.makedirs(directory, exist_ok=True)
+    project = "D:\\a\\AccountingModule\\AccountingModule\\AccountingModule.csproj"
+    view_models = "D:\\a\\AccountingModule\\AccountingModule\\Areas\\Accounting\\ViewModels\\"
+    with open(os.path.join(directory, "errors.binlog"), "wb") as f:
+        writer = BinlogWriter(f)
+        writer.record(RECORD_BUILD_STARTED, writer._common_fields(0, "Build started."))
+        writer.message("Restored AccountingModule.csproj (in 120 ms).")
+        writer.diagnostic("warning", "CS8618", "Non-nullable property 'Name' must contain a non-null value.",
+                          view_models + "ClientViewModel.cs", project, 12, 23, 12, 27)
+        writer.diagnostic("error", "CS1061",
+                          "'ClientListViewModel' does not contain a definition for 'Clients' and no accessible "
+                          "extension method 'Clients' accepting a first argument of type 'ClientListViewModel' "
+                          "could be found", view_models + "ClientVendorViewModels.cs", project, 120, 21, 120, 28)
+        writer.message("x" * 70000, importance=2)
+        # Placeholders filled from arguments, and extended data before the diagnostic fields
+        writer.diagnostic("error", "CS0029", "Cannot implicitly convert type '{0}' to '{1}'",
+                          "Areas/Accounting/ViewModels/JournalEntryViewModels.cs", project, 45, 16,
+                          arguments=["string", "int"], extended={"type": "Custom", "metadata": [("a", "b")]})
+        writer.diagnostic("error", "MSB3644", "The reference assemblies for .NETFramework,Version=v4.8 were not found.",
+                          subcategory="", line=0, column=0)
+        writer.close()
+    with open(os.path.join(directory, "legacy.binlog"), "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as out:
+            out.write(struct.pack("<i", 14) + _encode_int(RECORD_END_OF_FILE))
+
+
+def write_repo(path: str, files: int = 10, classes: int = 20, properties: int = 10) -> None:
+    """
+    Write the view models the synthetic errors refer to.
+
+    Args:
+        path: Checkout directory
+        files: Number of view model files
+        classes: Number of classes per file
+        properties: Number of properties per class
+    """
+    directory = os.path.join(path, "ViewModels")
+    os.makedirs(directory, exist_ok=True)
+    for file_index in range(files):
+        lines = ["using System;", "using System.Collections.Generic;", "using System.ComponentModel.DataAnnotations;",
+                 "", "namespace AccountingModule.ViewModels", "{"]
+        for class_index in range(classes):
+            lines += [f"    public class ViewModel{file_index}_{class_index}", "    {"]
+            lines += [f"        public string Field{p} {{ get; set; }}" for p in range(properties)]
+            lines += ["    }", ""]
+        lines.append("}")
+        with open(os.path.join(directory, f"File{file_index}.cs"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Generate synthetic dotnet build logs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("log", "Write a single build log"), ("archive", "Write a run log archive"),
+                            ("artifact", "Write a build-logs artifact with the binary log of a build")):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("path", help="Output file")
+        command.add_argument("--size", default="1MB", help="Approximate size, e.g. 512KB, 20MB, 1GB")
+        command.add_argument("--errors-per-mb", type=float, default=20, help="Error lines per MB of log")
+        command.add_argument("--seed", type=int, default=1, help="Random seed")
+        if name in ("archive", "artifact"):
+            command.add_argument("--members", type=int, default=4, help="Number of job logs in the archive")
+
+    fixtures = subparsers.add_parser("binlog-fixtures", help="Write the binary log test fixtures")
+    fixtures.add_argument("path", help="Output directory")
+
+    args = parser.parse_args(argv)
+    if args.command == "binlog-fixtures":
+        write_binlog_fixtures(args.path)
+        print(f"Wrote binary log fixtures to {args.path}")
+        return
+    if args.command == "log":
+        with open(args.path, "w") as f:
+            write_build_log(f, parse_size(args.size), args.errors_per_mb, args.seed)
+    elif args.command == "artifact":
+        write_build_artifact(args.path, parse_size(args.size), args.errors_per_mb, args.members, args.seed)
+    else:
+        write_log_archive(args.path, parse_size(args.size), args.errors_per_mb, args.members, args.seed)
+    print(f"Wrote {args.path} ({os.path.getsize(args.path) / UNITS['MB']:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel log archive scanner
+"""
+
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+import unittest
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from archive_scanner import scan_archive, scan_stream
+from bench_monitor import make_log_archive
+from synthetic_logs import write_log_archive
+from github_actions_monitor import GitHubActionsMonitor
+
+
+class TestArchiveScanner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "logs.zip")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_parallel_and_byte_scans_match_sequential_scan(self):
+        """Members scanned by a pool, as text or bytes, merge in archive order"""
+        make_log_archive(self.path, 6, 20, 5, zipfile.ZIP_STORED)
+        expected = scan_archive(self.path)
+        self.assertEqual(len(expected[0]), 120)
+        self.assertEqual(expected[1], [])
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(scan_archive(self.path, pool), expected)
+            self.assertEqual(scan_archive(self.path, pool, byte_scan=True), expected)
+        self.assertEqual(scan_archive(self.path, byte_scan=True), expected)
+
+    def test_general_errors_only_without_located_errors(self):
+        """General matches from any member are dropped once another member has located ones"""
+        with zipfile.ZipFile(self.path, "w") as archive:
+            archive.writestr("1_Restore.txt", "error NU1101: Unable to find package Foo\n")
+            archive.writestr("2_Build.txt", "/src/A.cs(1,2): error CS1002: ; expected\r\n")
+        self.assertEqual(scan_archive(self.path), ([("/src/A.cs", "1", "2", "CS1002", "; expected")], []))
+
+        with zipfile.ZipFile(self.path, "w") as archive:
+            archive.writestr("1_Restore.txt", "error NU1101: Unable to find package Foo\n")
+        self.assertEqual(scan_archive(self.path, byte_scan=True), ([], [("NU1101", "Unable to find package Foo")]))
+
+    def test_chunked_byte_scan_matches_text_scan(self):
+        """Compressed members scanned in small chunks give the same matches as whole-member scans"""
+        make_log_archive(self.path, 3, 20, 5)
+        expected = scan_archive(self.path)
+        self.assertEqual(scan_archive(self.path, byte_scan=True, memory_limit=4096), expected)
+
+        # Lines longer than a chunk are scanned by their start, and the lines after them are unaffected
+        log = (b"x" * 5000 + b"\n/src/A.cs(1,2): error CS1002: ; expected\n"
+               + b"/src/B.cs(3,4): error CS0103: " + b"y" * 5000 + b"\n/src/C.cs(5,6): error CS0246: Foo")
+        located, general = scan_stream(io.BytesIO(log), memory_limit=4096)
+        self.assertEqual([match[:4] for match in located], [
+            ("/src/A.cs", "1", "2", "CS1002"), ("/src/B.cs", "3", "4", "CS0103"), ("/src/C.cs", "5", "6", "CS0246")])
+        self.assertEqual(located[1][4], "y" * (512 - 30))
+        self.assertEqual(located[2][4], "Foo")
+        self.assertEqual(general, [])
+
+    def test_byte_scan_memory_stays_bounded(self):
+        """Peak memory of a byte scan stays under its limit, however large the member"""
+        write_log_archive(self.path, 16 * 1024 * 1024, 2, members=1)
+        limit = 1024 * 1024
+
+        tracemalloc.start()
+        try:
+            located, general = scan_archive(self.path, byte_scan=True, memory_limit=limit)
+            byte_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            self.assertEqual(scan_archive(self.path), (located, general))
+            text_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreater(len(located), 20)
+        self.assertLess(byte_peak, limit)
+        # Decoding the whole member costs more than the member's size
+        self.assertGreater(text_peak, 16 * 1024 * 1024)
+
+    def test_monitor_with_workers_matches_streaming_extraction(self):
+        """A monitor with a scan pool finds the same errors as the streaming path"""
+        make_log_archive(self.path, 4, 10, 3)
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        def download(path, target):
+            target.write(data)
+            target.seek(0)
+            return True
+
+        streaming = GitHubActionsMonitor("fake_token", "owner/repo")
+        pooled = GitHubActionsMonitor("fake_token", "owner/repo", workers=2, byte_scan=True)
+        try:
+            with patch.object(streaming.client, "download", side_effect=download), \
+                    patch.object(pooled.client, "download", side_effect=download):
+                expected = streaming.extract_run_errors(42)
+                # The members repeat each other's errors, which are reported once
+                self.assertEqual(len(expected), 28)
+                self.assertEqual(pooled.extract_run_errors(42), expected)
+        finally:
+            pooled.scan_pool().shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the MSBuild binary log reader
+"""
+
+import contextlib
+import gzip
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import binlog_reader
+from binlog_reader import BinlogFormatError, diagnostic_path, read_binlog
+from fake_github import FakeGitHub
+from github_actions_monitor import GitHubActionsMonitor
+from synthetic_logs import write_build_artifact, write_log_archive
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "binlog")
+REPO = "owner/AccountingModule"
+
+
+class TestBinlogReader(unittest.TestCase):
+    def test_reads_diagnostics_from_fixture(self):
+        """Errors and warnings keep their exact code, location and formatted message"""
+        diagnostics = read_binlog(os.path.join(FIXTURES, "errors.binlog"), warnings=True)
+        self.assertEqual([(d.severity, d.code, d.line, d.column) for d in diagnostics], [
+            ("warning", "CS8618", 12, 23), ("error", "CS1061", 120, 21), ("error", "CS0029", 45, 16),
+            ("error", "MSB3644", 0, 0)])
+        self.assertTrue(diagnostics[1].file.endswith("\\ViewModels\\ClientVendorViewModels.cs"))
+        self.assertEqual(diagnostics[1].end_column, 28)
+        self.assertEqual(diagnostics[2].message, "Cannot implicitly convert type 'string' to 'int'")
+        self.assertEqual(diagnostic_path(diagnostics[2]), "D:\\a\\AccountingModule\\AccountingModule\\Areas"
+                                                          "\\Accounting\\ViewModels\\JournalEntryViewModels.cs")
+        self.assertIsNone(diagnostics[3].file)
+
+        self.assertEqual([d.code for d in read_binlog(os.path.join(FIXTURES, "errors.binlog"))],
+                         ["CS1061", "CS0029", "MSB3644"])
+        # Records larger than a read chunk are streamed through
+        with patch.object(binlog_reader, "READ_CHUNK_SIZE", 64):
+            self.assertEqual(read_binlog(os.path.join(FIXTURES, "errors.binlog"), warnings=True), diagnostics)
+
+    def test_reads_real_dotnet_build(self):
+        """A log written by dotnet build -bl (SDK 8.0.414, format 21) reads like its console output"""
+        # Built with ProjectImports=None in /home/runner/work/AccountingModule/AccountingModule, from a
+        # ClientViewModels.cs missing a using, a member and a conversion, with nullable warnings on
+        path = os.path.join(FIXTURES, "dotnet-build.binlog")
+        with open(path, "rb") as f:
+            reader = binlog_reader.BinlogReader(f, warnings=True)
+            diagnostics = list(reader)
+        self.assertGreaterEqual(reader.version, binlog_reader.MIN_FORMAT_VERSION)
+        self.assertEqual([(d.severity, d.code, d.line, d.column) for d in diagnostics], [
+            ("warning", "CS8618", 6, 23), ("error", "CS0246", 13, 13), ("error", "CS0246", 13, 38),
+            ("error", "CS1061", 14, 30), ("error", "CS0029", 15, 25)])
+        self.assertEqual({d.file for d in diagnostics}, {"/home/runner/work/AccountingModule/AccountingModule/Areas/"
+                                                         "Accounting/ViewModels/ClientViewModels.cs"})
+        self.assertEqual({d.project_file for d in diagnostics},
+                         {"/home/runner/work/AccountingModule/AccountingModule/AccountingModule.csproj"})
+        self.assertEqual(diagnostics[3].message,
+                         "'ClientViewModel' does not contain a definition for 'ClientName' and no accessible "
+                         "extension method 'ClientName' accepting a first argument of type 'ClientViewModel' could "
+                         "be found (are you missing a using directive or an assembly reference?)")
+        self.assertEqual(diagnostics[4].message, "Cannot implicitly convert type 'string' to 'int'")
+        self.assertEqual([d.code for d in read_binlog(path)], ["CS0246", "CS0246", "CS1061", "CS0029"])
+
+    def test_rejects_old_and_truncated_logs(self):
+        """Logs without length-prefixed records and cut-off logs raise BinlogFormatError"""
+        with self.assertRaisesRegex(BinlogFormatError, "version 14"):
+            read_binlog(os.path.join(FIXTURES, "legacy.binlog"))
+
+        with open(os.path.join(FIXTURES, "errors.binlog"), "rb") as f:
+            data = gzip.decompress(f.read())
+        for cut in (6, len(data) // 2):
+            with self.assertRaises(BinlogFormatError):
+                list(binlog_reader.iter_binlog_diagnostics(io.BytesIO(gzip.compress(data[:cut]))))
+
+    def test_monitor_reads_errors_from_artifact(self):
+        """The binlog error source finds the same errors as the text logs, and falls back to them"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "logs.zip")
+            artifact = os.path.join(temp_dir, "build-logs.zip")
+            write_log_archive(archive, 64 * 1024, 200, members=2)
+            write_build_artifact(artifact, 64 * 1024, 200, members=2)
+            fake = FakeGitHub().start()
+            try:
+                fake.add_run(REPO, 1, archive, artifacts={"build-logs-1": artifact})
+                fake.add_run(REPO, 2, archive)
+                logs = GitHubActionsMonitor("fake-token", REPO, api_url=fake.url)
+                binlog = GitHubActionsMonitor("fake-token", REPO, api_url=fake.url, error_source="binlog")
+                with contextlib.redirect_stdout(io.StringIO()):
+                    expected = logs.extract_run_errors(1)
+                    from_binlog = binlog.extract_run_errors(1)
+                    run_logs = fake.requests["run_logs"]
+                    fallback = binlog.extract_run_errors(2)
+            finally:
+                fake.stop()
+
+        self.assertGreater(len(expected), 5)
+        self.assertEqual(from_binlog, expected)
+        self.assertEqual(fake.requests["artifact_zips"], 1)
+        self.assertEqual(run_logs, 1)
+        self.assertEqual(fallback, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
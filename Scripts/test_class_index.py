@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the C# class location index
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from class_index import ClassIndex, parse_declarations
+from fix_planner import FixPlanner
+
+VIEW_MODELS = """using System;
+using System.ComponentModel.DataAnnotations;
+
+namespace AccountingModule.Areas.Accounting.ViewModels
+{
+    public class InvoiceViewModel
+    {
+        public int Id { get; set; }
+    }
+
+    public partial class InvoiceLineViewModel
+    {
+    }
+
+    public record InvoiceSummary(int Id, decimal Total);
+}
+"""
+
+CONTROLLER = """using System;
+
+namespace AccountingModule.Areas.Accounting.Controllers;
+
+internal sealed class InvoiceController
+{
+    public void Index(InvoiceViewModel model) { var due = model.DueDate; }
+}
+"""
+
+
+class TestClassIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo = self.temp_dir.name
+        self.index_path = os.path.join(self.repo, ".cache", "index.json")
+        self.view_models = self.write("Areas/Accounting/ViewModels/InvoiceViewModel.cs", VIEW_MODELS)
+        self.controller = self.write("Areas/Accounting/Controllers/InvoiceController.cs", CONTROLLER)
+        self.write("obj/Debug/Generated.cs", "public class InvoiceViewModel { }\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, relative, content):
+        path = os.path.join(self.repo, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_parse_declarations(self):
+        """Declarations carry their namespace, kind and brace span"""
+        declarations = {d.name: d for d in parse_declarations(VIEW_MODELS + CONTROLLER)}
+        invoice = declarations["InvoiceViewModel"]
+        self.assertEqual(invoice.namespace, "AccountingModule.Areas.Accounting.ViewModels")
+        self.assertEqual(VIEW_MODELS[invoice.close_brace - 4:invoice.close_brace + 1], "    }")
+        self.assertTrue(declarations["InvoiceLineViewModel"].partial)
+        self.assertEqual(declarations["InvoiceSummary"].kind, "record")
+        self.assertEqual(declarations["InvoiceSummary"].open_brace, -1)
+        self.assertEqual(declarations["InvoiceController"].namespace, "AccountingModule.Areas.Accounting.Controllers")
+
+    def test_incremental_refresh_and_persistence(self):
+        """Only changed files are parsed again, and a reloaded index needs no parsing"""
+        index = ClassIndex(self.repo, self.index_path)
+        self.assertEqual(index.refresh(), 2)
+        self.assertEqual([l.path for l in index.lookup("InvoiceViewModel")], [self.view_models])
+        self.assertEqual(index.refresh(), 0)
+
+        # Touched but identical content is re-hashed, not parsed
+        os.utime(self.controller, (0, 0))
+        self.assertEqual(index.refresh(), 0)
+
+        self.write("Areas/Accounting/ViewModels/InvoiceViewModel.cs", VIEW_MODELS.replace("InvoiceSummary", "Summary"))
+        os.remove(self.controller)
+        self.assertEqual(index.refresh(), 1)
+        self.assertEqual(index.lookup("InvoiceSummary"), [])
+        self.assertEqual(index.lookup("InvoiceController"), [])
+
+        reloaded = ClassIndex(self.repo, self.index_path)
+        self.assertEqual(reloaded.lookup("Summary")[0].path, self.view_models)
+        self.assertEqual(reloaded.refresh(), 0)
+
+    def test_planner_fixes_class_declared_in_another_file(self):
+        """A CS1061 reported in a controller adds the property to the declaring view model"""
+        index = ClassIndex(self.repo, self.index_path)
+        planner = FixPlanner(self.repo, index)
+        error = {"type": "missing_definition", "code": "CS1061", "line": 7, "column": 60,
+                 "file": "/home/runner/work/AccountingModule/AccountingModule/Areas/Accounting/Controllers/InvoiceController.cs",
+                 "message": "'InvoiceViewModel' does not contain a definition for 'DueDate'"}
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(planner.plan_missing_property(error))
+            self.assertEqual(planner.apply(), [self.view_models])
+
+        self.assertEqual(error["file"], self.controller)
+        with open(self.view_models, "r") as f:
+            content = f.read()
+        self.assertIn("public DateTime DueDate { get; set; }", content)
+        # The index was updated for the written file, so spans stay current
+        span = FixPlanner(self.repo, index).find_class("InvoiceLineViewModel", None)[1]
+        self.assertEqual(content[span[1]], "}")
+        self.assertLess(content.index("DueDate"), span[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled build error classifier
+"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from error_classifier import ErrorClassifier
+from github_actions_monitor import ERROR_PATTERNS
+from bench_monitor import SAMPLE_ERRORS, legacy_extract_build_errors, make_log
+
+
+def reference_classify(patterns, code, message):
+    for pattern, info in patterns.items():
+        if re.search(pattern, message) or re.search(pattern, f"error {code}: {message}"):
+            return info["type"], info["description"]
+    return "unknown", "Unknown error type"
+
+
+class TestErrorClassifier(unittest.TestCase):
+    def test_matches_sequential_classification(self):
+        """Every sample error classifies exactly like the ordered pattern scan"""
+        classifier = ErrorClassifier(ERROR_PATTERNS)
+        messages = SAMPLE_ERRORS + [
+            ("CS0117", "'Account' does not contain a definition for 'Balance'"),
+            ("CS0266", "Cannot implicitly convert type 'int' to 'string'"),
+            ("CS9999", "quoted error CS0266: Cannot implicitly convert type 'a' to 'b'"),
+        ]
+        for code, message in messages:
+            self.assertEqual(classifier.classify(code, message), reference_classify(ERROR_PATTERNS, code, message))
+
+    def test_code_prefixed_patterns_only_match_their_code(self):
+        """A pattern written for one CS code is chosen for that code when it has priority"""
+        patterns = {
+            r"error CS0117: '(\w+)' does not contain a definition": {"type": "member", "description": "m"},
+            r"'(\w+)' does not contain a definition": {"type": "generic", "description": "g"},
+        }
+        classifier = ErrorClassifier(patterns)
+        self.assertEqual(classifier.classify("CS0117", "'A' does not contain a definition")[0], "member")
+        self.assertEqual(classifier.classify("CS1061", "'A' does not contain a definition")[0], "generic")
+
+    def test_position_sensitive_patterns_fall_back_to_sequential(self):
+        """Anchored patterns still see the bare message"""
+        patterns = {r"^'(\w+)' is anchored": {"type": "anchored", "description": "a"}}
+        classifier = ErrorClassifier(patterns)
+        self.assertEqual(classifier.classify("CS0001", "'A' is anchored")[0], "anchored")
+
+    def test_named_groups_fall_back_to_sequential(self):
+        """Patterns reusing a group name are matched one by one rather than combined"""
+        patterns = {
+            r"'(?P<name>\w+)' is missing": {"type": "missing", "description": "m"},
+            r"'(?P<name>\w+)' is obsolete": {"type": "obsolete", "description": "o"},
+        }
+        classifier = ErrorClassifier(patterns)
+        self.assertTrue(classifier._sequential)
+        self.assertEqual(classifier.classify("CS0001", "'A' is obsolete")[0], "obsolete")
+
+    def test_extract_matches_legacy_implementation(self):
+        """extract_build_errors returns the same results as before, plus fingerprints"""
+        from github_actions_monitor import GitHubActionsMonitor
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo")
+        log_content = make_log(300)
+        errors = monitor.extract_build_errors(log_content)
+        self.assertTrue(all(error.pop("fingerprint") for error in errors))
+        self.assertEqual(errors, legacy_extract_build_errors(log_content))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for build error fingerprints and deduplication
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from error_fingerprint import error_fingerprint, unique_errors
+from github_actions_monitor import GitHubActionsMonitor
+from run_state import RunStateStore, FIX_RESULT_FAILED, FIX_RESULT_FIXED, OUTCOME_NO_FIXES
+
+STEP_LINE = "/home/runner/work/App/App/Models/User.cs(12,5): error CS1061: 'User' does not contain a definition for 'Name'"
+SUMMARY_LINE = STEP_LINE + " [/home/runner/work/App/App/App.csproj]"
+
+
+class TestErrorFingerprint(unittest.TestCase):
+    def test_fingerprint_ignores_checkout_root_and_project_suffix(self):
+        """The same error fingerprints alike across runners and in MSBuild's summary"""
+        linux = {"code": "CS1061", "file": "/home/runner/work/App/App/Models/User.cs", "line": 12,
+                 "message": "'User' does not contain a definition for 'Name'"}
+        windows = dict(linux, file="D:\\a\\App\\App\\Models\\User.cs")
+        summary = dict(linux, message=linux["message"] + "  [D:\\a\\App\\App\\App.csproj]")
+        self.assertEqual(error_fingerprint(linux), error_fingerprint(windows))
+        self.assertEqual(error_fingerprint(linux), error_fingerprint(summary))
+        self.assertNotEqual(error_fingerprint(linux), error_fingerprint(dict(linux, line=13)))
+
+    def test_summary_repeats_are_reported_once(self):
+        """Errors repeated by the build summary and other log files are dropped"""
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo")
+        log = "\n".join([STEP_LINE, "Build FAILED.", SUMMARY_LINE, "    1 Error(s)"])
+        errors = list(monitor.iter_build_errors(log))
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(list(unique_errors(errors + [dict(errors[0])]))), 1)
+
+    def test_store_keeps_most_recently_seen_fingerprints(self):
+        """Fingerprints beyond the limit are pruned, least recently seen first"""
+        store = RunStateStore(fingerprint_limit=2)
+        store.remember_fingerprints("o/r", {"a": FIX_RESULT_FIXED})
+        store.remember_fingerprints("o/r", {"b": FIX_RESULT_FAILED})
+        store.remember_fingerprints("o/other", {"c": FIX_RESULT_FIXED})
+        store.remember_fingerprints("o/r", {"a": FIX_RESULT_FIXED})
+        store.remember_fingerprints("o/r", {"d": FIX_RESULT_FIXED})
+
+        self.assertEqual(store.handled_fingerprints("o/r", ["a", "b", "c", "d"]),
+                         {"a": FIX_RESULT_FIXED, "d": FIX_RESULT_FIXED})
+        self.assertEqual(store.handled_fingerprints("o/other", ["c"]), {"c": FIX_RESULT_FIXED})
+
+    def test_later_run_skips_errors_already_handled(self):
+        """An error fixed (or failed) in one run is not attempted again in the next"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = GitHubActionsMonitor("fake_token", "owner/repo", repo_path=temp_dir,
+                                           state_path=os.path.join(temp_dir, "state.db"),
+                                           class_index_path=os.path.join(temp_dir, "index.json"))
+            errors = list(monitor.iter_build_errors(STEP_LINE))
+            run = {"id": 2, "name": "Build", "status": "completed", "conclusion": "failure"}
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                # The file doesn't exist, so the fix fails and is remembered as failed
+                self.assertEqual(monitor.fix_errors(errors), 0)
+                with patch.object(monitor, "extract_run_errors", return_value=errors), \
+                        patch.object(monitor, "fix_errors") as fix_errors:
+                    self.assertEqual(monitor.process_run(run), OUTCOME_NO_FIXES)
+
+        fix_errors.assert_not_called()
+        self.assertIn("Skipping 1 errors handled in earlier runs (0 fixed, 1 failed)", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
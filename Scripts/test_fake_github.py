@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+End-to-end tests of the monitor against the offline fake GitHub API
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from archive_scanner import FILE_ERROR_PATTERN
+from fake_github import FakeGitHub
+from github_actions_monitor import ERROR_SOURCE_ANNOTATIONS, GitHubActionsMonitor
+from run_state import OUTCOME_BASELINE, OUTCOME_FIXED, OUTCOME_NO_FIXES
+from synthetic_logs import RUNNER_ROOT, iter_build_log, write_log_archive, write_repo
+
+REPO = "owner/AccountingModule"
+
+
+class TestFakeGitHub(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_path = os.path.join(self.temp_dir.name, "repo")
+        write_repo(self.repo_path, files=2, classes=3)
+        self.archive = os.path.join(self.temp_dir.name, "logs.zip")
+        write_log_archive(self.archive, 64 * 1024, 200, members=2, files=2, classes=3)
+        self.fake = FakeGitHub().start()
+
+    def tearDown(self):
+        self.fake.stop()
+        self.temp_dir.cleanup()
+
+    def test_synthetic_log_size_and_error_density(self):
+        """Generated logs hit the requested size and roughly the requested error rate"""
+        lines = list(iter_build_log(1024 * 1024, 100))
+        size = sum(len(line) for line in lines)
+        self.assertGreaterEqual(size, 1024 * 1024)
+        self.assertLess(size, 1024 * 1024 + 1024)
+        self.assertTrue(50 < sum(" error CS" in line for line in lines) < 150)
+
+    def test_monitor_fixes_failed_run_end_to_end(self):
+        """Poll, download through the logs redirect, extract and fix a failed run"""
+        self.fake.add_run(REPO, 1, conclusion="success")
+        monitor = GitHubActionsMonitor("fake-token", REPO, repo_path=self.repo_path, api_url=self.fake.url,
+                                       class_index_path=os.path.join(self.temp_dir.name, "index.json"))
+        monitor.commit_and_push_fixes = lambda fixes_count: True
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(monitor.poll_once(), [])
+            self.fake.add_run(REPO, 2, self.archive)
+            processed = monitor.poll_once()
+            # Nothing changed, so the run list is revalidated with a 304
+            monitor.client.reset_stats()
+            self.assertEqual(monitor.poll_once(), [])
+
+        self.assertEqual([run["id"] for run in processed], [2])
+        self.assertEqual(monitor.state.get_run(1)["outcome"], OUTCOME_BASELINE)
+        self.assertEqual(monitor.state.get_run(2)["outcome"], OUTCOME_FIXED)
+        self.assertEqual(monitor.client.stats["not_modified"], 1)
+        self.assertEqual(self.fake.requests["run_logs"], 1)
+        self.assertEqual(self.fake.requests["blobs"], 1)
+        self.assertLess(monitor.client.rate_limit_remaining, 5000)
+        with open(os.path.join(self.repo_path, "ViewModels", "File0.cs"), "r") as f:
+            self.assertIn("[Display(Name = ", f.read())
+
+    def test_failed_jobs_only_reads_job_logs(self):
+        """Failed-jobs-only mode lists the jobs and follows the job log redirect"""
+        job_log = os.path.join(self.temp_dir.name, "job.txt")
+        with open(job_log, "w") as f:
+            f.write("2025-05-29T00:00:01.0000000Z /src/A.cs(1,2): error CS1002: ; expected\n")
+        self.fake.add_run(REPO, 5, jobs=[{"id": 50, "name": "build", "conclusion": "failure",
+                                          "steps": [], "log_path": job_log}])
+        monitor = GitHubActionsMonitor("fake-token", REPO, failed_jobs_only=True, api_url=self.fake.url)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            errors = monitor.extract_run_errors(5)
+        self.assertEqual([(e["code"], e["file"], e["line"]) for e in errors], [("CS1002", "/src/A.cs", 1)])
+        self.assertEqual(self.fake.requests["job_logs"], 1)
+
+    def test_early_failures_fix_failed_job_before_run_completes(self):
+        """A failed job of an in-progress run is fixed right away, and its errors are not fixed again at completion"""
+        # The build job's log holds the errors of the whole run's log archive
+        job_log = os.path.join(self.temp_dir.name, "build.txt")
+        with zipfile.ZipFile(self.archive) as archive, open(job_log, "wb") as f:
+            for name in archive.namelist():
+                f.write(archive.read(name))
+        self.fake.add_run(REPO, 1, conclusion="success")
+        monitor = GitHubActionsMonitor("fake-token", REPO, repo_path=self.repo_path, api_url=self.fake.url,
+                                       early_failures=True,
+                                       class_index_path=os.path.join(self.temp_dir.name, "index.json"))
+        monitor.commit_and_push_fixes = lambda fixes_count: True
+        view_model = os.path.join(self.repo_path, "ViewModels", "File0.cs")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor.poll_once()
+            self.fake.add_run(REPO, 2, self.archive, status="in_progress", conclusion=None, jobs=[
+                {"id": 20, "name": "build", "status": "completed", "conclusion": "failure", "log_path": job_log,
+                 "steps": [{"name": "Build", "conclusion": "failure"}]},
+                {"id": 21, "name": "test", "status": "in_progress", "conclusion": None, "steps": []}])
+            self.assertEqual(monitor.poll_once(), [])
+            with open(view_model, "r") as f:
+                self.assertIn("[Display(Name = ", f.read())
+            # The job is only fetched once while the run goes on
+            monitor.poll_once()
+            self.assertEqual(self.fake.requests["job_logs"], 1)
+            self.assertIsNone(monitor.state.get_run(2)["outcome"])
+
+            self.fake.update_run(REPO, 2, status="completed", conclusion="failure")
+            processed = monitor.poll_once()
+
+        self.assertEqual([run["id"] for run in processed], [2])
+        self.assertEqual(monitor.state.get_run(2)["outcome"], OUTCOME_NO_FIXES)
+        self.assertEqual(monitor.metrics.counters["monitor_early_failures_total"][
+            (("outcome", OUTCOME_FIXED), ("repo", REPO))], 1)
+
+    def test_pending_run_refetched_when_run_list_is_not_modified(self):
+        """A run that dropped off the run list is fetched again each cycle, also when the list comes back as 304"""
+        self.fake.add_run(REPO, 1, conclusion="success", created_at="2025-05-29T00:00:00Z")
+        monitor = GitHubActionsMonitor("fake-token", REPO, repo_path=self.repo_path, api_url=self.fake.url,
+                                       class_index_path=os.path.join(self.temp_dir.name, "index.json"))
+        monitor.commit_and_push_fixes = lambda fixes_count: True
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor.poll_once()
+            self.fake.add_run(REPO, 2, self.archive, status="in_progress", conclusion=None,
+                              created_at="2025-05-29T00:01:00Z")
+            self.fake.add_run(REPO, 3, conclusion="success", created_at="2025-05-29T00:02:00Z", head_branch="feature")
+            monitor.poll_once()
+            # Only run 3 is listed from now on; run 2 is fetched on its own
+            self.assertEqual(monitor.poll_once(), [])
+            self.fake.update_run(REPO, 2, status="completed", conclusion="failure")
+            monitor.client.reset_stats()
+            processed = monitor.poll_once()
+            stats = monitor.client.reset_stats()
+
+        self.assertGreaterEqual(stats["not_modified"], 1)
+        self.assertEqual([run["id"] for run in processed], [2])
+        self.assertEqual(monitor.state.get_run(2)["outcome"], OUTCOME_FIXED)
+
+    def annotations(self, count, warnings=0):
+        """Annotations of the archive's first distinct errors, as Actions' problem matcher reports them"""
+        with zipfile.ZipFile(self.archive) as archive:
+            errors = list(dict.fromkeys(match.groups() for name in archive.namelist()
+                                        for match in FILE_ERROR_PATTERN.finditer(archive.read(name).decode())))
+        annotations = []
+        for i in range(count):
+            # Errors repeat on later lines when the archive has too few
+            path, line, column, code, message = errors[i % len(errors)]
+            annotations.append({"path": path[len(RUNNER_ROOT):], "start_line": int(line) + i // len(errors),
+                                "start_column": int(column), "annotation_level": "failure", "title": "",
+                                "message": f"{code}: {message}"})
+        annotations += [{"path": "ViewModels/File0.cs", "start_line": 1, "annotation_level": "warning",
+                         "message": "CS8618: Non-nullable property must contain a non-null value"}] * warnings
+        return annotations + [{"path": ".github", "start_line": 1, "annotation_level": "failure",
+                               "message": "Process completed with exit code 1."}]
+
+    def test_annotations_replace_log_downloads(self):
+        """Annotations of all failed runs come from one GraphQL query, with logs read only when they are truncated"""
+        self.fake.add_run(REPO, 1, conclusion="success")
+        monitor = GitHubActionsMonitor("fake-token", REPO, repo_path=self.repo_path, api_url=self.fake.url,
+                                       error_source=ERROR_SOURCE_ANNOTATIONS, run_workers=1,
+                                       class_index_path=os.path.join(self.temp_dir.name, "index.json"))
+        monitor.commit_and_push_fixes = lambda fixes_count: True
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            monitor.poll_once()
+            for run_id, annotations in ((2, self.annotations(3)), (3, self.annotations(12)),
+                                        (4, self.annotations(2, warnings=120))):
+                self.fake.add_run(REPO, run_id, self.archive, head_branch=f"branch{run_id}", jobs=[
+                    {"id": run_id * 10, "name": "build", "conclusion": "failure", "steps": [],
+                     "annotations": annotations}])
+            monitor.poll_once()
+            # Without prefetched annotations, the failed jobs are listed through the REST API
+            errors = monitor.extract_annotation_errors(2)
+
+        self.assertEqual(monitor.state.get_run(2)["outcome"], OUTCOME_FIXED)
+        self.assertEqual(self.fake.requests["graphql"], 1)
+        # Run 3 reached the annotation cap, run 4's warnings spill over the GraphQL page
+        self.assertEqual(self.fake.requests["run_logs"], 1)
+        self.assertEqual(self.fake.requests["annotations"], 2 + 1)
+        self.assertIn("which may be truncated, reading its text logs", output.getvalue())
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(os.path.dirname(errors[0]["file"]), os.path.join(self.repo_path, "ViewModels"))
+        self.assertTrue(os.path.exists(errors[0]["file"]))
+        self.assertRegex(errors[0]["code"], r"^CS\d{4}$")
+        self.assertFalse(errors[0]["message"].startswith("CS"))
+        # The same errors read from the logs have the same fingerprints
+        with zipfile.ZipFile(self.archive) as archive:
+            log_errors = [error for name in archive.namelist()
+                          for error in monitor.extract_build_errors(archive.read(name).decode())]
+        self.assertLessEqual({error["fingerprint"] for error in errors},
+                             {error["fingerprint"] for error in log_errors})
+
+if __name__ == "__main__":
+    unittest.main()
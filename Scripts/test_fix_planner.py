@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched fix planner
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_monitor import LegacyFixer, make_missing_property_errors, make_view_model
+from fix_planner import FixPlanner, SourceFile
+from github_actions_monitor import GitHubActionsMonitor
+
+
+class TestFixPlanner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "ViewModels.cs")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, content):
+        with open(self.path, "w") as f:
+            f.write(content)
+
+    def read(self):
+        with open(self.path, "r") as f:
+            return f.read()
+
+    def test_batched_fixes_match_per_error_fixes(self):
+        """Planning many fixes gives the same file as fixing them one at a time"""
+        errors = make_missing_property_errors(self.path, 25, 4)
+        errors.append({"type": "implicit_conversion", "code": "CS0266", "line": 9, "column": 1, "file": self.path,
+                       "message": "Cannot implicitly convert type 'decimal?' to 'decimal'"})
+        original = make_view_model(4).replace("public string Field1 { get; set; }",
+                                              "public string Field1 { get; set; } total = amount;", 1)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.write(original)
+            legacy_count = LegacyFixer(self.temp_dir.name).fix_errors([dict(e) for e in errors])
+            expected = self.read()
+
+            self.write(original)
+            monitor = GitHubActionsMonitor("fake_token", "owner/repo", repo_path=self.temp_dir.name)
+            with patch.object(SourceFile, "write", autospec=True, side_effect=SourceFile.write) as write:
+                count = monitor.fix_errors([dict(e) for e in errors])
+
+        self.assertEqual(count, legacy_count)
+        self.assertEqual(self.read(), expected)
+        self.assertEqual(write.call_count, 1)
+
+    def test_legacy_declaration_and_using_rules(self):
+        """Files without usings get none and only public classes match, as with the per-error fixers"""
+        original = ("namespace Test\n{\n    internal class A\n    {\n    }\n    public record B\n    {\n    }\n"
+                    "    public struct C\n    {\n    }\n    public class D\n    {\n    }\n}\n")
+        errors = [{"type": "missing_property", "code": "CS1061", "file": self.path, "line": 1, "column": 1,
+                   "message": f"'{name}' does not contain a definition for 'AvailableClients'"}
+                  for name in ("A", "B", "C", "D")]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.write(original)
+            legacy_count = LegacyFixer(self.temp_dir.name).fix_errors([dict(e) for e in errors])
+            expected = self.read()
+
+            self.write(original)
+            monitor = GitHubActionsMonitor("fake_token", "owner/repo", repo_path=self.temp_dir.name,
+                                           class_index_path=os.path.join(self.temp_dir.name, "index.json"))
+            count = monitor.fix_errors([dict(e) for e in errors])
+
+        self.assertEqual(count, legacy_count)
+        self.assertEqual(count, 1)
+        self.assertEqual(self.read(), expected)
+        self.assertNotIn("using", expected)
+
+    def test_usings_and_properties_use_original_offsets(self):
+        """Using directives added for one fix don't shift where later properties go"""
+        self.write("using System;\nnamespace Test {\n    public class A\n    {\n    }\n}\n")
+        planner = FixPlanner(self.temp_dir.name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name in ("Title", "AvailableClients"):
+                self.assertTrue(planner.plan_missing_property({
+                    "type": "missing_property", "file": self.path,
+                    "message": f"'A' does not contain a definition for '{name}'"}))
+        self.assertEqual(planner.apply(), [self.path])
+
+        content = self.read()
+        self.assertTrue(content.startswith(
+            "using System;\nusing System.Collections.Generic;\nusing System.ComponentModel.DataAnnotations;\n"))
+        self.assertIn("public string Title { get; set; }", content)
+        self.assertIn("public IEnumerable<Client> AvailableClients { get; set; }", content)
+        self.assertLess(content.index("Title"), content.index("AvailableClients"))
+        self.assertTrue(content.rstrip().endswith("}\n}"))
+
+    def test_apply_skips_untouched_files(self):
+        """Files whose fixes all failed are not rewritten"""
+        self.write("using System;\npublic class A { }\n")
+        planner = FixPlanner(self.temp_dir.name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertFalse(planner.plan_missing_property({
+                "type": "missing_property", "file": self.path,
+                "message": "'B' does not contain a definition for 'Title'"}))
+        self.assertEqual(planner.apply(), [])
+
+    def test_missing_namespaces_get_using_directives(self):
+        """CS0246 errors add one using directive per type, resolving repo types through the class index"""
+        self.write("namespace Test.ViewModels;\n\npublic class A\n{\n    [Display(Name = \"X\")]\n"
+                   "    public List<InvoiceService> Services { get; set; }\n}\n")
+        with open(os.path.join(self.temp_dir.name, "Services.cs"), "w") as f:
+            f.write("namespace Test.Services\n{\n    public class InvoiceService\n    {\n    }\n}\n")
+        message = "The type or namespace name '{}' could not be found (are you missing a using directive?)"
+        errors = [{"type": "missing_namespace", "code": "CS0246", "file": self.path, "line": 5,
+                   "message": message.format(name)}
+                  for name in ("Display", "DisplayAttribute", "List<>", "InvoiceService", "Unknown")]
+        # Classified differently by the patterns, but still handled by code
+        errors[-2]["type"] = "unknown"
+
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo", repo_path=self.temp_dir.name,
+                                       class_index_path=os.path.join(self.temp_dir.name, "index.json"))
+        with contextlib.redirect_stdout(io.StringIO()) as output, \
+                patch.object(monitor.class_index, "refresh", wraps=monitor.class_index.refresh) as refresh:
+            self.assertEqual(monitor.fix_errors(errors), 4)
+        self.assertEqual(refresh.call_count, 1)
+        self.assertIn("Could not find the namespace of Unknown", output.getvalue())
+        self.assertTrue(self.read().startswith(
+            "using System.ComponentModel.DataAnnotations;\nusing System.Collections.Generic;\n"
+            "using Test.Services;\nnamespace Test.ViewModels;\n"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the error and fix history
+"""
+
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import history_store
+from bench_monitor import make_missing_property_errors, make_view_model
+from github_actions_monitor import GitHubActionsMonitor
+from history_store import (HistoryStore, RESULT_APPLIED, RESULT_FAILED, RESULT_SKIPPED, RESULT_UNSUPPORTED,
+                           main)
+from run_state import OUTCOME_FIXED, OUTCOME_NO_FIXES
+
+
+def make_error(code, message="error", error_type="unknown"):
+    return {"code": code, "type": error_type, "message": message, "file": "A.cs", "line": 1,
+            "fingerprint": f"{code}:{message}"}
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "history.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fill(self, store):
+        with patch.object(history_store, "utc_timestamp", return_value="2025-05-01T00:00:00Z"):
+            store.record("owner/repo", 1, [(make_error("CS1061", str(i)), "missing_property", RESULT_APPLIED)
+                                           for i in range(3)], "abc123")
+            store.record("owner/repo", 1, [(make_error("CS0246"), "missing_namespace", RESULT_FAILED),
+                                           (make_error("CS0103"), None, RESULT_UNSUPPORTED)])
+        with patch.object(history_store, "utc_timestamp", return_value="2025-06-01T00:00:00Z"):
+            store.record("owner/repo", 2, [(make_error("CS0246", str(i)), "missing_namespace", RESULT_APPLIED)
+                                           for i in range(3)], "def456")
+            store.record("owner/other", 3, [(make_error("CS1061"), "missing_property", RESULT_SKIPPED)])
+
+    def test_batched_writes_and_aggregates(self):
+        """Rows are written a batch at a time, and aggregates use the indexes"""
+        store = HistoryStore(self.db_path, batch_size=4)
+        self.fill(store)
+        # Written in batches of 5 and 4 rows
+        self.assertEqual(store.conn.execute("SELECT COUNT(*) FROM error_history").fetchone()[0], 9)
+        store.record("owner/repo", 4, [(make_error("CS0103"), None, RESULT_UNSUPPORTED)])
+        self.assertEqual(store.conn.execute("SELECT COUNT(*) FROM error_history").fetchone()[0], 9)
+
+        self.assertEqual([(row["code"], row["errors"], row["runs"]) for row in store.top_codes()],
+                         [("CS0246", 4, 2), ("CS1061", 4, 2), ("CS0103", 2, 2)])
+        self.assertEqual([(row["code"], row["errors"]) for row in store.top_codes(since="2025-05-15", limit=1)],
+                         [("CS0246", 3)])
+        self.assertEqual([row["code"] for row in store.top_codes(repo="owner/other")], ["CS1061"])
+
+        fixers = {row["fixer"]: row for row in store.fixer_results()}
+        self.assertEqual(sorted(fixers), ["missing_namespace", "missing_property"])
+        self.assertEqual((fixers["missing_namespace"]["attempts"], fixers["missing_namespace"]["applied"],
+                          fixers["missing_namespace"]["committed"], fixers["missing_namespace"]["success_rate"]),
+                         (4, 3, 3, 0.75))
+        self.assertEqual(fixers["missing_property"]["success_rate"], 1.0)
+
+        errors = store.errors(code="CS0246")
+        self.assertEqual([(row["run_id"], row["result"], row["commit_sha"]) for row in errors][-1],
+                         (1, RESULT_FAILED, None))
+        self.assertEqual(errors[0]["commit_sha"], "def456")
+
+        queries = []
+        run_query = store._query
+        with patch.object(store, "_query", side_effect=lambda *args: queries.append(args) or run_query(*args)):
+            for since, repo in ((None, None), ("2025-05-15", None), ("2025-05-15", "owner/repo")):
+                store.top_codes(since, repo)
+                store.fixer_results(since, repo)
+                store.errors(since, repo, "CS0246")
+                store.top_codes(since, repo, code="CS0246")
+                store.fixer_results(since, repo, "CS0246")
+        for sql, where, params, suffix in queries:
+            sql += (" WHERE " + " AND ".join(where) if where else "") + suffix
+            plan = [row[3] for row in store.conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            self.assertTrue(all("INDEX" in step for step in plan if "error_history" in step), (sql, plan))
+        store.close()
+
+    def test_cli_exports_csv_and_json(self):
+        """The history command exports query results as CSV and JSON"""
+        store = HistoryStore(self.db_path)
+        self.fill(store)
+        store.close()
+
+        csv_path = os.path.join(self.temp_dir.name, "codes.csv")
+        main(["codes", "--db", self.db_path, "--since", "2025-05-15", "--format", "csv", "--output", csv_path])
+        with open(csv_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([(row["code"], row["errors"]) for row in rows], [("CS0246", "3"), ("CS1061", "1")])
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            main(["errors", "--db", self.db_path, "--repo", "owner/repo", "--code", "CS1061", "--format", "json"])
+        rows = json.loads(output.getvalue())
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["fixer"], "missing_property")
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            main(["fixers", "--db", self.db_path, "--days", "36500"])
+        self.assertTrue(output.getvalue().startswith("fixer "))
+        self.assertIn("missing_namespace", output.getvalue())
+
+        # --code narrows the aggregate queries too
+        for query, column, expected in (("codes", "code", "CS1061"), ("fixers", "fixer", "missing_property")):
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                main([query, "--db", self.db_path, "--code", "CS1061", "--format", "json"])
+            self.assertEqual([row[column] for row in json.loads(output.getvalue())], [expected])
+
+    def test_monitor_records_fix_results_and_commits(self):
+        """Every error a run fixes, fails to fix or already handled is recorded with the commit"""
+        path = os.path.join(self.temp_dir.name, "ViewModels.cs")
+        with open(path, "w") as f:
+            f.write(make_view_model(2))
+        errors = make_missing_property_errors(path, 2, 2) + [make_error("CS0103")]
+        for error in errors:
+            error.pop("fingerprint", None)
+
+        store = HistoryStore()
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo", repo_path=self.temp_dir.name, history=store)
+
+        def commit(fixes_count):
+            monitor.last_commit = "abc123"
+            return True
+
+        with patch.object(monitor, "_commit_and_push", side_effect=commit), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(monitor.fix_run_errors({"id": 1}, [dict(e) for e in errors]), OUTCOME_FIXED)
+            self.assertEqual(monitor.fix_run_errors({"id": 2}, [dict(e) for e in errors]), OUTCOME_NO_FIXES)
+
+        rows = sorted((row["run_id"], row["code"], row["fixer"], row["result"], row["commit_sha"])
+                      for row in store.errors())
+        self.assertEqual(rows, [
+            (1, "CS0103", None, RESULT_UNSUPPORTED, None),
+            (1, "CS1061", "missing_property", RESULT_APPLIED, "abc123"),
+            (1, "CS1061", "missing_property", RESULT_APPLIED, "abc123"),
+            (2, "CS0103", None, RESULT_UNSUPPORTED, None),
+            (2, "CS1061", None, RESULT_SKIPPED, None),
+            (2, "CS1061", None, RESULT_SKIPPED, None),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the compressed workflow log cache
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from github_actions_monitor import GitHubActionsMonitor
+from log_cache import LogCache
+
+LOG_LINES = ["restore ok\r\n", "/src/A.cs(1,2): error CS1002: ; expected\n", "\n\n"]
+
+
+def make_archive(corrupt: bool = False) -> bytes:
+    """
+    Build a run log archive, optionally with an unreadable second member.
+    """
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("build/1_Restore.txt", "restore ok\n")
+        zf.writestr("build/2_Build.txt", "/src/A.cs(1,2): error CS1002: ; expected\n")
+    data = archive.getvalue()
+    if corrupt:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            offset = zf.getinfo("build/2_Build.txt").header_offset
+        data = data[:offset] + b"XXXX" + data[offset + 4:]
+    return data
+
+
+class TestLogCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = LogCache(self.temp_dir.name)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def store(self, key, lines):
+        return list(self.cache.store_lines(key, iter(lines)))
+
+    def test_round_trip_and_counters(self):
+        """Stored logs come back unchanged and lookups are counted"""
+        self.assertIsNone(self.cache.iter_lines("run/o/r/1"))
+        self.assertEqual(self.store("run/o/r/1", LOG_LINES), LOG_LINES)
+        self.assertEqual("".join(self.cache.iter_lines("run/o/r/1")), "".join(LOG_LINES))
+
+        self.assertIsNone(self.cache.get_errors("run/o/r/1", "v1"))
+        self.cache.put_errors("run/o/r/1", "v1", [{"code": "CS1002"}])
+        self.assertEqual(self.cache.get_errors("run/o/r/1", "v1"), [{"code": "CS1002"}])
+        self.assertIsNone(self.cache.get_errors("run/o/r/1", "v2"))
+
+        self.assertEqual(self.cache.reset_stats(),
+                         {"hits": 1, "misses": 1, "error_hits": 1, "error_misses": 2, "evictions": 0})
+
+    def test_interrupted_or_empty_downloads_are_not_cached(self):
+        """Only fully read, non-empty logs are added"""
+        lines = self.cache.store_lines("run/o/r/1", iter(LOG_LINES))
+        next(lines)
+        lines.close()
+        self.store("run/o/r/2", [])
+        self.assertIsNone(self.cache.iter_lines("run/o/r/1"))
+        self.assertIsNone(self.cache.iter_lines("run/o/r/2"))
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir.name, "blobs")), [])
+
+    def test_eviction_by_age_and_size(self):
+        """Stale entries go first, then the least recently used ones"""
+        self.store("run/o/r/1", ["same log\n"])
+        self.store("run/o/r/2", ["same log\n"])
+        self.cache.put_errors("run/o/r/1", "v1", [])
+
+        # Identical logs share a blob, which stays until its last key goes
+        time.sleep(0.01)
+        with patch("log_cache.time.time", return_value=time.time()):
+            self.cache.iter_lines("run/o/r/2")
+            self.cache.max_age = 0.005
+            self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNotNone(self.cache.iter_lines("run/o/r/2"))
+        self.assertIsNone(self.cache.get_errors("run/o/r/1", "v1"))
+
+        self.cache.max_age = 3600
+        self.store("run/o/r/3", ["log 3\n" * 50])
+        self.cache.max_bytes = sum(row[0] for row in self.cache.conn.execute("SELECT size FROM logs"))
+        # Run 3 is now the least recently used, so it makes room for run 4
+        self.cache.iter_lines("run/o/r/2")
+        self.store("run/o/r/4", ["log 4\n" * 50])
+        self.assertIsNone(self.cache.iter_lines("run/o/r/3"))
+        self.assertIsNotNone(self.cache.iter_lines("run/o/r/2"))
+        self.assertIsNotNone(self.cache.iter_lines("run/o/r/4"))
+
+    def test_error_lists_age_out_without_logs(self):
+        """Storing errors evicts stale ones, even when their logs were never cached"""
+        with patch("log_cache.time.time", return_value=time.time() - 7200):
+            self.cache.put_errors("run/o/r/1", "v1", [{"code": "CS1002"}])
+        self.cache.max_age = 3600
+        self.cache.put_errors("run/o/r/2", "v1", [{"code": "CS1002"}])
+        self.assertIsNone(self.cache.get_errors("run/o/r/1", "v1"))
+        self.assertIsNotNone(self.cache.get_errors("run/o/r/2", "v1"))
+
+    def test_archive_scans_go_through_the_cache(self):
+        """Byte-scanned archives are cached like streamed ones, and unreadable ones not at all"""
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo", byte_scan=True, log_cache=self.cache)
+        archives = {7: make_archive(), 8: make_archive(corrupt=True)}
+
+        def download(path, target):
+            target.write(archives[int(path.split("/")[-2])])
+            target.seek(0)
+            return True
+
+        with patch.object(monitor.client, "download", side_effect=download) as client_download, \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            first = monitor.extract_run_errors(7)
+            self.assertEqual(monitor.get_workflow_logs(7), "restore ok\n\n\n" + LOG_LINES[1] + "\n\n")
+            monitor.classifier.load({r"error CS1002": {"type": "syntax", "description": "Syntax error"}})
+            self.assertEqual(monitor.extract_run_errors(7)[0]["type"], "syntax")
+            self.assertEqual(client_download.call_count, 1)
+
+            for byte_scan in (True, False):
+                monitor.byte_scan = byte_scan
+                self.assertEqual(monitor.extract_run_errors(8), [])
+        self.assertEqual(first[0]["code"], "CS1002")
+        self.assertIn("Exception while reading logs for run 8", output.getvalue())
+        self.assertIsNone(self.cache.iter_lines("run/owner/repo/8"))
+        self.assertEqual(self.cache.conn.execute("SELECT COUNT(*) FROM errors WHERE key LIKE '%/8'").fetchone(), (0,))
+
+    def test_monitor_reuses_cached_logs_and_errors(self):
+        """A replayed run is neither downloaded nor parsed again"""
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo", log_cache=self.cache)
+        with patch.object(monitor, "_download_workflow_log_lines", side_effect=lambda run_id: iter(LOG_LINES)) as download:
+            first = monitor.extract_run_errors(7)
+            self.assertEqual(monitor.get_workflow_logs(7), "".join(LOG_LINES))
+            self.assertEqual(monitor.extract_run_errors(7), first)
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(first[0]["code"], "CS1002")
+
+        # Changing the patterns invalidates the parsed errors but not the log
+        monitor.classifier.load({r"error CS1002": {"type": "syntax", "description": "Syntax error"}})
+        with patch.object(monitor, "_download_workflow_log_lines") as download:
+            self.assertEqual(monitor.extract_run_errors(7)[0]["type"], "syntax")
+        download.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
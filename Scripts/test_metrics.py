@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the monitor's stage metrics
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_github import FakeGitHub
+from github_actions_monitor import GitHubActionsMonitor
+from metrics import Metrics, MetricsServer
+from synthetic_logs import write_log_archive, write_repo
+
+
+class TestMetrics(unittest.TestCase):
+    def test_nested_stages_record_exclusive_time(self):
+        """Time spent in a nested stage is not counted again in the outer one"""
+        metrics = Metrics()
+        with metrics.stage("extract", repo="o/r"):
+            with metrics.stage("download", repo="o/r"):
+                time.sleep(0.05)
+            metrics.record_stage("classify", 0.02, repo="o/r")
+
+        totals = metrics.stage_totals(repo="o/r")
+        self.assertGreaterEqual(totals["download"], 0.05)
+        self.assertEqual(totals["classify"], 0.02)
+        self.assertLess(totals["extract"], 0.02)
+
+    def test_prometheus_text_and_endpoint(self):
+        """Counters and histograms are served in the Prometheus text format"""
+        metrics = Metrics()
+        metrics.inc("monitor_fixes_total", help="Fix attempts", type="missing_property", result="applied")
+        metrics.observe("monitor_stage_seconds", 0.003, stage="fix")
+        server = MetricsServer(metrics, port=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            server.start()
+        try:
+            text = requests.get(server.url).text
+        finally:
+            server.stop()
+
+        self.assertIn("# HELP monitor_fixes_total Fix attempts", text)
+        self.assertIn('monitor_fixes_total{result="applied",type="missing_property"} 1', text)
+        self.assertIn('monitor_stage_seconds_bucket{stage="fix",le="0.001"} 0', text)
+        self.assertIn('monitor_stage_seconds_bucket{stage="fix",le="0.005"} 1', text)
+        self.assertIn('monitor_stage_seconds_bucket{stage="fix",le="+Inf"} 1', text)
+        self.assertIn('monitor_stage_seconds_count{stage="fix"} 1', text)
+
+    def test_monitor_records_every_stage(self):
+        """A processed run is timed per stage and logged as JSON lines"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_repo(temp_dir, files=2, classes=3)
+            archive = os.path.join(temp_dir, "logs.zip")
+            write_log_archive(archive, 32 * 1024, 200, members=2, files=2, classes=3)
+            fake = FakeGitHub().start()
+            try:
+                fake.add_run("o/r", 1, archive)
+                metrics = Metrics(json_logs=True)
+                monitor = GitHubActionsMonitor("fake-token", "o/r", repo_path=temp_dir, api_url=fake.url,
+                                               metrics=metrics, class_index_path=os.path.join(temp_dir, "i.json"))
+                monitor._commit_and_push = lambda fixes_count: True
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    monitor.state.record_run("o/r", fake.runs["o/r"][1])
+                    monitor.discover_runs()
+                    monitor.handle_run(fake.runs["o/r"][1])
+                    monitor.report_cycle_stats()
+            finally:
+                fake.stop()
+
+        self.assertEqual(set(metrics.stage_totals(repo="o/r")), {"poll", "download", "extract", "classify", "fix", "commit"})
+        self.assertGreater(metrics.counters["monitor_download_bytes_total"][(("repo", "o/r"),)], 0)
+        self.assertEqual(metrics.counters["monitor_runs_total"][(("outcome", "fixed"), ("repo", "o/r"))], 1)
+        self.assertIn((("repo", "o/r"), ("type", "missing_property")), metrics.counters["monitor_build_errors_total"])
+
+        events = [json.loads(line) for line in output.getvalue().splitlines() if line.startswith("{")]
+        self.assertEqual([event["event"] for event in events], ["run", "cycle"])
+        self.assertEqual(events[0]["outcome"], "fixed")
+        self.assertIn("fix", events[1]["stage_seconds_total"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,15 +6,20 @@ This script tests the error detection and auto-fix capabilities of the
 GitHub Actions Monitor without requiring actual GitHub API calls.
 """
 
+import io
 import os
+import subprocess
 import sys
 import tempfile
 import unittest
+import zipfile
+from contextlib import redirect_stdout
 from unittest.mock import patch, MagicMock
 
 # Add the Scripts directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from Scripts.github_actions_monitor import GitHubActionsMonitor, ERROR_PATTERNS
+from Scripts.github_actions_monitor import GitHubActionsMonitor, ERROR_PATTERNS, iter_step_lines
+from Scripts.run_state import OUTCOME_COMMIT_FAILED, OUTCOME_NO_FIXES
 
 class TestGitHubActionsMonitor(unittest.TestCase):
     def setUp(self):
@@ -79,5 +84,217 @@ namespace Test {
             # Clean up
             os.unlink(temp_path)
 
+    def test_iter_workflow_log_lines_streams_zip_members(self):
+        """Test that run logs are read from the archive without touching /tmp"""
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("build/1_Restore.txt", "restore ok\r\n")
+            zf.writestr("build/2_Build.txt",
+                        "/src/Models/Account.cs(3,5): error CS0117: 'Account' does not contain a definition for 'Balance'\n")
+        
+        redirect = MagicMock(status_code=302, headers={"Location": "https://blob.example/logs.zip"})
+        download = MagicMock(status_code=200)
+        download.__enter__.return_value = download
+        download.iter_content.return_value = [archive.getvalue()]
+        
+        with patch.object(self.monitor.client.session, "get", side_effect=[redirect, download]) as get:
+            lines = list(self.monitor.iter_workflow_log_lines(42))
+        
+        # The pre-signed download URL must not receive the token
+        self.assertEqual(get.call_args_list[1].kwargs["headers"], {"Authorization": None})
+        self.assertEqual(lines, ["restore ok\n", "\n\n",
+                                 "/src/Models/Account.cs(3,5): error CS0117: 'Account' does not contain a definition for 'Balance'\n", "\n\n"])
+        
+        errors = self.monitor.extract_build_errors(iter(lines))
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]["file"], "/src/Models/Account.cs")
+        self.assertEqual(errors[0]["line"], 3)
+
+    def test_iter_step_lines_keeps_failed_step_section(self):
+        """Test slicing a job log down to the failed step's time window"""
+        lines = [
+            "2025-05-29T00:00:01.1000000Z ##[group]Run dotnet restore\n",
+            "2025-05-29T00:00:02.5000000Z   Restored AccountingModule.csproj\n",
+            "2025-05-29T00:00:03.2000000Z ##[group]Run dotnet build\n",
+            "2025-05-29T00:00:04.0000000Z Program.cs(1,1): error CS1002: ; expected\n",
+            "    continuation without timestamp\n",
+            "2025-05-29T00:00:06.0000000Z ##[group]Run actions/upload-artifact@v4\n",
+        ]
+        steps = [{"name": "Build", "started_at": "2025-05-29T00:00:03Z", "completed_at": "2025-05-29T00:00:04Z"}]
+        
+        self.assertEqual(list(iter_step_lines(lines, steps)), lines[2:5])
+        self.assertEqual(list(iter_step_lines(lines, [{"name": "Build"}])), lines)
+    
+    def test_failed_jobs_only_downloads_failed_job_logs(self):
+        """Test that failed-jobs-only mode skips the run archive"""
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo", failed_jobs_only=True)
+        jobs = [{"id": 7, "name": "build", "conclusion": "failure", "steps": [
+            {"name": "Restore dependencies", "conclusion": "success"},
+            {"name": "Build", "conclusion": "failure", "started_at": "2025-05-29T00:00:03Z",
+             "completed_at": "2025-05-29T00:00:04Z"},
+        ]}]
+        jobs[0]["failed_steps"] = [jobs[0]["steps"][1]]
+        
+        with patch.object(monitor, "get_failed_jobs", return_value=jobs), \
+             patch.object(monitor, "iter_job_log_lines", return_value=iter(["line\n"])) as job_log, \
+             patch.object(monitor, "iter_workflow_log_lines") as run_log:
+            self.assertEqual(list(monitor.iter_run_log_lines(1)), ["line\n", "\n\n"])
+        
+        job_log.assert_called_once_with(7, [jobs[0]["steps"][1]])
+        run_log.assert_not_called()
+
+    def test_get_workflow_runs_revalidates_with_etag(self):
+        """Test that unchanged run lists are served from the ETag cache"""
+        runs = {"workflow_runs": [{"id": 1, "status": "completed", "conclusion": "success"}]}
+        first = MagicMock(status_code=200, headers={"ETag": '"abc"', "X-RateLimit-Remaining": "4999",
+                                                    "X-RateLimit-Reset": "0"}, content=b"{}")
+        first.json.return_value = runs
+        second = MagicMock(status_code=304, headers={}, content=b"")
+        
+        with patch.object(self.monitor.client.session, "get", side_effect=[first, second]) as get:
+            self.assertEqual(self.monitor.get_workflow_runs(), runs["workflow_runs"])
+            self.assertEqual(self.monitor.get_workflow_runs(), runs["workflow_runs"])
+        
+        self.assertEqual(get.call_args_list[1].kwargs["headers"], {"If-None-Match": '"abc"'})
+        self.assertEqual(self.monitor.client.rate_limit_remaining, 4999)
+        self.assertEqual(self.monitor.report_cycle_stats(), {"requests": 2, "not_modified": 1, "bytes": 2})
+    
+    def test_client_waits_for_reset_when_rate_limit_is_low(self):
+        """Test that the client pauses before exhausting the rate limit"""
+        client = self.monitor.client
+        client.rate_limit_remaining = 3
+        client.rate_limit_reset = 1000
+        response = MagicMock(status_code=200, headers={}, content=b"")
+        
+        with patch.object(client.session, "get", return_value=response), \
+             patch("github_api.time.time", return_value=990), \
+             patch("github_api.time.sleep") as sleep:
+            client.get("/rate_limit")
+        
+        sleep.assert_called_once_with(11)
+    
+    def test_heartbeat_touched_while_throttled(self):
+        """Test that a long rate limit wait keeps touching the heartbeat"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            heartbeat = os.path.join(temp_dir, "monitor.heartbeat")
+            monitor = GitHubActionsMonitor("fake_token", "owner/repo", heartbeat_path=heartbeat)
+            client = monitor.client
+            client.rate_limit_remaining = 3
+            client.rate_limit_reset = 1149
+            response = MagicMock(status_code=200, headers={}, content=b"")
+            touched = []
+            
+            with patch.object(client.session, "get", return_value=response), \
+                 patch("github_api.time.time", return_value=1000), \
+                 patch("github_api.time.sleep", side_effect=lambda s: touched.append(os.path.getmtime(heartbeat))) \
+                    as sleep, redirect_stdout(io.StringIO()):
+                client.get("/rate_limit")
+            
+            self.assertEqual([call.args[0] for call in sleep.call_args_list], [60, 60, 30])
+            self.assertEqual(len(touched), 3)
+
+class TestCommitAndPush(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.remote = os.path.join(self.temp_dir.name, "remote.git")
+        self.work = os.path.join(self.temp_dir.name, "work")
+        self.git("init", "-q", "--bare", self.remote, cwd=self.temp_dir.name)
+        self.git("clone", "-q", self.remote, self.work, cwd=self.temp_dir.name)
+        self.git("config", "user.email", "monitor@example.com")
+        self.git("config", "user.name", "Monitor")
+        self.source = os.path.join(self.work, "TestViewModel.cs")
+        with open(self.source, "w") as f:
+            f.write("namespace Test {\n    public class TestViewModel\n    {\n    }\n}\n")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "Initial")
+        self.git("push", "-q", "origin", "HEAD")
+        # Unrelated work in the checkout must not be committed with the fixes
+        with open(os.path.join(self.work, "notes.txt"), "w") as f:
+            f.write("local notes\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def git(self, *args, cwd=None):
+        return subprocess.run(["git"] + list(args), cwd=cwd or self.work, check=True,
+                              capture_output=True, text=True).stdout
+
+    def new_monitor(self, push_window=0):
+        return GitHubActionsMonitor("fake_token", "owner/repo", repo_path=self.work, push_window=push_window,
+                                    class_index_path=os.path.join(self.temp_dir.name, "index.json"))
+
+    def fix(self, monitor, property_name):
+        error = {"type": "missing_property", "file": self.source, "line": 3, "column": 1,
+                 "message": f"'TestViewModel' does not contain a definition for '{property_name}'"}
+        return monitor.commit_and_push_fixes(monitor.fix_errors([error]))
+
+    def remote_log(self):
+        return self.git("log", "--format=%s", "HEAD", cwd=self.remote).splitlines()
+
+    def test_stages_only_fixed_files(self):
+        """Only the files written by fixes are committed and pushed"""
+        monitor = self.new_monitor()
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(self.fix(monitor, "Description"))
+        self.assertEqual(self.remote_log()[0], "Auto-fix: Applied 1 fixes for build errors")
+        self.assertEqual(self.git("show", "--name-only", "--format=", "HEAD").split(), ["TestViewModel.cs"])
+        self.assertIn("?? notes.txt", self.git("status", "--porcelain"))
+
+    def test_unchanged_content_skips_commit(self):
+        """Files whose content was already committed don't make another commit"""
+        monitor = self.new_monitor()
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(self.fix(monitor, "Description"))
+            monitor._changed_paths.add(self.source)
+            with patch("subprocess.run", wraps=subprocess.run) as run:
+                self.assertTrue(monitor.commit_and_push_fixes(1))
+        run.assert_not_called()
+        self.assertEqual(len(self.remote_log()), 2)
+
+    def test_commits_within_window_share_one_push(self):
+        """Commits made within the push window go out in a single push"""
+        monitor = self.new_monitor(push_window=60)
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(self.fix(monitor, "Description"))
+            self.assertTrue(self.fix(monitor, "Amount"))
+            self.assertEqual(len(self.remote_log()), 1)
+            monitor.flush_push()
+        self.assertEqual(len(self.remote_log()), 3)
+        self.assertEqual(monitor.metrics.counters["monitor_pushes_total"], {(("repo", "owner/repo"), ("result", "pushed")): 1})
+    
+    def test_failed_commit_or_push_is_retried_before_errors_count_as_fixed(self):
+        """Errors whose fix didn't go out aren't skipped as fixed; the fix goes out with the next run"""
+        monitor = self.new_monitor()
+        hook = os.path.join(self.work, ".git", "hooks", "pre-commit")
+        
+        def run_errors(run_id, property_name):
+            error = {"type": "missing_property", "code": "CS1061", "file": self.source, "line": 3, "column": 1,
+                     "message": f"'TestViewModel' does not contain a definition for '{property_name}'"}
+            return monitor.fix_run_errors({"id": run_id}, [error])
+        
+        with redirect_stdout(io.StringIO()) as output:
+            self.git("remote", "set-url", "origin", os.path.join(self.temp_dir.name, "missing.git"))
+            self.assertEqual(run_errors(1, "Description"), OUTCOME_COMMIT_FAILED)
+            self.assertEqual(run_errors(2, "Description"), OUTCOME_NO_FIXES)
+            self.assertEqual(len(self.remote_log()), 1)
+            self.git("remote", "set-url", "origin", self.remote)
+            self.assertEqual(run_errors(3, "Description"), OUTCOME_NO_FIXES)
+            self.assertEqual(len(self.remote_log()), 2)
+            
+            with open(hook, "w") as f:
+                f.write("#!/bin/sh\nexit 1\n")
+            os.chmod(hook, 0o755)
+            self.assertEqual(run_errors(4, "Amount"), OUTCOME_COMMIT_FAILED)
+            os.unlink(hook)
+            self.assertEqual(run_errors(5, "Amount"), OUTCOME_NO_FIXES)
+        
+        self.assertIn("Retrying to push earlier fixes", output.getvalue())
+        self.assertIn("Retrying to commit and push earlier fixes", output.getvalue())
+        self.assertEqual(self.remote_log()[:2], ["Auto-fix: Applied 1 fixes for build errors"] * 2)
+        self.assertEqual(self.git("status", "--porcelain").split(), ["??", "notes.txt"])
+        with open(self.source) as f:
+            source = f.read()
+        self.assertEqual((source.count(" Description "), source.count(" Amount ")), (1, 1))
+
 if __name__ == '__main__':
     unittest.main()
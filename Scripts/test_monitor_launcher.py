@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the monitor supervisor
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import monitor_launcher
+from monitor_launcher import MonitorSupervisor, read_pid
+
+# Stand-ins for the monitor; the supervisor appends "--heartbeat-file <path>"
+CRASHING = "import sys; print('boom', flush=True); sys.exit(3)"
+HANGING = "import time; time.sleep(60)"
+GRACEFUL = """
+import signal, sys, time
+signal.signal(signal.SIGTERM, lambda signum, frame: (print('graceful exit', flush=True), sys.exit(0)))
+while True:
+    open(sys.argv[2], 'a').close()
+    for _ in range(5):
+        print('x' * 200, flush=True)
+    time.sleep(0.05)
+"""
+
+
+class TestMonitorSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.temp_dir.name, "monitor.log")
+        self.pidfile = os.path.join(self.temp_dir.name, "monitor.pid")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def supervise(self, script, seconds, **kwargs):
+        supervisor = MonitorSupervisor([sys.executable, "-c", script], pidfile=self.pidfile, log_file=self.log_file,
+                                       heartbeat_file=os.path.join(self.temp_dir.name, "heartbeat"),
+                                       min_backoff=0.05, stop_timeout=5, check_interval=0.02, **kwargs)
+        thread = threading.Thread(target=supervisor.run)
+        thread.start()
+        time.sleep(seconds)
+        self.assertEqual(read_pid(self.pidfile), os.getpid())
+        second = MonitorSupervisor(["true"], pidfile=self.pidfile, log_file=self.log_file,
+                                   heartbeat_file=os.path.join(self.temp_dir.name, "second.heartbeat"))
+        with self.assertRaises(RuntimeError):
+            second.run()
+        # The refused supervisor closes its log rather than leaking the file
+        self.assertIsNone(second._handler.stream)
+        supervisor.stop()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.pidfile))
+        with open(self.log_file) as f:
+            return supervisor, f.read()
+
+    def test_restarts_crashed_monitor_with_backoff(self):
+        """A monitor that exits is restarted after a growing delay"""
+        supervisor, log = self.supervise(CRASHING, 1.0, max_backoff=0.4)
+        self.assertIn("boom", log)
+        self.assertIn("Monitor exited with code 3", log)
+        self.assertIn("Restarting the monitor in 0s (restart 1)", log)
+        # Delays of 0.05, 0.1, 0.2 and 0.4s leave room for only a few restarts
+        self.assertTrue(2 <= supervisor.restarts <= 6, supervisor.restarts)
+
+    def test_restarts_monitor_without_heartbeat(self):
+        """A monitor that stops touching its heartbeat file is terminated and restarted"""
+        supervisor, log = self.supervise(HANGING, 0.8, health_timeout=0.3)
+        self.assertIn("No heartbeat for 0s, restarting the monitor", log)
+        self.assertGreaterEqual(supervisor.restarts, 1)
+
+    def test_stops_monitor_gracefully_and_rotates_log(self):
+        """Stopping sends SIGTERM to a healthy monitor, and the log is rotated by size"""
+        supervisor, log = self.supervise(GRACEFUL, 0.8, health_timeout=5, log_max_bytes=4096, log_backups=2)
+        self.assertEqual(supervisor.restarts, 0)
+        self.assertIn("graceful exit", log)
+        self.assertTrue(log.rstrip().endswith("Supervisor stopped"))
+        self.assertTrue(os.path.exists(self.log_file + ".1"))
+        self.assertFalse(os.path.exists(self.log_file + ".3"))
+
+
+class TestLauncherArguments(unittest.TestCase):
+    def test_monitor_options_passed_on(self):
+        """Options the launcher doesn't know are handed to the monitor it launches"""
+        argv = ["monitor_launcher.py", "--token", "t", "--repo", "owner/repo", "--webhook", "--webhook-port", "9000",
+                "--error-source", "annotations", "--profile-every", "10"]
+        with patch.object(sys, "argv", argv), patch.object(monitor_launcher, "setup_monitor") as setup:
+            monitor_launcher.main()
+        extra_args = setup.call_args.args[5]
+        self.assertEqual(extra_args, ["--webhook", "--webhook-port", "9000", "--error-source", "annotations",
+                                      "--profile-every", "10"])
+        command = monitor_launcher.monitor_command("t", ["owner/repo"], 60, extra_args=extra_args)
+        self.assertEqual(command[-7:], extra_args)
+        self.assertIn("--interval", command)
+
+
+    def test_background_launch_keeps_health_timeout(self):
+        """The supervisor started in the background gets the launcher's --health-timeout"""
+        with patch.object(monitor_launcher, "read_pid", return_value=None), \
+                patch.object(monitor_launcher.subprocess, "Popen") as popen, \
+                contextlib.redirect_stdout(io.StringIO()):
+            monitor_launcher.setup_monitor("t", "owner/repo", extra_args=["--webhook"], health_timeout=3600)
+        command = popen.call_args.args[0]
+        self.assertEqual(command[1], os.path.abspath(monitor_launcher.__file__))
+        self.assertEqual(command[-4:], ["--webhook", "--foreground", "--health-timeout", "3600"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for reloading the monitor's error patterns and fixer settings
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from github_actions_monitor import GitHubActionsMonitor
+from monitor_settings import SETTINGS_PATH
+
+MESSAGE = "'ClientListViewModel' does not contain a definition for 'Clients'"
+
+
+class TestMonitorSettings(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "settings.json")
+        shutil.copy(SETTINGS_PATH, self.path)
+        self.heartbeat = os.path.join(self.temp_dir.name, "heartbeat")
+        self.monitor = GitHubActionsMonitor("fake_token", "owner/repo", settings_path=self.path,
+                                            heartbeat_path=self.heartbeat)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def rewrite(self, change):
+        with open(self.path) as f:
+            settings = json.load(f)
+        change(settings)
+        with open(self.path, "w") as f:
+            json.dump(settings, f)
+        # Make the change visible even within the file system's timestamp resolution
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def start_cycle(self):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.monitor.start_cycle()
+        return output.getvalue()
+
+    def test_changed_settings_apply_at_next_cycle(self):
+        """New patterns and fixer switches take effect without a restart, compiling only new patterns"""
+        old = self.monitor.classifier
+        self.assertEqual(old.classify("CS1061", MESSAGE)[0], "missing_property")
+        self.assertEqual(self.start_cycle(), "")
+        self.assertTrue(os.path.exists(self.heartbeat))
+
+        def change(settings):
+            settings["error_patterns"].insert(0, {"pattern": "for 'Clients'", "type": "clients", "description": "Clients"})
+            settings["fixers"]["type_conversion"]["enabled"] = False
+        self.rewrite(change)
+
+        self.assertIn("8 error patterns (1 recompiled)", self.start_cycle())
+        self.assertEqual(self.monitor.classifier.classify("CS1061", MESSAGE)[0], "clients")
+        self.assertNotIn("type_conversion", self.monitor.fixers)
+        self.assertEqual(self.monitor.fixers["missing_member"], "missing_property")
+        # Threads still holding the old classifier are unaffected
+        self.assertEqual(old.classify("CS1061", MESSAGE)[0], "missing_property")
+
+    def test_invalid_settings_keep_previous_ones(self):
+        """A broken settings file is reported once and the previous settings stay in effect"""
+        def change(settings):
+            settings["error_patterns"][0]["pattern"] = "unbalanced ("
+        self.rewrite(change)
+
+        output = self.start_cycle()
+        self.assertIn("Ignoring invalid settings", output)
+        self.assertIn("unbalanced (", output)
+        self.assertEqual(self.start_cycle(), "")
+        self.assertEqual(self.monitor.classifier.classify("CS1061", MESSAGE)[0], "missing_property")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for monitoring several repositories from one event loop
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from github_actions_monitor import GitHubActionsMonitor
+from github_api import RequestBudget
+from multi_repo_monitor import MultiRepoMonitor, check_repo_paths, load_config
+from run_state import OUTCOME_FIXED
+
+
+class TestMultiRepoMonitor(unittest.TestCase):
+    def test_load_config_normalizes_entries(self):
+        """Repository entries may be plain names or objects"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"repos": [{"repo": "a/one", "path": "/src/one"}, {"repo": "b/two", "path": "/src/two",
+                                                                         "interval": 5}],
+                       "per_repo_concurrency": 3}, f)
+        try:
+            config = load_config(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(config["repos"], [{"repo": "a/one", "path": "/src/one"},
+                                           {"repo": "b/two", "path": "/src/two", "interval": 5}])
+        self.assertEqual(config["per_repo_concurrency"], 3)
+
+    def test_repositories_need_their_own_checkout(self):
+        """Several repositories can't be fixed and committed in one checkout"""
+        check_repo_paths([{"repo": "a/one"}])
+        with self.assertRaisesRegex(ValueError, "b/two needs a \"path\""):
+            check_repo_paths([{"repo": "a/one", "path": "/src/one"}, {"repo": "b/two"}])
+        with self.assertRaisesRegex(ValueError, "a/one and b/two share the checkout"):
+            MultiRepoMonitor("fake_token", [{"repo": "a/one", "path": "/src/one"},
+                                            {"repo": "b/two", "path": "/src/one/"}])
+
+    def test_repositories_are_processed_concurrently_within_limits(self):
+        """Runs of different repositories overlap; runs of one repository respect its limit"""
+        active = {}
+        peak = {}
+        lock = threading.Lock()
+
+        def discover(monitor):
+            runs = [{"id": monitor.repo.index("/") * 100 + i, "status": "completed", "conclusion": "failure"}
+                    for i in range(3)]
+            for run in runs:
+                monitor.state.record_run(monitor.repo, run)
+            return runs
+
+        def process(monitor, run):
+            with lock:
+                active[monitor.repo] = active.get(monitor.repo, 0) + 1
+                peak[monitor.repo] = max(peak.get(monitor.repo, 0), active[monitor.repo])
+                peak["total"] = max(peak.get("total", 0), sum(active.values()))
+            time.sleep(0.05)
+            with lock:
+                active[monitor.repo] -= 1
+            return OUTCOME_FIXED
+
+        engine = MultiRepoMonitor("fake_token", [{"repo": "a/one", "path": "/src/one"},
+                                                 {"repo": "bb/two", "path": "/src/two"}], per_repo_concurrency=2)
+        with patch.object(GitHubActionsMonitor, "discover_runs", autospec=True, side_effect=discover), \
+             patch.object(GitHubActionsMonitor, "process_run", autospec=True, side_effect=process), \
+             patch.object(GitHubActionsMonitor, "report_cycle_stats", autospec=True), \
+             patch.object(engine.state, "mark_processed") as mark_processed:
+            asyncio.run(engine.run(cycles=1))
+
+        self.assertEqual(peak["a/one"], 2)
+        self.assertEqual(peak["bb/two"], 2)
+        self.assertGreater(peak["total"], 2)
+        self.assertEqual(mark_processed.call_count, 6)
+        self.assertIs(engine.watches[0].monitor.client.budget, engine.watches[1].monitor.client.budget)
+
+    def test_request_budget_waits_when_exhausted(self):
+        """The shared budget blocks once its burst is spent"""
+        budget = RequestBudget(2)
+        with patch("github_api.time.sleep", side_effect=lambda seconds: setattr(budget, "tokens", 1)) as sleep:
+            budget.acquire()
+            budget.acquire()
+            sleep.assert_not_called()
+            budget.acquire()
+            sleep.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive polling scheduler
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from poll_scheduler import PollScheduler
+
+
+class TestPollScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = PollScheduler(50, active_interval=10, max_interval=300, max_retries=3,
+                                       retry_delay=5, jitter=0, rng=random.Random(0))
+
+    def test_fast_while_active_and_backs_off_when_idle(self):
+        """Active runs poll quickly; idle cycles double up to the ceiling"""
+        self.assertEqual(self.scheduler.next_delay(2), (10, "2 runs active"))
+        delays = [self.scheduler.next_delay(0)[0] for _ in range(5)]
+        self.assertEqual(delays, [50, 100, 200, 300, 300])
+        self.assertEqual(self.scheduler.next_delay(1)[0], 10)
+        self.assertEqual(self.scheduler.next_delay(0)[0], 50)
+
+    def test_long_idle_stays_at_the_ceiling(self):
+        """Days of idle cycles keep the ceiling rather than overflowing the backoff"""
+        for _ in range(5000):
+            delay, reason = self.scheduler.next_delay(0)
+        self.assertEqual((delay, reason), (300, "idle for 5000 cycles"))
+        self.assertEqual(PollScheduler(50, max_interval=300, backoff_factor=1.5, jitter=0,
+                                       rng=random.Random(0)).next_delay(0)[0], 50)
+
+    def test_server_poll_interval_is_a_lower_bound(self):
+        """X-Poll-Interval raises the delay but never lowers it"""
+        delay, reason = self.scheduler.next_delay(1, server_interval=60)
+        self.assertEqual(delay, 60)
+        self.assertIn("X-Poll-Interval", reason)
+        self.assertEqual(self.scheduler.next_delay(0, server_interval=20)[0], 50)
+
+    def test_errors_retry_quickly_then_fall_back(self):
+        """Failed cycles use their own backoff, limited by max_retries"""
+        delays = [self.scheduler.on_error()[0] for _ in range(4)]
+        self.assertEqual(delays, [5, 10, 20, 50])
+        self.assertEqual(self.scheduler.on_error()[0], 5)
+
+    def test_jitter_stays_within_bounds(self):
+        """Jitter spreads delays by at most the configured fraction"""
+        scheduler = PollScheduler(100, jitter=0.1, rng=random.Random(1))
+        for _ in range(50):
+            scheduler.idle_cycles = 0
+            self.assertTrue(90 <= scheduler.next_delay(0)[0] <= 110)
+
+if __name__ == '__main__':
+    unittest.main()
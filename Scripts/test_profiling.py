@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for cycle profiling
+"""
+
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from github_actions_monitor import GitHubActionsMonitor
+from poll_scheduler import PollScheduler
+from profiling import CycleProfiler
+from test_run_state import make_run
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def leaky_work(leaked):
+    leaked.append(bytearray(256 * 1024))
+
+
+class TestCycleProfiler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.temp_dir.name, "profiles")
+
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.temp_dir.cleanup()
+
+    def dumps(self):
+        return sorted(os.listdir(self.output_dir)) if os.path.isdir(self.output_dir) else []
+
+    def test_every_nth_cycle_dumped_with_work_of_all_threads(self):
+        """Sampled cycles merge the profiles of their threads, report memory growth and rotate"""
+        profiler = CycleProfiler(self.output_dir, cpu=True, memory=True, every=2, keep=2, top=5)
+        leaked = []
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(1) as pool:
+            for _ in range(6):
+                capture = profiler.start_cycle("owner/repo")
+                if capture is None:
+                    continue
+                with capture:
+                    capture.track(pool.submit(capture.wrap(busy_work)))
+                    leaky_work(leaked)
+                pool.submit(lambda: None).result()
+
+        self.assertEqual(profiler.cycles, 6)
+        self.assertEqual(profiler.dumps, 3)
+        dumps = self.dumps()
+        self.assertEqual(len(dumps), 6)
+        self.assertTrue(dumps[0].endswith("000004.prof") and dumps[-1].endswith("000006.txt"), dumps)
+
+        prefix = os.path.join(self.output_dir, dumps[-1][:-len(".txt")])
+        functions = {function for _, _, function in pstats.Stats(prefix + ".prof").stats}
+        self.assertIn("busy_work", functions)
+        self.assertIn("leaky_work", functions)
+        tracemalloc.Snapshot.load(prefix + ".tracemalloc")
+        with open(prefix + ".txt") as f:
+            summary = f.read()
+        self.assertTrue(summary.startswith("Cycle 6 (owner/repo) took"))
+        self.assertIn("dumped every 2 cycles", summary)
+        self.assertIn("(2 threads)", summary)
+        growth = summary[summary.index("growths since the last dump"):]
+        self.assertIn("test_profiling.py", growth.splitlines()[1])
+
+    def test_latest_dump_is_always_kept(self):
+        """A profiler keeping no dumps is refused, since rotation would delete the one just written"""
+        with self.assertRaises(ValueError):
+            CycleProfiler(self.output_dir, cpu=True, keep=0)
+
+        profiler = CycleProfiler(self.output_dir, cpu=True, keep=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(2):
+                with profiler.start_cycle("owner/repo"):
+                    busy_work()
+        self.assertEqual(len({name.rsplit(".", 1)[0] for name in self.dumps()}), 1)
+
+    def test_cancelled_work_and_busy_profiler_still_finish_the_cycle(self):
+        """Cancelled work counts as done, and work that can't get a profiler runs unprofiled"""
+        profiler = CycleProfiler(self.output_dir, cpu=True)
+        release = threading.Event()
+        pool = ThreadPoolExecutor(1)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            with profiler.start_cycle("owner/repo") as capture:
+                capture.track(pool.submit(capture.wrap(release.wait), 5))
+                capture.track(pool.submit(capture.wrap(busy_work)))
+            self.assertEqual(self.dumps(), [])
+            pool.shutdown(wait=False, cancel_futures=True)
+            release.set()
+            pool.shutdown(wait=True)
+        self.assertIn("Profile of cycle 1", output.getvalue())
+
+        class ActiveElsewhere(cProfile.Profile):
+            # As on Python 3.12+ while another thread is profiled
+            def enable(self, *args, **kwargs):
+                raise ValueError("Another profiling tool is already active")
+
+        with patch("profiling.cProfile.Profile", ActiveElsewhere), contextlib.redirect_stdout(io.StringIO()):
+            with profiler.start_cycle("owner/repo") as capture:
+                self.assertEqual(capture.wrap(busy_work)(), busy_work())
+        self.assertEqual(capture.profiles, [])
+        self.assertEqual(len([name for name in self.dumps() if name.endswith(".txt")]), 2)
+
+    def test_signal_turns_on_slow_cycle_profiling(self):
+        """SIGUSR1 turns profiling on from the next cycle, and only slow cycles are dumped"""
+        profiler = CycleProfiler(self.output_dir, slow_seconds=0.2)
+        self.assertIsNone(profiler.start_cycle("owner/repo"))
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            profiler.request_toggle()
+            for seconds in (0, 0.25):
+                with profiler.start_cycle("owner/repo"):
+                    time.sleep(seconds)
+            self.assertTrue(tracemalloc.is_tracing())
+            profiler.request_toggle()
+            self.assertIsNone(profiler.start_cycle("owner/repo"))
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertIn("Profiling turned on (cpu, memory)", output.getvalue())
+        self.assertIn("Profiling turned off", output.getvalue())
+        self.assertEqual([name.rsplit("-", 1)[1] for name in self.dumps()],
+                         ["000002.prof", "000002.tracemalloc", "000002.txt"])
+
+    def test_cycle_waits_for_the_runs_it_submitted(self):
+        """A monitor cycle's profile covers the runs it handed to the run pool"""
+        profiler = CycleProfiler(self.output_dir, cpu=True, slow_seconds=0.2)
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo", profiler=profiler)
+        with patch.object(monitor, "get_workflow_runs", return_value=[make_run(1, "completed", "success")]):
+            monitor.poll_once()
+
+        def slow_extract(run_id):
+            time.sleep(0.3)
+            return []
+
+        with patch.object(monitor, "get_workflow_runs", return_value=[make_run(2, "completed", "failure")]), \
+                patch.object(monitor, "extract_run_errors", side_effect=slow_extract), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            monitor.run_cycle(PollScheduler(60))
+            self.assertEqual(self.dumps(), [])
+            monitor.run_pool().shutdown(wait=True)
+
+        self.assertIn("Profile of cycle 1 (owner/repo", output.getvalue())
+        prof = [name for name in self.dumps() if name.endswith(".prof")]
+        functions = {function for _, _, function in pstats.Stats(os.path.join(self.output_dir, prof[0])).stats}
+        self.assertIn("poll_once", functions)
+        self.assertIn("slow_extract", functions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable workflow run state
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_monitor import make_missing_property_errors, make_view_model
+from github_actions_monitor import GitHubActionsMonitor
+from run_state import (RunStateStore, OUTCOME_BASELINE, OUTCOME_FIXED, OUTCOME_NO_ERRORS, OUTCOME_NO_FIXES,
+                       OUTCOME_SKIPPED, OUTCOME_SUPERSEDED)
+
+
+def make_run(run_id, status, conclusion=None, created_at="2025-05-29T00:00:00Z", branch="master"):
+    return {"id": run_id, "name": "Build", "status": status, "conclusion": conclusion,
+            "head_sha": f"sha{run_id}", "head_branch": branch, "workflow_id": 1, "created_at": created_at}
+
+
+class TestRunState(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "state.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def new_monitor(self):
+        return GitHubActionsMonitor("fake_token", "owner/repo", state_path=self.db_path)
+
+    def test_restart_neither_reprocesses_nor_misses_runs(self):
+        """A run in progress before a restart is processed once it completes afterwards"""
+        monitor = self.new_monitor()
+        with patch.object(monitor, "get_workflow_runs", return_value=[
+                make_run(1, "completed", "failure"), make_run(2, "in_progress")]), \
+             patch.object(monitor, "process_run") as process_run:
+            monitor.poll_once()
+        process_run.assert_not_called()
+        self.assertEqual(monitor.state.get_run(1)["outcome"], OUTCOME_BASELINE)
+        monitor.state.close()
+
+        restarted = self.new_monitor()
+        self.assertEqual(restarted.state.pending_run_ids("owner/repo"), [2])
+        with patch.object(restarted, "get_workflow_runs",
+                          return_value=[make_run(3, "completed", "failure", "2025-05-29T00:05:00Z")]) as get_runs, \
+             patch.object(restarted, "get_workflow_run", return_value=make_run(2, "completed", "failure")), \
+             patch.object(restarted, "process_run", return_value=OUTCOME_FIXED) as process_run:
+            processed = restarted.poll_once()
+            restarted.poll_once()
+
+        self.assertEqual([run["id"] for run in processed], [2, 3])
+        self.assertEqual(process_run.call_count, 2)
+        self.assertEqual(get_runs.call_args.kwargs["created"], ">=2025-05-29T00:05:00Z")
+        self.assertEqual(restarted.state.get_run(3)["outcome"], OUTCOME_FIXED)
+
+    def bootstrapped_monitor(self, **kwargs):
+        monitor = GitHubActionsMonitor("fake_token", "owner/repo", **kwargs)
+        with patch.object(monitor, "get_workflow_runs", return_value=[make_run(1, "completed", "success")]):
+            monitor.poll_once()
+        return monitor
+
+    def test_superseded_runs_are_skipped(self):
+        """Only the newest failed run of a workflow on a branch is processed, unless newer ones were cancelled"""
+        monitor = self.bootstrapped_monitor()
+        runs = [make_run(2, "completed", "failure"), make_run(3, "completed", "failure"),
+                make_run(4, "completed", "failure", branch="feature"),
+                make_run(5, "completed", "cancelled", branch="feature")]
+        with patch.object(monitor, "get_workflow_runs", return_value=runs), \
+                patch.object(monitor, "extract_run_errors", return_value=[]) as extract, \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual([run["id"] for run in monitor.poll_once()], [2, 3, 4, 5])
+
+        self.assertEqual(sorted(call.args[0] for call in extract.call_args_list), [3, 4])
+        self.assertEqual([monitor.state.get_run(run_id)["outcome"] for run_id in (2, 3, 4, 5)],
+                         [OUTCOME_SUPERSEDED, OUTCOME_NO_ERRORS, OUTCOME_NO_ERRORS, OUTCOME_SKIPPED])
+        self.assertIn("Run 2 is superseded by run 3 on master", output.getvalue())
+
+    def test_runs_processed_concurrently_and_dropped_when_superseded_mid_flight(self):
+        """Runs download side by side, and a run superseded while downloading is not fixed"""
+        monitor = self.bootstrapped_monitor(run_workers=2)
+        both_downloading = threading.Barrier(2, timeout=5)
+        newer_recorded = threading.Event()
+
+        def extract(run_id):
+            both_downloading.wait()
+            if run_id == 2:
+                newer_recorded.wait(5)
+                return [{"type": "missing_property", "message": "'A' does not contain a definition for 'B'"}]
+            return []
+
+        runs = [make_run(2, "completed", "failure"), make_run(3, "completed", "failure", branch="feature")]
+        with patch.object(monitor, "get_workflow_runs", return_value=runs), \
+                patch.object(monitor, "extract_run_errors", side_effect=extract), \
+                patch.object(monitor, "fix_errors") as fix_errors, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual([run["id"] for run in monitor.poll_once(wait=False)], [2, 3])
+            # A later cycle records a newer run of the same workflow while run 2 is downloading
+            monitor.state.record_run("owner/repo", make_run(4, "in_progress"))
+            newer_recorded.set()
+            monitor.run_pool().shutdown()
+
+        fix_errors.assert_not_called()
+        self.assertEqual(monitor.state.get_run(2)["outcome"], OUTCOME_SUPERSEDED)
+        self.assertEqual(monitor.state.get_run(3)["outcome"], OUTCOME_NO_ERRORS)
+
+    def test_same_error_on_concurrent_runs_fixed_once(self):
+        """Runs on different branches failing with the same error add the missing member only once"""
+        path = os.path.join(self.temp_dir.name, "ViewModels.cs")
+        with open(path, "w") as f:
+            f.write(make_view_model(1))
+        errors = make_missing_property_errors(path, 1, 1)
+        monitor = self.bootstrapped_monitor(run_workers=2, repo_path=self.temp_dir.name)
+        both_extracted = threading.Barrier(2, timeout=5)
+
+        def extract(run_id):
+            both_extracted.wait()
+            return [dict(error) for error in errors]
+
+        runs = [make_run(2, "completed", "failure"), make_run(3, "completed", "failure", branch="feature")]
+        with patch.object(monitor, "get_workflow_runs", return_value=runs), \
+                patch.object(monitor, "extract_run_errors", side_effect=extract), \
+                patch.object(monitor, "_commit_and_push", return_value=True), \
+                contextlib.redirect_stdout(io.StringIO()):
+            monitor.poll_once()
+        self.assertEqual(sorted(monitor.state.get_run(run_id)["outcome"] for run_id in (2, 3)),
+                         sorted([OUTCOME_FIXED, OUTCOME_NO_FIXES]))
+
+        # Without the fingerprints, the planner still sees the member the class declares
+        fresh = GitHubActionsMonitor("fake_token", "owner/repo", repo_path=self.temp_dir.name)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(fresh.fix_run_errors(make_run(4, "completed", "failure"),
+                                                  [dict(error) for error in errors]), OUTCOME_NO_FIXES)
+        self.assertIn("already declares 'Extra0Name'", output.getvalue())
+        with open(path) as f:
+            self.assertEqual(f.read().count(" Extra0Name "), 1)
+
+    def test_record_run_reports_changes(self):
+        """Only new runs or status/conclusion changes count as changes"""
+        store = RunStateStore()
+        self.assertTrue(store.record_run("owner/repo", make_run(1, "queued")))
+        self.assertFalse(store.record_run("owner/repo", make_run(1, "queued")))
+        self.assertTrue(store.record_run("owner/repo", make_run(1, "completed", "success")))
+        self.assertTrue(store.needs_processing(1))
+
+if __name__ == '__main__':
+    unittest.main()
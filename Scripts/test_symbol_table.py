@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the type to namespace symbol table
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from class_index import ClassIndex
+from symbol_table import SymbolTable, load_known_types
+
+SERVICES = """namespace AccountingModule.Areas.Accounting.Services;
+
+public class InvoiceService
+{
+}
+
+public class Encoding
+{
+}
+"""
+
+REPORTS = """namespace AccountingModule.Areas.Reports
+{
+    public class InvoiceService
+    {
+    }
+}
+"""
+
+
+class TestSymbolTable(unittest.TestCase):
+    def test_resolves_framework_types(self):
+        """Bundled framework types resolve by name, and attributes with or without their suffix"""
+        symbols = SymbolTable()
+        self.assertEqual(symbols.namespaces("DisplayAttribute"), ["System.ComponentModel.DataAnnotations"])
+        self.assertEqual(symbols.namespaces("Display"), ["System.ComponentModel.DataAnnotations"])
+        self.assertEqual(symbols.namespaces("SelectListItem"), ["Microsoft.AspNetCore.Mvc.Rendering"])
+        self.assertEqual(symbols.namespaces("List"), ["System.Collections.Generic"])
+        self.assertEqual(symbols.namespaces("NoSuchType"), [])
+        # The bundled table is parsed once per process
+        self.assertIs(SymbolTable().known_types, symbols.known_types)
+        self.assertEqual(load_known_types.cache_info().currsize, 1)
+
+    def test_repo_types_take_precedence(self):
+        """Types declared in the checkout come from the class index and shadow framework types"""
+        with tempfile.TemporaryDirectory() as repo:
+            with open(os.path.join(repo, "Services.cs"), "w") as f:
+                f.write(SERVICES)
+            index = ClassIndex(repo)
+            index.refresh()
+            symbols = SymbolTable(index)
+            self.assertEqual(symbols.namespaces("InvoiceService"), ["AccountingModule.Areas.Accounting.Services"])
+            self.assertEqual(symbols.namespaces("Encoding"), ["AccountingModule.Areas.Accounting.Services"])
+            self.assertEqual(symbols.namespaces("StringBuilder"), ["System.Text"])
+
+            with open(os.path.join(repo, "Reports.cs"), "w") as f:
+                f.write(REPORTS)
+            index.refresh()
+            self.assertEqual(symbols.namespaces("InvoiceService"), [
+                "AccountingModule.Areas.Accounting.Services", "AccountingModule.Areas.Reports"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the webhook receiver, driven by recorded payloads
+"""
+
+import http.client
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+from github_actions_monitor import GitHubActionsMonitor
+from run_state import OUTCOME_FIXED
+from webhook_server import HEARTBEAT_INTERVAL, MAX_PAYLOAD_BYTES, WebhookReceiver, post_payload
+
+FIXTURES = os.path.join(SCRIPT_DIR, "fixtures", "webhooks")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r") as f:
+        return json.load(f)
+
+
+class TestWebhookReceiver(unittest.TestCase):
+    def setUp(self):
+        self.monitor = GitHubActionsMonitor("fake_token", "M7mad3sam/AccountingModule")
+        self.receiver = WebhookReceiver(self.monitor, "s3cret", port=0)
+        self.receiver.start()
+
+    def tearDown(self):
+        self.receiver.stop()
+
+    def test_failed_run_is_processed_once(self):
+        """A recorded workflow_run failure goes straight into the pipeline, even if delivered twice"""
+        payload = load_fixture("workflow_run_failure.json")
+        with patch.object(self.monitor, "process_run", return_value=OUTCOME_FIXED) as process_run:
+            for _ in range(2):
+                response = post_payload(self.receiver.url, "workflow_run", payload, "s3cret")
+                self.assertEqual(response.status_code, 202)
+            self.receiver.queue.join()
+
+        process_run.assert_called_once()
+        self.assertEqual(self.monitor.state.get_run(15321901234)["outcome"], OUTCOME_FIXED)
+
+    def test_failed_job_refreshes_its_run(self):
+        """A workflow_job failure fetches the run it belongs to"""
+        run = load_fixture("workflow_run_failure.json")["workflow_run"]
+        with patch.object(self.monitor, "get_workflow_run", return_value=run) as get_run, \
+             patch.object(self.monitor, "process_run", return_value=OUTCOME_FIXED):
+            response = post_payload(self.receiver.url, "workflow_job", load_fixture("workflow_job_failure.json"), "s3cret")
+            self.receiver.queue.join()
+
+        self.assertEqual(response.status_code, 202)
+        get_run.assert_called_once_with(15321901234)
+
+    def test_rejects_bad_signatures_and_ignores_other_events(self):
+        """Unsigned deliveries are refused; successes and other repositories are ignored"""
+        payload = load_fixture("workflow_run_failure.json")
+        self.assertEqual(post_payload(self.receiver.url, "workflow_run", payload, "wrong").status_code, 401)
+
+        payload["workflow_run"]["conclusion"] = "success"
+        self.assertEqual(post_payload(self.receiver.url, "workflow_run", payload, "s3cret").status_code, 204)
+
+        payload = load_fixture("workflow_run_failure.json")
+        payload["repository"]["full_name"] = "someone/else"
+        self.assertEqual(post_payload(self.receiver.url, "workflow_run", payload, "s3cret").status_code, 204)
+        self.assertTrue(self.receiver.queue.empty())
+
+    def test_rejects_malformed_and_oversized_deliveries(self):
+        """Completed events without their run or job are bad requests; bodies over 25 MB are refused unread"""
+        for event in ("workflow_run", "workflow_job"):
+            payload = {"action": "completed", "repository": {"full_name": "M7mad3sam/AccountingModule"}}
+            self.assertEqual(post_payload(self.receiver.url, event, payload, "s3cret").status_code, 400)
+        self.assertEqual(post_payload(self.receiver.url, "workflow_run", [1], "s3cret").status_code, 400)
+
+        connection = http.client.HTTPConnection(self.receiver.server.server_address[0],
+                                                self.receiver.server.server_address[1], timeout=5)
+        connection.putrequest("POST", "/")
+        connection.putheader("Content-Length", str(MAX_PAYLOAD_BYTES + 1))
+        connection.putheader("X-GitHub-Event", "workflow_run")
+        connection.endheaders(b"{}")
+        self.assertEqual(connection.getresponse().status, 413)
+        connection.close()
+        self.assertTrue(self.receiver.queue.empty())
+
+    def test_first_poll_baselines_before_deliveries_are_served(self):
+        """With an empty state the first poll runs before the server starts, otherwise right after it"""
+        for recorded in (False, True):
+            monitor = GitHubActionsMonitor("fake_token", "M7mad3sam/AccountingModule")
+            if recorded:
+                monitor.state.record_run(monitor.repo, load_fixture("workflow_run_failure.json")["workflow_run"])
+            receiver = WebhookReceiver(monitor, "s3cret", port=0)
+            self.addCleanup(receiver.stop)
+            serving = []
+            with patch.object(monitor, "poll_once", side_effect=lambda: serving.append(bool(receiver._threads))), \
+                 patch.object(monitor, "report_cycle_stats"), \
+                 patch.object(receiver, "wait", side_effect=[None, InterruptedError]):
+                with self.assertRaises(InterruptedError):
+                    receiver.serve_forever()
+            self.assertEqual(serving, [recorded, True])
+
+    def test_heartbeat_is_touched_while_waiting(self):
+        """Long reconcile intervals still touch the heartbeat every HEARTBEAT_INTERVAL seconds"""
+        with patch("webhook_server.time.sleep") as sleep, \
+             patch.object(self.monitor, "touch_heartbeat") as touch_heartbeat:
+            self.receiver.wait(1800 + HEARTBEAT_INTERVAL / 2)
+        self.assertEqual(sleep.call_count, 1800 // HEARTBEAT_INTERVAL + 1)
+        self.assertEqual(sleep.call_args.args, (HEARTBEAT_INTERVAL / 2,))
+        self.assertEqual(touch_heartbeat.call_count, sleep.call_count)
+
+if __name__ == '__main__':
+    unittest.main()
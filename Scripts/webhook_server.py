@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+GitHub Webhook Receiver for the Actions Monitor
+
+Runs a local HTTP server that receives workflow_run and workflow_job
+events, verifies their X-Hub-Signature-256 signatures and queues failed
+runs straight into the monitor's log -> extract -> fix pipeline, instead
+of waiting for the next poll. Polling keeps running at a slow interval to
+reconcile anything a missed delivery left behind.
+
+Recorded payloads can be replayed against a running receiver:
+    python webhook_server.py replay --url http://localhost:8080/ --secret <secret> \
+        --event workflow_run fixtures/webhooks/workflow_run_failure.json
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import requests
+
+RECONCILE_INTERVAL = 600  # seconds between reconciliation polls in webhook mode
+HEARTBEAT_INTERVAL = 60  # seconds between heartbeats while waiting for the next reconciliation poll
+HANDLED_EVENTS = ("workflow_run", "workflow_job")
+MAX_PAYLOAD_BYTES = 25 * 1024 * 1024  # GitHub caps webhook payloads at 25 MB
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """
+    Compute the X-Hub-Signature-256 header value for a payload.
+    """
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """
+    Check a delivery's X-Hub-Signature-256 header against the shared secret.
+
+    Args:
+        secret: Webhook secret configured on GitHub
+        body: Raw request body
+        signature: Value of the X-Hub-Signature-256 header
+
+    Returns:
+        True if the signature is valid
+    """
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+def post_payload(url: str, event: str, payload: Dict, secret: str) -> requests.Response:
+    """
+    Deliver a (recorded) webhook payload to a receiver, signed like GitHub does.
+
+    Args:
+        url: Receiver URL
+        event: Event name for the X-GitHub-Event header
+        payload: Event payload
+        secret: Webhook secret
+
+    Returns:
+        The receiver's response
+    """
+    body = json.dumps(payload).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-Hub-Signature-256": sign_payload(secret, body),
+    }
+    return requests.post(url, data=body, headers=headers)
+
+
+class WebhookReceiver:
+    def __init__(self, monitor, secret: str, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Initialize the webhook receiver.
+
+        Args:
+            monitor: GitHubActionsMonitor that processes the queued runs
+            secret: Webhook secret used to verify deliveries
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        """
+        self.monitor = monitor
+        self.secret = secret
+        self.queue: "queue.Queue[Dict]" = queue.Queue()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._threads = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _handler_class(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status = 400
+                elif length > MAX_PAYLOAD_BYTES:
+                    # Refused unread, so the connection can't be kept alive
+                    status = 413
+                    self.close_connection = True
+                else:
+                    body = self.rfile.read(length)
+                    status = receiver.handle_delivery(
+                        self.headers.get("X-GitHub-Event"), body, self.headers.get("X-Hub-Signature-256")
+                    )
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle_delivery(self, event: Optional[str], body: bytes, signature: Optional[str]) -> int:
+        """
+        Verify a webhook delivery and queue the run it reports, if any.
+
+        Args:
+            event: Value of the X-GitHub-Event header
+            body: Raw request body
+            signature: Value of the X-Hub-Signature-256 header
+
+        Returns:
+            HTTP status code for the response
+        """
+        if not verify_signature(self.secret, body, signature):
+            print(f"Rejected {event} delivery with an invalid signature")
+            return 401
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400
+        if not isinstance(payload, dict):
+            return 400
+
+        if event not in HANDLED_EVENTS or payload.get("action") != "completed":
+            return 204
+        if (payload.get("repository") or {}).get("full_name") != self.monitor.repo:
+            return 204
+
+        if event == "workflow_run":
+            run = payload.get("workflow_run")
+            if not isinstance(run, dict) or "id" not in run:
+                return 400
+            if run.get("conclusion") != "failure":
+                return 204
+            self.queue.put({"run": run})
+        else:
+            job = payload.get("workflow_job")
+            if not isinstance(job, dict) or "run_id" not in job:
+                return 400
+            if job.get("conclusion") != "failure":
+                return 204
+            # The run may still be going; refreshing it records it as pending at least
+            self.queue.put({"run_id": job["run_id"]})
+
+        print(f"Queued {event} failure from webhook")
+        return 202
+
+    def _process_queue(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                run = item.get("run") or self.monitor.get_workflow_run(item["run_id"])
+                if run:
+                    self.monitor.state.record_run(self.monitor.repo, run)
+                    self.monitor.handle_run(run)
+            except Exception as e:
+                print(f"Error processing webhook run: {e}")
+            finally:
+                self.queue.task_done()
+
+    def start(self) -> None:
+        """
+        Start serving deliveries and processing queued runs in background threads.
+        """
+        self._threads = [
+            threading.Thread(target=self.server.serve_forever, daemon=True),
+            threading.Thread(target=self._process_queue, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"Listening for GitHub webhooks on {self.url}")
+
+    def stop(self) -> None:
+        """
+        Stop the server and let the worker finish the runs already queued.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def serve_forever(self, reconcile_interval: int = RECONCILE_INTERVAL) -> None:
+        """
+        Serve webhooks and poll at a slow interval to reconcile missed deliveries.
+
+        Args:
+            reconcile_interval: Seconds between reconciliation polls
+        """
+        if self.monitor.state.is_empty(self.monitor.repo):
+            # The first poll only baselines earlier failures while nothing is recorded,
+            # so it has to finish before a delivery records a run
+            self.reconcile()
+            self.start()
+            self.wait(reconcile_interval)
+        else:
+            self.start()
+        while True:
+            self.reconcile()
+            self.wait(reconcile_interval)
+
+    def reconcile(self) -> None:
+        """
+        Run one polling cycle to pick up runs whose deliveries were missed.
+        """
+        with self.monitor.profile_cycle():
+            try:
+                self.monitor.poll_once()
+            except Exception as e:
+                print(f"Error in reconciliation poll: {e}")
+        self.monitor.report_cycle_stats()
+
+    def wait(self, seconds: float) -> None:
+        """
+        Sleep until the next reconciliation poll, touching the heartbeat
+        often enough for the supervisor's health timeout whatever the interval.
+        """
+        while seconds > 0:
+            step = min(seconds, HEARTBEAT_INTERVAL)
+            time.sleep(step)
+            seconds -= step
+            self.monitor.touch_heartbeat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded GitHub webhook payloads")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    replay = subparsers.add_parser("replay", help="Post recorded payloads to a running receiver")
+    replay.add_argument("--url", required=True, help="Receiver URL")
+    replay.add_argument("--secret", required=True, help="Webhook secret")
+    replay.add_argument("--event", required=True, choices=HANDLED_EVENTS, help="Event name")
+    replay.add_argument("payloads", nargs="+", help="JSON payload files")
+
+    args = parser.parse_args()
+    for path in args.payloads:
+        with open(path, "r") as f:
+            payload = json.load(f)
+        response = post_payload(args.url, args.event, payload, args.secret)
+        print(f"{path}: {response.status_code}")
+
+if __name__ == "__main__":
+    main()